@@ -1,13 +1,22 @@
+import sys
+
 from pwnypack.target import *
 from pwnypack.packing import *
 from pwnypack.util import *
 from pwnypack.flow import *
+if sys.version_info >= (3, 5):
+    from pwnypack.asyncflow import *
 from pwnypack.asm import *
+from pwnypack.encoder import *
 from pwnypack.elf import *
 from pwnypack.codec import *
+from pwnypack.stats import *
+from pwnypack.pipeline import *
 from pwnypack.shell import *
 from pwnypack.pwnbook import *
 from pwnypack.rop import *
+from pwnypack.grep import *
+from pwnypack.runner import *
 from pwnypack.fmtstring import *
 from pwnypack.php import *
 from pwnypack.pickle import *
@@ -91,7 +91,7 @@ def asm(code, addr=0, syntax=None, target=None, gnu_binutils_prefix=None):
         syntax(AsmSyntax): The input assembler syntax. Defaults to nasm
             on x86/x86_64, AT&T on other platforms.
         target(~pwnypack.target.Target): The target architecture. The
-            global target is used if this argument is ``None``.
+            current target is used if this argument is ``None``.
         gnu_binutils_prefix(str): When the syntax is AT&T, gnu binutils'
             as and ld will be used. By default, it selects
             ``arm-*-as/ld`` for 32bit ARM targets,
@@ -118,7 +118,7 @@ def asm(code, addr=0, syntax=None, target=None, gnu_binutils_prefix=None):
     """
 
     if target is None:
-        target = pwnypack.target.target
+        target = pwnypack.target.current_target()
 
     if syntax is None:
         if target.arch is pwnypack.target.Target.Arch.x86:
@@ -265,7 +265,7 @@ def prepare_capstone(syntax=AsmSyntax.att, target=None):
     Args:
         syntax(AsmSyntax): The assembler syntax (Intel or AT&T).
         target(~pwnypack.target.Target): The target to create a disassembler
-            instance for. The global target is used if this argument is
+            instance for. The current target is used if this argument is
             ``None``.
 
     Returns:
@@ -279,7 +279,7 @@ def prepare_capstone(syntax=AsmSyntax.att, target=None):
         raise NotImplementedError('pwnypack requires capstone to disassemble to AT&T and Intel syntax')
 
     if target is None:
-        target = pwnypack.target.target
+        target = pwnypack.target.current_target()
 
     if target.arch == pwnypack.target.Target.Arch.x86:
         if target.bits is pwnypack.target.Target.Bits.bits_32:
@@ -336,7 +336,7 @@ def disasm(code, addr=0, syntax=None, target=None):
         syntax(AsmSyntax): The output assembler syntax. This defaults to
             nasm on x86 architectures, AT&T on all other architectures.
         target(~pwnypack.target.Target): The architecture for which the code
-            was written.  The global target is used if this argument is
+            was written.  The current target is used if this argument is
             ``None``.
 
     Returns:
@@ -353,7 +353,7 @@ def disasm(code, addr=0, syntax=None, target=None):
     """
 
     if target is None:
-        target = pwnypack.target.target
+        target = pwnypack.target.current_target()
 
     if syntax is None:
         if target.arch is pwnypack.target.Target.Arch.x86:
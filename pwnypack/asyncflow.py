@@ -0,0 +1,385 @@
+"""
+The AsyncFlow module provides :class:`AsyncFlow`, the asyncio counterpart
+of :class:`~pwnypack.flow.Flow`. It lets a single process talk to hundreds
+of processes or network services at the same time.
+
+All read and write operations are coroutines but otherwise behave exactly
+like their :class:`~pwnypack.flow.Flow` counterparts: received data is
+buffered, read operations accept timeouts that raise
+:class:`~pwnypack.flow.FlowTimeout` and data is echoed to stdout when it is
+consumed.
+
+This module requires python 3.5 or newer.
+
+Examples:
+    >>> import asyncio
+    >>> from pwny import *
+    >>> async def probe(port):
+    ...     f = await AsyncFlow.connect_tcp('127.0.0.1', port, timeout=5)
+    ...     await f.writeline(b'hello')
+    ...     return await f.readline()
+    >>> loop = asyncio.get_event_loop()
+    >>> loop.run_until_complete(asyncio.gather(*[probe(p) for p in range(8000, 8100)]))
+"""
+
+import asyncio
+import subprocess
+import sys
+import time
+
+from pwnypack.flow import Flow, FlowTimeout, RECV_SIZE
+
+
+__all__ = [
+    'AsyncFlow',
+]
+
+
+class AsyncFlow(object):
+    """
+    The asyncio counterpart of :class:`~pwnypack.flow.Flow`. Wraps a pair of
+    asyncio streams.
+
+    Usually, you'll use the convenience coroutines :meth:`connect_tcp`,
+    :meth:`listen_tcp` or :meth:`execute` instead of creating an instance
+    directly.
+
+    Args:
+        reader(asyncio.StreamReader): The stream to read from.
+        writer(asyncio.StreamWriter): The stream to write to.
+        echo(bool): Whether or not to echo all input / output.
+        timeout(float): The default timeout of read operations in seconds.
+            ``None`` means read operations block until they complete.
+        process(asyncio.subprocess.Process): The process the streams belong
+            to (if any).
+    """
+
+    def __init__(self, reader, writer, echo=False, timeout=None, process=None):
+        self.reader = reader
+        self.writer = writer
+        self.echo = echo
+        self.timeout = timeout
+        self.process = process
+        self._buffer = bytearray()
+
+    # The buffer and echo handling is shared with the blocking Flow.
+    buffered = Flow.buffered
+    _deadline = Flow._deadline
+    _consume = Flow._consume
+
+    def _eof(self):
+        return EOFError('Process ended' if self.process is not None else 'Socket closed')
+
+    async def _fill(self, deadline=None):
+        """
+        Receive a block of data and append it to the receive buffer.
+
+        Raises:
+            EOFError: If the stream was closed.
+            FlowTimeout: If no data arrived before the deadline.
+        """
+
+        if deadline is None:
+            block = await self.reader.read(RECV_SIZE)
+        else:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise FlowTimeout(bytes(self._buffer))
+            try:
+                block = await asyncio.wait_for(self.reader.read(RECV_SIZE), remaining)
+            except asyncio.TimeoutError:
+                raise FlowTimeout(bytes(self._buffer))
+
+        if not block:
+            raise self._eof()
+        self._buffer += block
+
+    async def _find(self, s, count, deadline):
+        """
+        Receive data until the receive buffer contains *count* occurrences
+        of *s* and return the offset just past the last one.
+        """
+
+        start = 0
+        while True:
+            index = self._buffer.find(s, start)
+            if index != -1:
+                start = index + len(s)
+                count -= 1
+                if not count:
+                    return start
+            else:
+                start = max(start, len(self._buffer) - len(s) + 1)
+                await self._fill(deadline)
+
+    async def read(self, n, echo=None, timeout=None):
+        """
+        Read *n* bytes.
+
+        Args:
+            n(int): The number of bytes to read.
+            echo(bool): Whether to write the read data to stdout.
+            timeout(float): The maximum number of seconds to wait.
+
+        Returns:
+            bytes: *n* bytes of data.
+
+        Raises:
+            EOFError: If the stream was closed.
+            FlowTimeout: If the timeout expired.
+        """
+
+        deadline = self._deadline(timeout)
+        while len(self._buffer) < n:
+            await self._fill(deadline)
+        return self._consume(n, echo)
+
+    async def read_eof(self, echo=None, timeout=None):
+        """
+        Read until the stream is closed.
+
+        Args:
+            echo(bool): Whether to write the read data to stdout.
+            timeout(float): The maximum number of seconds to wait.
+
+        Returns:
+            bytes: The read data.
+
+        Raises:
+            FlowTimeout: If the timeout expired.
+        """
+
+        deadline = self._deadline(timeout)
+        while True:
+            try:
+                await self._fill(deadline)
+            except EOFError:
+                return self._consume(len(self._buffer), echo)
+
+    async def read_until(self, s, echo=None, timeout=None):
+        """
+        Read until a certain string is encountered.
+
+        Args:
+            s(bytes): The string to wait for.
+            echo(bool): Whether to write the read data to stdout.
+            timeout(float): The maximum number of seconds to wait.
+
+        Returns:
+            bytes: The data up to and including *s*.
+
+        Raises:
+            EOFError: If the stream was closed.
+            FlowTimeout: If the timeout expired.
+        """
+
+        return self._consume(await self._find(s, 1, self._deadline(timeout)), echo)
+
+    until = read_until  #: Alias of :meth:`read_until`.
+
+    async def readlines(self, n, echo=None, timeout=None):
+        """
+        Read *n* lines.
+
+        Args:
+            n(int): The number of lines to read.
+            echo(bool): Whether to write the read data to stdout.
+            timeout(float): The maximum number of seconds to wait for all
+                lines.
+
+        Returns:
+            list of bytes: *n* lines which include new line characters.
+
+        Raises:
+            EOFError: If the stream was closed before *n* lines were read.
+            FlowTimeout: If the timeout expired before *n* lines were read.
+        """
+
+        if n < 1:
+            return []
+        lines = self._consume(await self._find(b'\n', n, self._deadline(timeout)), echo).split(b'\n')
+        return [line + b'\n' for line in lines[:-1]]
+
+    async def readline(self, echo=None, timeout=None):
+        """
+        Read 1 line.
+
+        Args:
+            echo(bool): Whether to write the read data to stdout.
+            timeout(float): The maximum number of seconds to wait.
+
+        Returns:
+            bytes: The read line which includes new line character.
+
+        Raises:
+            EOFError: If the stream was closed before a line was read.
+            FlowTimeout: If the timeout expired.
+        """
+
+        return (await self.readlines(1, echo, timeout))[0]
+
+    async def write(self, data, echo=None):
+        """
+        Write data and wait until it has been flushed.
+
+        Args:
+            data(bytes): The data to write.
+            echo(bool): Whether to echo the written data to stdout.
+
+        Raises:
+            EOFError: If the stream was closed before all data was sent.
+        """
+
+        if echo or (echo is None and self.echo):
+            sys.stdout.write(data.decode('latin1'))
+            sys.stdout.flush()
+        try:
+            self.writer.write(data)
+            await self.writer.drain()
+        except (ConnectionError, RuntimeError):
+            raise self._eof()
+
+    async def writelines(self, lines, sep=b'\n', echo=None):
+        """
+        Write a list of byte sequences and terminate them with a separator
+        (line feed).
+
+        Args:
+            lines(list of bytes): The lines to send.
+            sep(bytes): The separator to use after each line.
+            echo(bool): Whether to echo the written data to stdout.
+
+        Raises:
+            EOFError: If the stream was closed before all data was sent.
+        """
+
+        await self.write(sep.join(lines + [b'']), echo)
+
+    async def writeline(self, line=b'', sep=b'\n', echo=None):
+        """
+        Write a byte sequence and terminate it with a separator (line feed).
+
+        Args:
+            line(bytes): The line to send.
+            sep(bytes): The separator to use after the line.
+            echo(bool): Whether to echo the written data to stdout.
+
+        Raises:
+            EOFError: If the stream was closed before all data was sent.
+        """
+
+        await self.writelines([line], sep, echo)
+
+    async def close(self):
+        """
+        Gracefully close the streams. If the flow belongs to a process,
+        wait for it to exit.
+        """
+
+        self.writer.close()
+        if hasattr(self.writer, 'wait_closed'):
+            # Only available on python 3.7 and newer.
+            try:
+                await self.writer.wait_closed()
+            except ConnectionError:
+                pass
+        if self.process is not None:
+            await self.process.wait()
+
+    def kill(self):
+        """
+        Terminate the process or abort the connection immediately.
+        """
+
+        if self.process is not None:
+            self.process.kill()
+        else:
+            self.writer.transport.abort()
+
+    @classmethod
+    async def execute(cls, executable, *arguments, **kwargs):
+        """execute(executable, argument..., redirect_stderr=False, echo=False, timeout=None):
+
+        Start a process and create an :class:`AsyncFlow` instance for it.
+
+        Args:
+            executable(str): The executable to start.
+            argument...(list of str): The arguments to pass to the executable.
+            redirect_stderr(bool): Whether to also capture the output of stderr.
+            echo(bool): Whether to echo read/written data to stdout by default.
+            timeout(float): The default timeout of read operations.
+
+        Returns:
+            :class:`AsyncFlow`: An AsyncFlow instance connected to the
+                process.
+        """
+
+        echo = kwargs.pop('echo', False)
+        timeout = kwargs.pop('timeout', None)
+        process = await asyncio.create_subprocess_exec(
+            executable,
+            *arguments,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT if kwargs.get('redirect_stderr') else None
+        )
+        return cls(process.stdout, process.stdin, echo=echo, timeout=timeout, process=process)
+
+    @classmethod
+    async def connect_tcp(cls, host, port, echo=False, timeout=None):
+        """
+        Connect to a TCP service and create an :class:`AsyncFlow` instance
+        for the connection.
+
+        Args:
+            host(str): The hostname or IP address to connect to.
+            port(int): The port number to connect to.
+            echo(bool): Whether to echo read/written data to stdout by default.
+            timeout(float): The timeout for establishing the connection and
+                the default timeout of read operations.
+
+        Returns:
+            :class:`AsyncFlow`: An AsyncFlow instance initialised with the
+                TCP connection.
+
+        Raises:
+            asyncio.TimeoutError: If the connection could not be established
+                in time.
+        """
+
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        return cls(reader, writer, echo=echo, timeout=timeout)
+
+    @classmethod
+    async def listen_tcp(cls, host='', port=0, echo=False, timeout=None):
+        """
+        Wait for a remote client to connect and create an :class:`AsyncFlow`
+        instance for the connection.
+
+        Args:
+            host(str): The hostname or IP address to bind to. Defaults to
+                all IP addresses.
+            port(int): The port number to listen on.
+            echo(bool): Whether to echo read/written data to stdout by default.
+            timeout(float): The default timeout of read operations.
+
+        Returns:
+            :class:`AsyncFlow`: An AsyncFlow instance initialised with the
+                TCP connection.
+        """
+
+        connected = asyncio.get_event_loop().create_future()
+
+        def on_connect(reader, writer):
+            if connected.done():
+                writer.close()
+            else:
+                connected.set_result((reader, writer))
+
+        server = await asyncio.start_server(on_connect, host or None, port)
+        try:
+            reader, writer = await connected
+        finally:
+            server.close()
+        return cls(reader, writer, echo=echo, timeout=timeout)
+
@@ -4,8 +4,14 @@ strings and byte sequences.
 """
 
 
+import argparse
 import base64
-import re
+import io
+import math
+import mmap
+import os
+import sys
+import struct
 import string
 import six
 import codecs
@@ -17,14 +23,21 @@ try:
     from collections import Counter
 except ImportError:
     from counter import Counter
+try:
+    from collections import OrderedDict
+except ImportError:
+    from ordereddict import OrderedDict
 
 
 __all__ = [
     'xor',
     'rot13',
     'caesar',
+    'caesar_brute',
     'enhex',
+    'hexdump',
     'dehex',
+    'HexDecoder',
     'enb64',
     'deb64',
     'enurlform',
@@ -32,10 +45,45 @@ __all__ = [
     'enurlquote',
     'deurlquote',
     'frequency',
+    'xor_stream',
+    'enhex_stream',
+    'dehex_stream',
+    'enb64_stream',
+    'deb64_stream',
+    'BaseEncoder',
+    'BaseDecoder',
+    'enbase',
+    'debase',
+    'enbase_stream',
+    'debase_stream',
+    'frequency_table',
+    'xor_key_lengths',
+    'xor_crack',
 ]
 
 
-def xor(key, data):
+XOR_CHUNK_SIZE = 1 << 16
+
+
+if six.PY3:
+    def _bytes_to_int(d):
+        return int.from_bytes(d, 'big')
+
+    def _int_to_bytes(v, n):
+        return v.to_bytes(n, 'big')
+else:
+    def _bytes_to_int(d):
+        return int(binascii.hexlify(d), 16) if len(d) else 0
+
+    def _int_to_bytes(v, n):
+        return binascii.unhexlify('%0*x' % (n * 2, v)) if n else b''
+
+
+def _xor_block(a, b):
+    return _int_to_bytes(_bytes_to_int(a) ^ _bytes_to_int(b), len(a))
+
+
+def xor(key, data, out=None):
     """
     Perform cyclical exclusive or operations on ``data``.
 
@@ -43,12 +91,25 @@ def xor(key, data):
     the key is smaller than the provided ``data``, the ``key`` will be
     repeated.
 
+    The operation is performed on large blocks of ``data`` at once by
+    treating each block (and the matching part of the repeated key) as one
+    wide integer. ``data`` can be any object that supports the buffer
+    protocol (``bytes``, ``bytearray`` or ``memoryview``), it will be sliced
+    without being copied.
+
+    If ``out`` is provided, the result will be written to that
+    ``bytearray`` instead of being returned as a new ``bytes`` object. It
+    may be the same object as ``data`` to perform the operation in place.
+
     Args:
         key(int or bytes): The key to xor ``data`` with.
         data(bytes): The data to perform the xor operation on.
+        out(bytearray): Optional buffer to write the result to. It must be
+            at least as large as ``data``.
 
     Returns:
-        bytes: The result of the exclusive or operation.
+        bytes: The result of the exclusive or operation (or ``out`` if it
+            was provided).
 
     Examples:
         >>> from pwny import *
@@ -60,16 +121,100 @@ def xor(key, data):
         b'15-=51)19=%5=9!)!%=-%!9!)-'
         >>> xor(b'pwny', b'15-=51)19=%5=9!)!%=-%!9!)-')
         b'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+        >>> buf = bytearray(b'ABCD')
+        >>> xor(5, buf, out=buf)
+        bytearray(b'DGFA')
     """
 
     if type(key) is int:
         key = six.int2byte(key)
     key_len = len(key)
+    if not key_len:
+        raise ValueError('The xor key can not be empty')
 
-    return b''.join(
-        six.int2byte(c ^ six.indexbytes(key, i % key_len))
-        for i, c in enumerate(six.iterbytes(data))
-    )
+    data = memoryview(data)
+    data_len = len(data)
+
+    if out is not None and len(out) < data_len:
+        raise ValueError('Output buffer is too small')
+
+    chunk_size = max(1, XOR_CHUNK_SIZE // key_len) * key_len
+    key_stream = bytes(key) * (min(chunk_size, data_len) // key_len + 1)
+
+    if out is None and data_len <= chunk_size:
+        return _xor_block(data, key_stream[:data_len])
+
+    result = bytearray(data_len) if out is None else out
+    for offset in range(0, data_len, chunk_size):
+        block = data[offset:offset + chunk_size]
+        result[offset:offset + len(block)] = _xor_block(block, key_stream[:len(block)])
+
+    return bytes(result) if out is None else result
+
+
+def xor_stream(key, chunks):
+    """
+    Perform cyclical exclusive or operations on a stream of data. The
+    position in the ``key`` is carried across chunk boundaries, so the
+    concatenated output is the same as that of :func:`xor` on the
+    concatenated input.
+
+    Args:
+        key(int or bytes): The key to xor the data with.
+        chunks(iterable of bytes): The chunks of data to perform the xor
+            operation on.
+
+    Returns:
+        generator of bytes: The result of the exclusive or operation for
+            each chunk.
+
+    Example:
+        >>> from pwny import *
+        >>> list(xor_stream(b'pwny', [b'ABC', b'DEFGH']))
+        [b'15-', b'=51)1']
+    """
+
+    if type(key) is int:
+        key = six.int2byte(key)
+    key_len = len(key)
+    offset = 0
+
+    for chunk in chunks:
+        yield xor(key[offset:] + key[:offset], chunk)
+        offset = (offset + len(chunk)) % key_len
+
+
+CAESAR_CACHE_SIZE = 128
+_caesar_tables = OrderedDict()
+
+
+def _caesar_ranges(shift_ranges):
+    return [(ord(r[0]), ord(r[-1])) for r in shift_ranges]
+
+
+def _caesar_table(shift, shift_ranges):
+    """
+    Get the (text, binary) translation tables for a given shift and set of
+    shift ranges from the cache, building them if necessary.
+    """
+
+    key = (shift, tuple(shift_ranges))
+    tables = _caesar_tables.pop(key, None)
+    if tables is None:
+        text_table = dict(
+            (c, (c - s + shift) % (e - s + 1) + s)
+            for s, e in _caesar_ranges(shift_ranges)
+            for c in range(s, e + 1)
+        )
+        if all(c < 256 for c in text_table):
+            binary_table = bytes(bytearray(text_table.get(c, c) for c in range(256)))
+        else:
+            binary_table = None
+        tables = (text_table, binary_table)
+        if len(_caesar_tables) >= CAESAR_CACHE_SIZE:
+            _caesar_tables.popitem(last=False)
+    _caesar_tables[key] = tables
+    return tables
 
 
 def caesar(shift, data, shift_ranges=('az', 'AZ')):
@@ -84,13 +229,16 @@ def caesar(shift, data, shift_ranges=('az', 'AZ')):
     You can define the alphabets that will be shift by specifying one or more
     shift ranges. The characters will than be shifted within the given ranges.
 
+    The translation tables for recently used shifts and shift ranges are
+    cached.
+
     Args:
         shift(int): The shift to apply.
-        data(str): The string to apply the cipher to.
+        data(str or bytes): The string to apply the cipher to.
         shift_ranges(list of str): Which alphabets to shift.
 
     Returns:
-        str: The string with the caesar cipher applied.
+        str or bytes: The string with the caesar cipher applied.
 
     Examples:
         >>> caesar(16, 'Pwnypack')
@@ -102,12 +250,99 @@ def caesar(shift, data, shift_ranges=('az', 'AZ')):
         >>> caesar(16, 'PWNYpack', shift_ranges=('Az',))
         '`g^iFqsA'
     """
-    alphabet = dict(
-        (chr(c), chr((c - s + shift) % (e - s + 1) + s))
-        for s, e in map(lambda r: (ord(r[0]), ord(r[-1])), shift_ranges)
-        for c in range(s, e + 1)
-    )
-    return ''.join(alphabet.get(c, c) for c in data)
+
+    text_table, binary_table = _caesar_table(shift, shift_ranges)
+    if isinstance(data, six.text_type):
+        return data.translate(text_table)
+    elif binary_table is None:
+        raise ValueError('Shift ranges exceed the byte range')
+    else:
+        return data.translate(binary_table)
+
+
+def caesar_brute(data, top=None, shift_ranges=('az', 'AZ'), table=None, bigrams=None):
+    """
+    Apply all possible caesar shifts to a string and rank the results by how
+    well they match a frequency table.
+
+    Each shift is scored by the log-likelihood of the shifted text given the
+    character frequency table and the letter pair frequencies. The character
+    and letter pair histograms of ``data`` are calculated once, the score of
+    each shift is derived from those histograms. Only the results that are
+    returned are actually deciphered.
+
+    Args:
+        data(str or bytes): The string to brute force.
+        top(int): Only return the ``top`` best scoring shifts. If ``None``,
+            all shifts are returned.
+        shift_ranges(list of str): Which alphabets to shift.
+        table(list of int): The frequency table of the plain text (see
+            :func:`frequency_table`). Defaults to English text.
+        bigrams(dict): The relative frequency of (lower case) letter pairs
+            in the plain text. Defaults to English letter pairs if ``table``
+            is omitted, letter pairs are not scored otherwise.
+
+    Returns:
+        list of tuple: ``(shift, result)`` tuples ordered from the best to
+            the worst scoring shift.
+
+    Example:
+        >>> from pwny import *
+        >>> caesar_brute('Wkh txlfn eurzq ira mxpsv ryhu wkh odcb grj', top=1)
+        [(23, 'The quick brown fox jumps over the lazy dog')]
+    """
+
+    if table is None:
+        table = ENGLISH_FREQUENCY_TABLE
+        if bigrams is None:
+            bigrams = ENGLISH_BIGRAM_FREQUENCY
+
+    period = 1
+    for s, e in _caesar_ranges(shift_ranges):
+        a, b = period, e - s + 1
+        while b:
+            a, b = b, a % b
+        period = period * (e - s + 1) // a
+
+    if isinstance(data, six.text_type):
+        codes = [ord(c) for c in data]
+    else:
+        codes = bytearray(data)
+    counts = list(Counter(codes).items())
+
+    # Score by log-likelihood, so a few rare characters outweigh many
+    # common ones (a plain frequency sum favours texts consisting of e's).
+    weights = [math.log(f + 1) for f in table]
+
+    # Single letter frequencies can't tell short texts apart, the letter
+    # pairs can.
+    pair_counts = []
+    if bigrams:
+        pair_weights = dict((pair, math.log(f)) for pair, f in bigrams.items())
+        pair_floor = math.log(BIGRAM_FREQUENCY_FLOOR)
+        pair_counts = [
+            (pair, n)
+            for pair, n in Counter(zip(codes, codes[1:])).items()
+            if all(c < 128 and chr(c).isalpha() for c in pair)
+        ]
+
+    scores = []
+    for shift in range(period):
+        text_table = _caesar_table(shift, shift_ranges)[0]
+        score = 0
+        for c, n in counts:
+            c = text_table.get(c, c)
+            score += n * (weights[c] if c < 256 else 0)
+        for (a, b), n in pair_counts:
+            pair = (chr(text_table.get(a, a)) + chr(text_table.get(b, b))).lower()
+            score += n * pair_weights.get(pair, pair_floor)
+        scores.append((score, shift))
+    scores.sort(key=lambda s_s: (-s_s[0], s_s[1]))
+
+    return [
+        (shift, caesar(shift, data, shift_ranges))
+        for _, shift in scores[:top]
+    ]
 
 
 rot13_encode = codecs.getencoder('rot-13')
@@ -131,6 +366,13 @@ Examples:
 """
 
 
+try:
+    binascii.hexlify(b'', ' ')
+    HEXLIFY_SEPARATOR = True
+except TypeError:
+    HEXLIFY_SEPARATOR = False
+
+
 def enhex(d, separator=''):
     """
     Convert bytes to their hexadecimal representation, optionally joined by a
@@ -151,6 +393,9 @@ def enhex(d, separator=''):
         '70 77 6e 79 70 61 63 6b'
     """
 
+    if separator and len(separator) == 1 and HEXLIFY_SEPARATOR:
+        return binascii.hexlify(d, separator).decode('ascii')
+
     v = binascii.hexlify(d).decode('ascii')
     if separator:
         return separator.join(
@@ -161,25 +406,570 @@ def enhex(d, separator=''):
         return v
 
 
-dehex_clean = re.compile('[^a-fA-F0-9]')
-dehex = lambda d: binascii.unhexlify(dehex_clean.sub('', d).encode('ascii'))
-dehex.__doc__ = """
-Convert a hexadecimal representation of a byte sequence to bytes. All
-non-hexadecimal characters will be removed from the input.
+def enhex_stream(chunks, separator=''):
+    """
+    Convert a stream of bytes to their hexadecimal representation,
+    optionally joined by a given separator.
 
-Args:
-    d(str): The string of hexadecimal tuples.
+    Args:
+        chunks(iterable of bytes): The chunks of data to convert to
+            hexadecimal representation.
+        separator(str): The separator to insert between hexadecimal tuples.
 
-Returns:
-    bytes: The byte sequence represented by ``d``.
+    Returns:
+        generator of str: The hexadecimal representation of each chunk.
+    """
 
-Examples:
-    >>> from pwny import *
-    >>> dehex('70776e797061636b')
-    b'pwnypack'
-    >>> dhex('70 77 6e 79 70 61 63 6b')
-    b'pwnypack'
-"""
+    first = True
+    for chunk in chunks:
+        if not len(chunk):
+            continue
+        if separator and not first:
+            yield separator
+        yield enhex(chunk, separator)
+        first = False
+
+
+HEXDUMP_READ_SIZE = 1 << 20
+HEXDUMP_ASCII = bytes(bytearray(c if 32 <= c < 127 else ord('.') for c in range(256)))
+
+
+def _hexdump_blocks(data, block_size):
+    """
+    Yield blocks of ``block_size`` bytes (except for the last one) from a
+    file-like object or a buffer.
+    """
+
+    if hasattr(data, 'read'):
+        pending = b''
+        while True:
+            chunk = data.read(HEXDUMP_READ_SIZE)
+            if not chunk:
+                break
+            chunk = pending + chunk
+            tail = len(chunk) - len(chunk) % block_size
+            pending = chunk[tail:]
+            if tail:
+                yield memoryview(chunk)[:tail]
+        if pending:
+            yield memoryview(pending)
+    else:
+        data = memoryview(data)
+        for offset in range(0, len(data), HEXDUMP_READ_SIZE - HEXDUMP_READ_SIZE % block_size):
+            yield data[offset:offset + HEXDUMP_READ_SIZE - HEXDUMP_READ_SIZE % block_size]
+
+
+class _HexdumpRange(object):
+    """
+    A file-like object that skips the first ``skip`` bytes of a stream and
+    then reads at most ``length`` bytes. Skipped data is read and discarded
+    in chunks of :data:`HEXDUMP_READ_SIZE` bytes.
+    """
+
+    def __init__(self, f, skip=0, length=None):
+        self.f = f
+        self.skip = skip
+        self.remaining = length
+
+    def read(self, n):
+        while self.skip:
+            chunk = self.f.read(min(self.skip, HEXDUMP_READ_SIZE))
+            if not chunk:
+                return b''
+            self.skip -= len(chunk)
+
+        if self.remaining is not None:
+            n = min(n, self.remaining)
+            if not n:
+                return b''
+        chunk = self.f.read(n)
+        if self.remaining is not None:
+            self.remaining -= len(chunk)
+        return chunk
+
+
+def hexdump(data, width=16, base=0, collapse=True):
+    """
+    Lazily produce a hexdump of a byte sequence, file or memory map in the
+    same format as ``hexdump -C``. Each line shows the offset, the
+    hexadecimal representation (in groups of 8 bytes) and the printable
+    characters of ``width`` bytes of data.
+
+    Args:
+        data(bytes or file): The data to dump. Can be any object that
+            supports the buffer protocol (like ``bytes``, ``memoryview`` or
+            ``mmap``) or a file-like object that will be read in chunks.
+        width(int): The number of bytes to show on each line.
+        base(int): The offset (or virtual address) of the first byte.
+        collapse(bool): Replace runs of identical lines with a single ``*``.
+
+    Returns:
+        generator of str: The lines of the hexdump. The last line contains
+            the offset just after the last byte.
+
+    Example:
+        >>> from pwny import *
+        >>> print('\\n'.join(hexdump(b'pwnypack' * 6)))
+        00000000  70 77 6e 79 70 61 63 6b  70 77 6e 79 70 61 63 6b  |pwnypackpwnypack|
+        *
+        00000030
+    """
+
+    if width < 1:
+        raise ValueError('Width should be at least 1')
+
+    hex_width = width * 3 - 1 + (width - 1) // 8
+    offset = base
+    previous = None
+    collapsed = False
+
+    for block in _hexdump_blocks(data, width):
+        block_hex = enhex(block, ' ') + ' '
+        block_ascii = block.tobytes().translate(HEXDUMP_ASCII).decode('ascii')
+        for i in range(0, len(block), width):
+            line = block_ascii[i:i + width]
+            if collapse and block[i:i + width] == previous:
+                if not collapsed:
+                    collapsed = True
+                    yield '*'
+            else:
+                collapsed = False
+                previous = block[i:i + width]
+                line_hex = block_hex[i * 3:(i + len(line)) * 3 - 1]
+                yield '%08x  %s  |%s|' % (
+                    offset,
+                    '  '.join(line_hex[j:j + 23] for j in range(0, len(line_hex), 24)).ljust(hex_width),
+                    line,
+                )
+            offset += len(line)
+
+    yield '%08x' % offset
+
+
+HEX_DIGITS = b'0123456789abcdefABCDEF'
+HEX_CLEAN = bytes(bytearray(c for c in range(256) if c not in bytearray(HEX_DIGITS)))
+
+
+class HexDecoder(object):
+    """
+    Incrementally convert hexadecimal representations of byte sequences to
+    bytes. All non-hexadecimal characters are removed from the input and hex
+    tuples that are split across chunks are reassembled. Only the
+    (cleaned) current chunk is kept in memory.
+
+    Example:
+        >>> from pwny import *
+        >>> decoder = HexDecoder()
+        >>> decoder.feed('70 77 6')
+        b'pw'
+        >>> decoder.feed(b'e 79')
+        b'ny'
+        >>> decoder.finish()
+        b''
+    """
+
+    def __init__(self):
+        self._pending = b''
+
+    def feed(self, chunk):
+        """
+        Decode a chunk of hexadecimal data.
+
+        Args:
+            chunk(str or bytes): The chunk of hexadecimal tuples.
+
+        Returns:
+            bytes: The bytes represented by all the complete hex tuples
+                received so far.
+        """
+
+        if isinstance(chunk, six.text_type):
+            chunk = chunk.encode('latin1', 'ignore')
+        elif not isinstance(chunk, (six.binary_type, bytearray)):
+            chunk = bytes(chunk)
+
+        chunk = chunk.translate(None, HEX_CLEAN)
+        if self._pending:
+            chunk = self._pending + chunk
+
+        if len(chunk) & 1:
+            self._pending = chunk[-1:]
+            chunk = chunk[:-1]
+        else:
+            self._pending = b''
+
+        return binascii.unhexlify(chunk)
+
+    def finish(self):
+        """
+        Signal the end of the input.
+
+        Returns:
+            bytes: Any remaining decoded bytes.
+
+        Raises:
+            binascii.Error: If the input ended with an incomplete hex tuple.
+        """
+
+        pending, self._pending = self._pending, b''
+        return binascii.unhexlify(pending)
+
+
+def dehex(d):
+    """
+    Convert a hexadecimal representation of a byte sequence to bytes. All
+    non-hexadecimal characters will be removed from the input.
+
+    Args:
+        d(str or bytes): The string of hexadecimal tuples.
+
+    Returns:
+        bytes: The byte sequence represented by ``d``.
+
+    Examples:
+        >>> from pwny import *
+        >>> dehex('70776e797061636b')
+        b'pwnypack'
+        >>> dehex('70 77 6e 79 70 61 63 6b')
+        b'pwnypack'
+    """
+
+    decoder = HexDecoder()
+    return decoder.feed(d) + decoder.finish()
+
+
+def dehex_stream(chunks):
+    """
+    Convert a stream of hexadecimal representations back to bytes using a
+    :class:`HexDecoder`.
+
+    Args:
+        chunks(iterable of str or bytes): The chunks of hexadecimal tuples.
+
+    Returns:
+        generator of bytes: The bytes represented by each chunk.
+
+    Raises:
+        binascii.Error: If the stream ends with an incomplete hex tuple.
+    """
+
+    decoder = HexDecoder()
+    for chunk in chunks:
+        yield decoder.feed(chunk)
+    decoder.finish()
+
+
+B64_ALPHABET = (string.ascii_uppercase + string.ascii_lowercase + string.digits + '+/').encode('ascii')
+B32_ALPHABET = (string.ascii_uppercase + '234567').encode('ascii')
+B85_ALPHABET = (
+    string.digits + string.ascii_uppercase + string.ascii_lowercase + '!#$%&()*+-;<=>?@^_`{|}~'
+).encode('ascii')
+
+
+_maketrans = bytes.maketrans if six.PY3 else string.maketrans
+
+
+#: The base-N codecs by alphabet size. Each codec is described by its
+#: standard alphabet, the number of bytes and characters in a quantum, its
+#: padding character and its encode and decode functions (which operate on
+#: complete quanta using the standard alphabet).
+BASE_N_CODECS = {
+    64: (B64_ALPHABET, 3, 4, b'=', base64.b64encode, binascii.a2b_base64),
+    32: (B32_ALPHABET, 5, 8, b'=', base64.b32encode, base64.b32decode),
+}
+if hasattr(base64, 'b85encode'):
+    BASE_N_CODECS[85] = (B85_ALPHABET, 4, 5, None, base64.b85encode, base64.b85decode)
+
+#: The alphabets of the named base-N variants.
+BASE_N_VARIANTS = {
+    'b64': B64_ALPHABET,
+    'b64url': B64_ALPHABET[:-2] + b'-_',
+    'b32': B32_ALPHABET,
+    'b85': B85_ALPHABET,
+}
+
+
+def _base_n_variant(variant):
+    """
+    Look up a base-N variant by name or by custom alphabet. Returns the
+    parameters of the codec, the translation tables to and from the
+    codec's standard alphabet and the characters that are not part of the
+    alphabet.
+    """
+
+    alphabet = BASE_N_VARIANTS.get(variant)
+    if alphabet is None:
+        alphabet = variant.encode('latin1') if isinstance(variant, six.text_type) else bytes(variant)
+        if len(set(bytearray(alphabet))) != len(alphabet):
+            raise ValueError('Custom alphabet contains duplicate characters')
+
+    params = BASE_N_CODECS.get(len(alphabet))
+    if params is None:
+        raise ValueError('Unknown or unsupported base-N variant: %r' % variant)
+
+    canonical, pad = params[0], params[3]
+    if pad is not None and pad in alphabet:
+        raise ValueError('Custom alphabet contains the padding character')
+    if alphabet == canonical:
+        encode_table = decode_table = None
+    else:
+        encode_table = _maketrans(canonical, alphabet)
+        decode_table = _maketrans(alphabet, canonical)
+    delete = bytes(bytearray(c for c in range(256) if c not in bytearray(alphabet)))
+
+    return params, encode_table, decode_table, delete
+
+
+class BaseEncoder(object):
+    """
+    Incrementally encode bytes using one of the base-N encodings. Bytes that
+    do not fill a complete quantum are carried over to the next chunk.
+
+    Supported variants are ``b64`` (standard base64), ``b64url`` (URL and
+    filename safe base64), ``b32`` (base32) and ``b85`` (base85, python 3
+    only). Alternatively, a custom alphabet of 64, 32 or 85 characters can
+    be provided.
+
+    Args:
+        variant(str or bytes): The name of the variant or a custom alphabet.
+        padding(bool): Whether to pad the final quantum.
+
+    Example:
+        >>> from pwny import *
+        >>> encoder = BaseEncoder('b64url')
+        >>> encoder.feed(b'\\xfb\\xff')
+        b''
+        >>> encoder.feed(b'\\xfepwnypack')
+        b'-__-cHdueXBh'
+        >>> encoder.finish()
+        b'Y2s='
+    """
+
+    def __init__(self, variant='b64', padding=True):
+        params, self._table, _, _ = _base_n_variant(variant)
+        _, self._raw_size, self._enc_size, self._pad, self._encode, _ = params
+        self._padding = padding
+        self._pending = b''
+
+    def _encode_quanta(self, data):
+        result = self._encode(data)
+        if self._table is not None:
+            result = result.translate(self._table)
+        return result
+
+    def feed(self, chunk):
+        """
+        Encode a chunk of data.
+
+        Args:
+            chunk(bytes): The chunk of data to encode.
+
+        Returns:
+            bytes: The encoded representation of all the complete quanta
+                received so far.
+        """
+
+        chunk = memoryview(chunk)
+        result = b''
+
+        if self._pending:
+            need = self._raw_size - len(self._pending)
+            head, chunk = self._pending + chunk[:need].tobytes(), chunk[need:]
+            if len(head) < self._raw_size:
+                self._pending = head
+                return b''
+            result = self._encode_quanta(head)
+
+        tail = len(chunk) - len(chunk) % self._raw_size
+        self._pending = chunk[tail:].tobytes()
+        if tail:
+            data = self._encode_quanta(chunk[:tail])
+            result = result + data if result else data
+        return result
+
+    def finish(self):
+        """
+        Signal the end of the input.
+
+        Returns:
+            bytes: The encoded (and optionally padded) final quantum.
+        """
+
+        pending, self._pending = self._pending, b''
+        if not pending:
+            return b''
+        result = self._encode_quanta(pending)
+        if self._pad is not None and not self._padding:
+            result = result.rstrip(self._pad)
+        return result
+
+
+class BaseDecoder(object):
+    """
+    Incrementally decode base-N encoded data. Characters that are not part
+    of the alphabet (like whitespace and padding) are discarded and
+    incomplete quanta are carried over to the next chunk. The padding of the
+    final quantum is repaired. Note that this means that the padding in the
+    middle of the concatenation of multiple encoded values is ignored.
+
+    See :class:`BaseEncoder` for the supported variants. Chunks can be
+    :class:`str`, :class:`bytes` or any other object supporting the buffer
+    protocol, making it possible to decode data as it is received from a
+    :class:`~pwnypack.flow.Flow`.
+
+    Args:
+        variant(str or bytes): The name of the variant or a custom alphabet.
+
+    Example:
+        >>> from pwny import *
+        >>> decoder = BaseDecoder()
+        >>> decoder.feed('cHdueX\\nBhY2s')
+        b'pwnypa'
+        >>> decoder.finish()
+        b'ck'
+    """
+
+    def __init__(self, variant='b64'):
+        params, _, self._table, self._delete = _base_n_variant(variant)
+        _, _, self._enc_size, self._pad, _, self._decode = params
+        self._pending = b''
+
+    def feed(self, chunk):
+        """
+        Decode a chunk of base-N encoded data.
+
+        Args:
+            chunk(str or bytes): The chunk of encoded data.
+
+        Returns:
+            bytes: The bytes represented by all the complete quanta received
+                so far.
+        """
+
+        if isinstance(chunk, six.text_type):
+            chunk = chunk.encode('latin1', 'ignore')
+        elif not isinstance(chunk, (six.binary_type, bytearray)):
+            chunk = memoryview(chunk).tobytes()
+
+        chunk = chunk.translate(self._table, self._delete)
+        if self._pending:
+            chunk = self._pending + chunk
+
+        tail = len(chunk) - len(chunk) % self._enc_size
+        if tail == len(chunk):
+            self._pending = b''
+        else:
+            self._pending = chunk[tail:]
+            chunk = memoryview(chunk)[:tail]
+        return self._decode(chunk) if tail else b''
+
+    def finish(self):
+        """
+        Signal the end of the input.
+
+        Returns:
+            bytes: The bytes represented by the final (repaired) quantum.
+
+        Raises:
+            binascii.Error: If the final quantum is invalid.
+        """
+
+        pending, self._pending = self._pending, b''
+        if not pending:
+            return b''
+        if self._pad is not None:
+            pending += self._pad * (-len(pending) % self._enc_size)
+        return self._decode(pending)
+
+
+def enbase(d, variant='b64', padding=True):
+    """
+    Encode bytes using one of the base-N encodings. See :class:`BaseEncoder`
+    for the supported variants.
+
+    Args:
+        d(bytes): The data to encode.
+        variant(str or bytes): The name of the variant or a custom alphabet.
+        padding(bool): Whether to pad the final quantum.
+
+    Returns:
+        str: The encoded representation of ``d``.
+
+    Example:
+        >>> from pwny import *
+        >>> enbase(b'pwnypack', 'b32')
+        'OB3W46LQMFRWW==='
+    """
+
+    encoder = BaseEncoder(variant, padding)
+    return (encoder.feed(d) + encoder.finish()).decode('latin1')
+
+
+def debase(d, variant='b64'):
+    """
+    Decode base-N encoded data, ignoring characters that are not part of the
+    alphabet and repairing missing padding. See :class:`BaseEncoder` for the
+    supported variants.
+
+    Args:
+        d(str or bytes): The encoded data.
+        variant(str or bytes): The name of the variant or a custom alphabet.
+
+    Returns:
+        bytes: The bytes represented by ``d``.
+
+    Example:
+        >>> from pwny import *
+        >>> debase('OB3W46LQMFRWW', 'b32')
+        b'pwnypack'
+    """
+
+    decoder = BaseDecoder(variant)
+    return decoder.feed(d) + decoder.finish()
+
+
+def enbase_stream(chunks, variant='b64', padding=True):
+    """
+    Encode a stream of bytes using a :class:`BaseEncoder`.
+
+    Args:
+        chunks(iterable of bytes): The chunks of data to encode.
+        variant(str or bytes): The name of the variant or a custom alphabet.
+        padding(bool): Whether to pad the final quantum.
+
+    Returns:
+        generator of bytes: The encoded representation of the stream.
+    """
+
+    encoder = BaseEncoder(variant, padding)
+    for chunk in chunks:
+        result = encoder.feed(chunk)
+        if result:
+            yield result
+    result = encoder.finish()
+    if result:
+        yield result
+
+
+def debase_stream(chunks, variant='b64'):
+    """
+    Decode a stream of base-N encoded data using a :class:`BaseDecoder`.
+
+    Args:
+        chunks(iterable of str or bytes): The chunks of encoded data.
+        variant(str or bytes): The name of the variant or a custom alphabet.
+
+    Returns:
+        generator of bytes: The decoded bytes.
+
+    Raises:
+        binascii.Error: If the stream ends with an invalid quantum.
+    """
+
+    decoder = BaseDecoder(variant)
+    for chunk in chunks:
+        yield decoder.feed(chunk)
+    yield decoder.finish()
 
 
 enb64 = lambda d: base64.b64encode(d).decode('ascii')
@@ -199,21 +989,61 @@ Example:
 """
 
 
-deb64 = lambda d: base64.b64decode(d.encode('ascii'))
-deb64.__doc__ = """
-Convert a base64 representation back to its original bytes.
+def deb64(d):
+    """
+    Convert a base64 representation back to its original bytes. Characters
+    that are not part of the base64 alphabet are ignored and missing padding
+    is repaired.
 
-Args:
-    d(str): The base64 representation to decode.
+    Args:
+        d(str or bytes): The base64 representation to decode.
 
-Returns:
-    bytes: The bytes represented by ``d``.
+    Returns:
+        bytes: The bytes represented by ``d``.
 
-Example:
-    >>> from pwny import *
-    >>> deb64('cHdueXBhY2s=')
-    b'pwnypack'
-"""
+    Example:
+        >>> from pwny import *
+        >>> deb64('cHdueXBhY2s=')
+        b'pwnypack'
+    """
+
+    return debase(d)
+
+
+def enb64_stream(chunks):
+    """
+    Convert a stream of bytes to its base64 representation. Bytes that do not
+    fill a complete base64 quantum are carried over to the next chunk.
+
+    Args:
+        chunks(iterable of bytes): The chunks of data to convert.
+
+    Returns:
+        generator of str: The base64 representation of the stream.
+    """
+
+    for chunk in enbase_stream(chunks):
+        yield chunk.decode('ascii')
+
+
+def deb64_stream(chunks):
+    """
+    Convert a stream of base64 representations back to its original bytes.
+    Characters that are not part of the base64 alphabet are discarded,
+    incomplete base64 quanta are carried over to the next chunk and missing
+    padding is repaired.
+
+    Args:
+        chunks(iterable of str or bytes): The chunks of base64 data.
+
+    Returns:
+        generator of bytes: The decoded bytes.
+
+    Raises:
+        binascii.Error: If the stream ends with an invalid quantum.
+    """
+
+    return debase_stream(chunks)
 
 
 def enurlform(q):
@@ -306,6 +1136,200 @@ Example:
 """
 
 
+ENGLISH_LETTER_FREQUENCY = {
+    'a': 817, 'b': 129, 'c': 278, 'd': 425, 'e': 1270, 'f': 223, 'g': 202, 'h': 609, 'i': 697, 'j': 15,
+    'k': 77, 'l': 403, 'm': 241, 'n': 675, 'o': 751, 'p': 193, 'q': 10, 'r': 599, 's': 633, 't': 906,
+    'u': 276, 'v': 98, 'w': 236, 'x': 15, 'y': 197, 'z': 7,
+}
+
+
+def _english_frequency_table():
+    table = [0] * 256
+    for c in range(32, 127):
+        table[c] = 5
+    for c in '0123456789.,\'"-:;!?()\n':
+        table[ord(c)] = 60
+    table[ord(' ')] = 1500
+    for c, f in ENGLISH_LETTER_FREQUENCY.items():
+        table[ord(c)] = f
+        table[ord(c.upper())] = f // 8 + 1
+    return table
+
+
+ENGLISH_FREQUENCY_TABLE = _english_frequency_table()
+"""
+The relative frequency of each byte value in English text. Used as the
+default frequency table by the cryptanalysis functions.
+"""
+
+
+ENGLISH_BIGRAM_FREQUENCY = {
+    'th': 356, 'he': 307, 'in': 243, 'er': 205, 'an': 199, 're': 185, 'on': 176, 'at': 149, 'en': 145, 'nd': 135,
+    'ti': 134, 'es': 134, 'or': 128, 'te': 120, 'of': 117, 'ed': 117, 'is': 113, 'it': 112, 'al': 109, 'ar': 107,
+    'st': 105, 'to': 104, 'nt': 104, 'ng': 95, 'se': 93, 'ha': 93, 'as': 87, 'ou': 87, 'io': 83, 'le': 83,
+    've': 83, 'co': 79, 'me': 79, 'de': 76, 'hi': 76, 'ri': 73, 'ro': 73, 'ic': 70, 'ne': 69, 'ea': 69,
+    'ra': 69, 'ce': 65, 'li': 62, 'ch': 60, 'll': 58, 'be': 58, 'ma': 57, 'si': 55, 'om': 55, 'ur': 54,
+}
+"""
+The relative frequency (per 10000 letter pairs) of the 50 most common letter
+pairs in English text. Used by :func:`caesar_brute`.
+"""
+
+BIGRAM_FREQUENCY_FLOOR = 20
+"""
+The relative frequency assumed for letter pairs that are missing from a
+letter pair frequency table.
+"""
+
+
+def frequency_table(sample):
+    """
+    Build a frequency table that can be used to score candidate plain texts
+    from a sample of representative data.
+
+    Args:
+        sample(bytes): The data to base the frequency table on.
+
+    Returns:
+        list of int: The relative frequency of each byte value (0-10000).
+    """
+
+    sample = bytearray(sample)
+    counts = Counter(sample)
+    total = len(sample) or 1
+    return [counts.get(c, 0) * 10000 // total for c in range(256)]
+
+
+_SCORE_LANES = struct.Struct('>256Q')
+SCORE_ROWS_CACHE_SIZE = 8
+_score_rows_cache = OrderedDict()
+_POPCOUNT = bytes(bytearray(bin(c).count('1') for c in range(256)))
+
+
+def _score_rows(table):
+    """
+    Pack the frequency table into 256 wide integers, one for each byte value
+    ``b``. Lane ``k`` of row ``b`` holds the score of ``b ^ k``. This allows
+    scoring all 256 single byte keys at once by adding up rows.
+    """
+
+    table = tuple(table)
+    rows = _score_rows_cache.pop(table, None)
+    if rows is None:
+        rows = [
+            _bytes_to_int(_SCORE_LANES.pack(*[table[b ^ k] for k in range(256)]))
+            for b in range(256)
+        ]
+        if len(_score_rows_cache) >= SCORE_ROWS_CACHE_SIZE:
+            _score_rows_cache.popitem(last=False)
+    _score_rows_cache[table] = rows
+    return rows
+
+
+def _score_keys(data, rows):
+    total = 0
+    for b, count in Counter(bytearray(data)).items():
+        total += count * rows[b]
+    return _SCORE_LANES.unpack(_int_to_bytes(total, _SCORE_LANES.size))
+
+
+def _xor_crack_key(data, key_len, rows):
+    key = bytearray()
+    score = 0
+    for i in range(key_len):
+        scores = _score_keys(data[i::key_len], rows)
+        key_score = max(scores)
+        key.append(scores.index(key_score))
+        score += key_score
+    return bytes(key), score
+
+
+XOR_CRACK_TOLERANCE = 0.95
+
+
+def xor_key_lengths(data, max_key_len=40):
+    """
+    Rank the candidate lengths of the repeating key ``data`` was xor
+    encrypted with. For every candidate length *n*, the normalized Hamming
+    distance between ``data`` and ``data`` shifted by *n* bytes is
+    calculated. For the right key length the key cancels out and the
+    distance will be that of the plain text with itself.
+
+    Args:
+        data(bytes): The encrypted data.
+        max_key_len(int): The maximum key length to consider.
+
+    Returns:
+        list of tuple: ``(key_len, distance)`` tuples, ordered from the most
+            to the least likely key length.
+    """
+
+    data = bytes(data)
+    lengths = []
+    for key_len in range(1, min(max_key_len, len(data) - 1) + 1):
+        counts = _xor_block(data[key_len:], data[:-key_len]).translate(_POPCOUNT)
+        bits = sum(n * counts.count(six.int2byte(n)) for n in range(1, 9))
+        lengths.append((key_len, bits / (8.0 * (len(data) - key_len))))
+    lengths.sort(key=lambda l_d: (l_d[1], l_d[0]))
+    return lengths
+
+
+def xor_crack(data, key_len=None, max_key_len=40, candidates=3, table=None):
+    """
+    Recover the repeating key ``data`` was xor encrypted with.
+
+    The most likely key lengths are determined using :func:`xor_key_lengths`.
+    For each key length, the data is split in columns that were encrypted
+    with the same key byte. All 256 candidate key bytes of a column are
+    scored at once against the frequency table. The key that produces the
+    highest scoring plain text wins, unless a key with a length that divides
+    the winning key's length scores nearly as well.
+
+    Args:
+        data(bytes): The encrypted data.
+        key_len(int): The key length, if known.
+        max_key_len(int): The maximum key length to consider.
+        candidates(int): The number of most likely key lengths to try.
+        table(list of int): The frequency table of the plain text (see
+            :func:`frequency_table`). Defaults to English text.
+
+    Returns:
+        bytes: The most likely key.
+
+    Example:
+        >>> from pwny import *
+        >>> data = xor(b'pwny', b'The quick brown fox jumps over the lazy dog.')
+        >>> xor_crack(data)
+        b'pwny'
+    """
+
+    data = bytes(data)
+    if not data:
+        raise ValueError('No data to analyse')
+
+    rows = _score_rows(ENGLISH_FREQUENCY_TABLE if table is None else table)
+
+    if key_len is not None:
+        key_lens = [key_len]
+    else:
+        key_lens = [l for l, _ in xor_key_lengths(data, max_key_len)[:candidates]] or [1]
+
+    best_key, best_score = max(
+        (_xor_crack_key(data, key_len, rows) for key_len in sorted(key_lens)),
+        key=lambda k_s: k_s[1],
+    )
+
+    # A longer key can always match the plain text at least as well as any
+    # of its divisors. Prefer the shortest period that scores nearly as well.
+    for period in range(1, len(best_key)):
+        if len(best_key) % period == 0:
+            key, score = _xor_crack_key(data, period, rows)
+            if score >= best_score * XOR_CRACK_TOLERANCE:
+                return key
+
+    return best_key
+
+
 @pwnypack.main.register('xor')
 def xor_app(parser, cmd, args):  # pragma: no cover
     """
@@ -328,33 +1352,96 @@ def xor_app(parser, cmd, args):  # pragma: no cover
     )
     parser.add_argument('key', help='the key to xor the value with')
     parser.add_argument('value', help='the value to xor, read from stdin if omitted', nargs='?')
+    pwnypack.main.add_stream_argument(parser)
 
     args = parser.parse_args(args)
     if args.type is not None:
         args.key = args.type(args.key)
+    else:
+        args.key = pwnypack.main.binary_value_or_stdin(args.key)
 
+    if args.stream:
+        return xor_stream(args.key, pwnypack.main.binary_chunks_or_stdin(args.value))
     return xor(args.key, pwnypack.main.binary_value_or_stdin(args.value))
 
 
+@pwnypack.main.register('xor-crack')
+def xor_crack_app(parser, cmd, args):  # pragma: no cover
+    """
+    Recover the repeating key a value was xor encrypted with.
+    """
+
+    parser.add_argument('value', help='the value to analyse, read from stdin if omitted', nargs='?')
+    parser.add_argument('-l', '--key-len', type=int, help='the length of the key (guessed if omitted)')
+    parser.add_argument('-m', '--max-key-len', type=int, default=40, help='the maximum key length to try')
+    parser.add_argument(
+        '-c', '--candidates',
+        type=int,
+        default=3,
+        help='the number of most likely key lengths to try',
+    )
+    parser.add_argument(
+        '-t', '--table',
+        help='a file containing sample plain text to build the frequency table from (defaults to English)',
+    )
+    parser.add_argument(
+        '-p', '--plaintext',
+        action='store_true',
+        help='output the decrypted value instead of the key',
+    )
+    args = parser.parse_args(args)
+
+    data = pwnypack.main.binary_value_or_stdin(args.value)
+
+    if args.table is not None:
+        with open(args.table, 'rb') as f:
+            table = frequency_table(f.read())
+    else:
+        table = None
+
+    key = xor_crack(data, args.key_len, args.max_key_len, args.candidates, table)
+    if args.plaintext:
+        return xor(key, data)
+    else:
+        return key
+
+
 @pwnypack.main.register('caesar')
 def caesar_app(parser, cmd, args):  # pragma: no cover
     """
     Caesar crypt a value with a key.
     """
 
-    parser.add_argument('shift', type=int, help='the shift to apply')
-    parser.add_argument('value', help='the value to caesar crypt, read from stdin if omitted', nargs='?')
     parser.add_argument(
         '-s', '--shift-range',
         dest='shift_ranges',
         action='append',
         help='specify a character range to shift (defaults to a-z, A-Z)'
     )
+    parser.add_argument(
+        '-a', '--all',
+        action='store_true',
+        help='apply all shifts, best matching English text first',
+    )
+    parser.add_argument('-t', '--top', type=int, help='only show the best scoring shifts (implies --all)')
+
+    # There is no shift argument when applying all shifts.
+    brute = argparse.ArgumentParser(add_help=False)
+    brute.add_argument('-a', '--all', action='store_true')
+    brute.add_argument('-t', '--top', type=int)
+    brute_args, _ = brute.parse_known_args(args)
+    if not brute_args.all and brute_args.top is None:
+        parser.add_argument('shift', type=int, help='the shift to apply')
+    parser.add_argument('value', help='the value to caesar crypt, read from stdin if omitted', nargs='?')
 
     args = parser.parse_args(args)
     if not args.shift_ranges:
         args.shift_ranges = ['az', 'AZ']
 
+    if args.all or args.top is not None:
+        results = caesar_brute(pwnypack.main.string_value_or_stdin(args.value), args.top, args.shift_ranges)
+        return '\n'.join('%d: %s' % (shift, result) for shift, result in results)
+
     return caesar(args.shift, pwnypack.main.string_value_or_stdin(args.value), args.shift_ranges)
 
 
@@ -376,7 +1463,10 @@ def enb64_app(parser, cmd, args):  # pragma: no cover
     """
 
     parser.add_argument('value', help='the value to base64 encode, read from stdin if omitted', nargs='?')
+    pwnypack.main.add_stream_argument(parser)
     args = parser.parse_args(args)
+    if args.stream:
+        return enb64_stream(pwnypack.main.binary_chunks_or_stdin(args.value))
     return enb64(pwnypack.main.binary_value_or_stdin(args.value))
 
 
@@ -387,10 +1477,58 @@ def deb64_app(parser, cmd, args):  # pragma: no cover
     """
 
     parser.add_argument('value', help='the value to base64 decode, read from stdin if omitted', nargs='?')
+    pwnypack.main.add_stream_argument(parser)
     args = parser.parse_args(args)
+    if args.stream:
+        return deb64_stream(pwnypack.main.binary_chunks_or_stdin(args.value))
     return deb64(pwnypack.main.string_value_or_stdin(args.value))
 
 
+def _base_n_variant_argument(parser):
+    parser.add_argument(
+        '-V', '--variant',
+        default='b64',
+        help='the variant (%s) or a custom alphabet, defaults to b64' % ', '.join(sorted(BASE_N_VARIANTS)),
+    )
+
+
+@pwnypack.main.register('enbase')
+def enbase_app(parser, cmd, args):  # pragma: no cover
+    """
+    base-N (base64, base32, base85) encode a value.
+    """
+
+    parser.add_argument('value', help='the value to encode, read from stdin if omitted', nargs='?')
+    _base_n_variant_argument(parser)
+    parser.add_argument('-P', '--no-padding', dest='padding', action='store_false', help='don\'t pad the output')
+    pwnypack.main.add_stream_argument(parser)
+    args = parser.parse_args(args)
+    try:
+        if args.stream:
+            return enbase_stream(pwnypack.main.binary_chunks_or_stdin(args.value), args.variant, args.padding)
+        return enbase(pwnypack.main.binary_value_or_stdin(args.value), args.variant, args.padding)
+    except ValueError as e:
+        parser.error(str(e))
+
+
+@pwnypack.main.register('debase')
+def debase_app(parser, cmd, args):  # pragma: no cover
+    """
+    base-N (base64, base32, base85) decode a value.
+    """
+
+    parser.add_argument('value', help='the value to decode, read from stdin if omitted', nargs='?')
+    _base_n_variant_argument(parser)
+    pwnypack.main.add_stream_argument(parser)
+    args = parser.parse_args(args)
+    try:
+        if args.stream:
+            return debase_stream(pwnypack.main.binary_chunks_or_stdin(args.value), args.variant)
+        return debase(pwnypack.main.binary_value_or_stdin(args.value), args.variant)
+    except ValueError as e:
+        parser.error(str(e))
+
+
 @pwnypack.main.register('enhex')
 def enhex_app(parser, cmd, args):  # pragma: no cover
     """
@@ -403,10 +1541,68 @@ def enhex_app(parser, cmd, args):  # pragma: no cover
         default='',
         help='the separator to place between hex tuples'
     )
+    pwnypack.main.add_stream_argument(parser)
     args = parser.parse_args(args)
+    if args.stream:
+        return enhex_stream(pwnypack.main.binary_chunks_or_stdin(args.value), args.separator)
     return enhex(pwnypack.main.binary_value_or_stdin(args.value), args.separator)
 
 
+@pwnypack.main.register('hexdump')
+def hexdump_app(parser, cmd, args):  # pragma: no cover
+    """
+    Show a hexdump of a file.
+    """
+
+    parser.add_argument('file', help='the file to dump, read from stdin if omitted', nargs='?')
+    parser.add_argument('-w', '--width', type=int, default=16, help='the number of bytes to show on each line')
+    parser.add_argument(
+        '-b', '--base',
+        type=lambda v: int(v, 0),
+        default=0,
+        help='the address of the start of the file (f.e. an ELF virtual address)',
+    )
+    parser.add_argument('-s', '--skip', type=lambda v: int(v, 0), default=0, help='skip this many bytes of input')
+    parser.add_argument('-l', '--length', type=lambda v: int(v, 0), help='only dump this many bytes of input')
+    parser.add_argument(
+        '-v', '--no-collapse',
+        dest='collapse',
+        action='store_false',
+        help='show all lines instead of collapsing identical lines',
+    )
+    args = parser.parse_args(args)
+
+    if args.file is None:
+        data = io.open(sys.stdin.fileno(), mode='rb', closefd=False)
+    else:
+        data = io.open(args.file, mode='rb')
+        # Files that report a size of zero (f.e. /proc entries) can still
+        # contain data, those are read as a stream instead of mapped.
+        if os.fstat(data.fileno()).st_size:
+            with data:
+                data = memoryview(mmap.mmap(data.fileno(), 0, access=mmap.ACCESS_READ))
+            end = args.skip + args.length if args.length is not None else None
+            data = data[args.skip:end]
+
+    if not isinstance(data, memoryview):
+        data = _HexdumpRange(data, args.skip, args.length)
+
+    # Every batch of lines ends with a new line, including the last one.
+    parser.set_defaults(no_newline=True)
+
+    def lines():
+        batch = []
+        for line in hexdump(data, args.width, args.base + args.skip, args.collapse):
+            batch.append(line)
+            if len(batch) == 4096:
+                yield '\n'.join(batch) + '\n'
+                batch = []
+        if batch:
+            yield '\n'.join(batch) + '\n'
+
+    return lines()
+
+
 @pwnypack.main.register('dehex')
 def dehex_app(parser, cmd, args):  # pragma: no cover
     """
@@ -414,7 +1610,10 @@ def dehex_app(parser, cmd, args):  # pragma: no cover
     """
 
     parser.add_argument('value', help='the value to base64 decode, read from stdin if omitted', nargs='?')
+    pwnypack.main.add_stream_argument(parser)
     args = parser.parse_args(args)
+    if args.stream:
+        return dehex_stream(pwnypack.main.binary_chunks_or_stdin(args.value))
     return dehex(pwnypack.main.string_value_or_stdin(args.value))
 
 
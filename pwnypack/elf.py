@@ -6,7 +6,7 @@ ELF files.
 from __future__ import print_function
 
 from pwnypack.target import Target
-from pwnypack.packing import U16, U32, unpack, pack_size
+from pwnypack.packing import U16, U32, unpack, record
 import pwnypack.main
 from enum import IntEnum
 
@@ -16,6 +16,88 @@ __all__ = [
 ]
 
 
+_Header = record('Header', [
+    ('entry', 'P'),
+    ('phoff', 'P'),
+    ('shoff', 'P'),
+    ('flags', 'I'),
+    ('hsize', 'H'),
+    ('phentsize', 'H'),
+    ('phnum', 'H'),
+    ('shentsize', 'H'),
+    ('shnum', 'H'),
+    ('shstrndx', 'H'),
+])
+
+_ProgramHeader32 = record('ProgramHeader32', [
+    ('type_id', 'I'),
+    ('offset', 'I'),
+    ('vaddr', 'I'),
+    ('paddr', 'I'),
+    ('filesz', 'I'),
+    ('memsz', 'I'),
+    ('flags', 'I'),
+    ('align', 'I'),
+])
+
+_ProgramHeader64 = record('ProgramHeader64', [
+    ('type_id', 'I'),
+    ('flags', 'I'),
+    ('offset', 'Q'),
+    ('vaddr', 'Q'),
+    ('paddr', 'Q'),
+    ('filesz', 'Q'),
+    ('memsz', 'Q'),
+    ('align', 'Q'),
+])
+
+_SectionHeader = record('SectionHeader', [
+    ('name_index', 'I'),
+    ('type_id', 'I'),
+    ('flags', 'P'),
+    ('addr', 'P'),
+    ('offset', 'P'),
+    ('size', 'P'),
+    ('link', 'I'),
+    ('info', 'I'),
+    ('addralign', 'P'),
+    ('entsize', 'P'),
+])
+
+_Symbol32 = record('Symbol32', [
+    ('name_index', 'I'),
+    ('value', 'I'),
+    ('size', 'I'),
+    ('info', 'B'),
+    ('other', 'B'),
+    ('shndx', 'H'),
+])
+
+_Symbol64 = record('Symbol64', [
+    ('name_index', 'I'),
+    ('info', 'B'),
+    ('other', 'B'),
+    ('shndx', 'H'),
+    ('value', 'Q'),
+    ('size', 'Q'),
+])
+
+_DynamicSectionEntry32 = record('DynamicSectionEntry32', [
+    ('type_id', 'i'),
+    ('value', 'I'),
+])
+
+_DynamicSectionEntry64 = record('DynamicSectionEntry64', [
+    ('type_id', 'Q'),
+    ('value', 'Q'),
+])
+
+
+def _c_string(strs, index):
+    end = strs.find('\0', index)
+    return strs[index:end] if end != -1 else strs[index:]
+
+
 class ELF(Target):
     """
     A parser for ELF files. Upon parsing the ELF headers, it will not only
@@ -83,37 +165,9 @@ class ELF(Target):
         align = None    #: The alignment of the segment.
 
         def __init__(self, elf, data):
-            if elf.bits == 32:
-                fmt = 'IIIIIIII'
-                fmt_fields = [
-                    'type_id',
-                    'offset',
-                    'vaddr',
-                    'paddr',
-                    'filesz',
-                    'memsz',
-                    'flags',
-                    'align',
-                ]
-            else:
-                fmt = 'IIQQQQQQ'
-                fmt_fields = [
-                    'type_id',
-                    'flags',
-                    'offset',
-                    'vaddr',
-                    'paddr',
-                    'filesz',
-                    'memsz',
-                    'align',
-                ]
-            fmt_size = pack_size(fmt)
-
-            for key, value in zip(
-                fmt_fields,
-                unpack(fmt, data[:fmt_size], target=elf)
-            ):
-                setattr(self, key, value)
+            header = (_ProgramHeader32 if elf.bits == 32 else _ProgramHeader64)._unpack(data, target=elf)
+            for key in header._fields:
+                setattr(self, key, getattr(header, key))
 
             try:
                 self.type = self.Type(self.type_id)
@@ -205,28 +259,9 @@ class ELF(Target):
         def __init__(self, elf, data):
             self.elf = elf
 
-            if elf.bits == 32:
-                fmt = 'IIIIIIIIII'
-            else:
-                fmt = 'IIQQQQIIQQ'
-            fmt_size = pack_size(fmt)
-
-            for key, value in zip(
-                [
-                    'name_index',
-                    'type_id',
-                    'flags',
-                    'addr',
-                    'offset',
-                    'size',
-                    'link',
-                    'info',
-                    'addralign',
-                    'entsize',
-                ],
-                unpack(fmt, data[:fmt_size], target=elf)
-            ):
-                setattr(self, key, value)
+            header = _SectionHeader._unpack(data, target=elf)
+            for key in header._fields:
+                setattr(self, key, getattr(header, key))
 
             try:
                 self.type = self.Type(self.type_id)
@@ -320,23 +355,16 @@ class ELF(Target):
         def __init__(self, elf, data, strs):
             self.elf = elf
 
-            if elf.bits == 32:
-                fmt = 'IIIBBH'
-            else:
-                fmt = 'IBBHQQ'
-
-            if elf.bits == 32:
-                self.name_index, self.value, self.size, self.info, self.other, self.shndx = \
-                    unpack(fmt, data, target=elf)
-            else:
-                self.name_index, self.info, self.other, self.shndx, self.value, self.size = \
-                    unpack(fmt, data, target=elf)
+            if not isinstance(data, (_Symbol32, _Symbol64)):
+                data = (_Symbol32 if elf.bits == 32 else _Symbol64)._unpack(data, target=elf)
+            self.name_index, self.value, self.size, self.info, self.other, self.shndx = \
+                data.name_index, data.value, data.size, data.info, data.other, data.shndx
 
             self.type_id = self.info & 15
             self.binding = self.Binding(self.info >> 4)
             self.visibility = self.Visibility(self.other & 3)
 
-            self.name = strs[self.name_index:].split('\0', 1)[0]
+            self.name = _c_string(strs, self.name_index)
 
             try:
                 self.type = self.Type(self.type_id)
@@ -743,15 +771,9 @@ class ELF(Target):
         self.bits = 32 * word_size
         self.endian = endian
 
-        if self.bits == 32:
-            fmt = 'IIIIHHHHHH'
-        else:
-            fmt = 'QQQIHHHHHH'
-
-        fmt_size = pack_size(fmt)
-        (self.entry, self.phoff, self.shoff, self.flags, self.hsize, self.phentsize,
-            self.phnum, self.shentsize, self.shnum, self.shstrndx) = \
-            unpack(fmt, data[:fmt_size], target=self)
+        header = _Header._unpack(data, target=self)
+        for key in header._fields:
+            setattr(self, key, getattr(header, key))
 
     def parse_file(self, f):
         """
@@ -822,7 +844,7 @@ class ELF(Target):
             section_strings = strings_section.content.decode('ascii')
             for section_header in self._section_headers_by_index:
                 name_index = section_header.name_index
-                section_header.name = name = section_strings[name_index:].split('\0', 1)[0]
+                section_header.name = name = _c_string(section_strings, name_index)
                 self._section_headers_by_name[name] = section_header
 
     @property
@@ -855,18 +877,12 @@ class ELF(Target):
             return self._section_headers_by_name[section]
 
     def _parse_symbols(self, syms, strs):
-        symbols = []
-        if self.bits == 32:
-            fmt = 'IIIBBH'
-        else:
-            fmt = 'IBBHQQ'
-        fmt_size = pack_size(fmt)
-
-        while syms:
-            sym, syms = syms[:fmt_size], syms[fmt_size:]
-            symbols.append(self.Symbol(self, sym, strs))
-
-        return symbols
+        layout = _Symbol32 if self.bits == 32 else _Symbol64
+        size = layout._size(self)
+        return [
+            self.Symbol(self, sym, strs)
+            for sym in layout._unpack_many(syms, count=len(syms) // size, target=self)
+        ]
 
     def _read_symbols(self, symbol_section, string_section=None):
         if string_section is None:
@@ -934,15 +950,11 @@ class ELF(Target):
                 section = self.get_section_header('.dynamic')
                 data = section.content
             except KeyError:
-                data = []
-            if self.bits == 32:
-                fmt = 'iI'
-            else:
-                fmt = 'QQ'
-            fmt_size = pack_size(fmt)
+                data = b''
+            layout = _DynamicSectionEntry32 if self.bits == 32 else _DynamicSectionEntry64
             self._dynamic_section_entries = [
-                self.DynamicSectionEntry(*unpack(fmt, data[i:i + fmt_size], target=self))
-                for i in range(0, len(data), fmt_size)
+                self.DynamicSectionEntry(entry.type_id, entry.value)
+                for entry in layout._unpack_many(data, count=len(data) // layout._size(self), target=self)
             ]
 
     @property
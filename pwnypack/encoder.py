@@ -0,0 +1,359 @@
+"""
+The encoder module transforms shellcode so it doesn't contain any bad
+characters (like NUL bytes or new lines). The encoded payload is prefixed
+with a decoder stub that restores the original shellcode at runtime and
+then jumps to it.
+
+The payload can be encoded by xor-ing, adding, subtracting (using single or
+multi-byte keys) or rotating (using single byte keys) each byte. For each
+candidate key length, the set of keys that would produce a bad character is
+calculated for all 256 key bytes at once using bit masks.
+
+Currently, decoder stubs are available for
+:attr:`~pwnypack.target.Target.Arch.x86` (both 32 and 64 bits variants).
+"""
+
+from __future__ import print_function
+
+import multiprocessing
+import sys
+from enum import Enum
+
+import six
+from six.moves import range
+try:
+    from collections import OrderedDict
+except ImportError:
+    from ordereddict import OrderedDict
+
+import pwnypack.asm
+import pwnypack.codec
+import pwnypack.main
+import pwnypack.packing
+import pwnypack.target
+
+
+__all__ = [
+    'EncoderOp',
+    'find_encoder_key',
+    'encode_shellcode',
+]
+
+
+class EncoderOp(Enum):
+    """
+    The operation used to encode each byte of the payload.
+    """
+
+    xor = 'xor'  #: Xor each byte with the key byte.
+    add = 'add'  #: Add the key byte to each byte.
+    sub = 'sub'  #: Subtract the key byte from each byte.
+    rol = 'rol'  #: Rotate each byte left by the (single byte) key.
+
+
+def _rol(v, n):
+    return ((v << n) | (v >> (8 - n))) & 0xff
+
+
+ENCODER_OPS = {
+    EncoderOp.xor: lambda v, k: v ^ k,
+    EncoderOp.add: lambda v, k: (v + k) & 0xff,
+    EncoderOp.sub: lambda v, k: (v - k) & 0xff,
+    EncoderOp.rol: _rol,
+}
+
+
+ENCODER_INVERSE_OPS = {
+    EncoderOp.xor: lambda e, v: [v ^ e],
+    EncoderOp.add: lambda e, v: [(e - v) & 0xff],
+    EncoderOp.sub: lambda e, v: [(v - e) & 0xff],
+    EncoderOp.rol: lambda e, v: [k for k in range(1, 8) if _rol(v, k) == e],
+}
+
+ALL_KEYS = (1 << 256) - 1
+
+
+def _bad_key_masks(op, badchars):
+    """
+    For each byte value, build a 256 bit mask of the keys that would encode
+    that byte value to a bad character (or that are not valid for the
+    operation).
+    """
+
+    inverse = ENCODER_INVERSE_OPS[op]
+    base = ALL_KEYS & ~0xfe if op is EncoderOp.rol else 0
+    masks = []
+    for v in range(256):
+        mask = base
+        for e in badchars:
+            for k in inverse(e, v):
+                mask |= 1 << k
+        masks.append(mask)
+    return masks
+
+
+def _valid_keys(payload, key_len, masks, badchars):
+    """
+    Find a valid key byte for each of the ``key_len`` columns of the
+    payload. Returns ``None`` if there is a column without valid key bytes.
+    """
+
+    key = bytearray()
+    for i in range(key_len):
+        mask = 0
+        for v in set(bytearray(payload[i::key_len])):
+            mask |= masks[v]
+        for c in badchars:
+            mask |= 1 << c
+        valid = ~mask & ALL_KEYS & ~1  # A zero key byte doesn't encode anything.
+        if not valid:
+            return None
+        # Pick the lowest valid key byte.
+        key.append((valid & -valid).bit_length() - 1)
+    return bytes(key)
+
+
+def _search_key_len(args):
+    payload, key_len, ops, badchars = args
+    candidates = []
+    for op in ops:
+        if op is EncoderOp.rol and key_len > 1:
+            continue
+        key = _valid_keys(payload, key_len, _bad_key_masks(op, badchars), badchars)
+        if key is not None:
+            candidates.append((op, key))
+    return candidates
+
+
+def _encoder_keys(payload, badchars, key_lens, ops, processes):
+    """
+    Generate all the suitable ``(op, key)`` pairs for a payload, shortest
+    keys first and in order of operation preference for each key length.
+    """
+
+    if ops is None:
+        ops = list(EncoderOp)
+    payload = bytes(payload)
+    badchars = frozenset(bytearray(badchars))
+
+    key_lens = sorted(key_lens)
+    if key_lens and key_lens[0] == 1:
+        for candidate in _search_key_len((payload, 1, ops, badchars)):
+            yield candidate
+        key_lens = key_lens[1:]
+
+    jobs = [(payload, key_len, ops, badchars) for key_len in key_lens]
+    if not jobs:
+        return
+
+    if processes is None or processes == 1 or len(jobs) == 1:
+        results = map(_search_key_len, jobs)
+    else:
+        pool = multiprocessing.Pool(processes)
+        try:
+            results = pool.map(_search_key_len, jobs)
+        finally:
+            pool.close()
+            pool.join()
+
+    for candidates in results:
+        for candidate in candidates:
+            yield candidate
+
+
+def find_encoder_key(payload, badchars, key_lens=(1, 2, 4), ops=None, processes=None):
+    """
+    Find an operation and key that encodes ``payload`` without producing any
+    of the bad characters. The key itself will not contain bad characters
+    either.
+
+    Single byte keys are tried first, then the multi-byte key lengths. The
+    search is performed in the current process unless ``processes`` is
+    given, in which case the multi-byte key lengths are searched in parallel
+    using a pool of worker processes.
+
+    Args:
+        payload(bytes): The payload to encode.
+        badchars(bytes): The bytes that are not allowed in the output.
+        key_lens(list of int): The key lengths to consider.
+        ops(list of :class:`EncoderOp`): The operations to consider, in
+            order of preference. Defaults to all operations.
+        processes(int): The number of worker processes to use for multi-byte
+            keys. Defaults to searching in the current process.
+
+    Returns:
+        tuple: The :class:`EncoderOp` and the key (as bytes) or ``None`` if no
+            suitable key was found.
+
+    Example:
+        >>> from pwny import *
+        >>> find_encoder_key(b'\\x00\\x01\\x02', b'\\x00')
+        (<EncoderOp.xor: 'xor'>, b'\\x03')
+    """
+
+    return next(_encoder_keys(payload, badchars, key_lens, ops, processes), None)
+
+
+X86_DECODER_OPS = {
+    EncoderOp.xor: 'xor byte [%(ptr)s], bl',
+    EncoderOp.add: 'sub byte [%(ptr)s], bl',
+    EncoderOp.sub: 'add byte [%(ptr)s], bl',
+    EncoderOp.rol: 'ror byte [%(ptr)s], %(key)d',
+}
+
+X86_DECODER = '''
+    jmp short get_payload
+decoder:
+    pop %(ptr)s
+    push %(ptr)s
+    mov ecx, %(count)d
+    not ecx
+    mov %(key_reg)s, %(key_value)d
+decode:
+    %(op)s
+    ror %(key_reg)s, 8
+    inc %(ptr)s
+    loop decode
+    ret
+get_payload:
+    call decoder
+'''
+
+
+def _x86_decoder(op, key, length, target):
+    if target.bits == 64:
+        ptr, key_reg, reg_size = 'rsi', 'rbx', 8
+    else:
+        ptr, key_reg, reg_size = 'esi', 'ebx', 4
+
+    if reg_size % len(key):
+        raise ValueError('Unsupported key length for decoder stub: %d' % len(key))
+
+    key_value = pwnypack.packing.U(key * (reg_size // len(key)), bits=reg_size * 8, target=target)
+    return pwnypack.asm.asm(X86_DECODER % {
+        'ptr': ptr,
+        'key_reg': key_reg,
+        'key_value': key_value,
+        'count': ~length & 0xffffffff,
+        'op': X86_DECODER_OPS[op] % {'ptr': ptr, 'key': six.indexbytes(key, 0)},
+    }, target=target)
+
+
+ENCODER_CACHE_SIZE = 64
+_encoder_cache = OrderedDict()
+
+
+def encode_shellcode(payload, badchars, target=None, key_lens=None, ops=None, processes=None):
+    """
+    Encode a payload so it doesn't contain any bad characters and prefix it
+    with a decoder stub for the target architecture.
+
+    The search for a key is performed by :func:`find_encoder_key`. The
+    payload is padded with NOPs if the decoder stub for the exact payload
+    length would contain bad characters. Results are cached by payload, bad
+    characters and target.
+
+    Args:
+        payload(bytes): The shellcode to encode.
+        badchars(bytes): The bytes that are not allowed in the output.
+        target(:class:`~pwnypack.target.Target`): The target architecture.
+            The current target is used if this argument is ``None``.
+        key_lens(list of int): The key lengths to consider. Defaults to 1, 2,
+            4 (and 8 on 64 bit targets).
+        ops(list of :class:`EncoderOp`): The operations to consider, in
+            order of preference. Defaults to all operations.
+        processes(int): The number of worker processes to use for multi-byte
+            keys (see :func:`find_encoder_key`).
+
+    Returns:
+        bytes: The decoder stub followed by the encoded payload.
+
+    Raises:
+        ValueError: If the payload is empty or can't be encoded without bad
+            characters.
+        NotImplementedError: If there's no decoder stub for the target.
+
+    Example:
+        >>> from pwny import *
+        >>> shellcode = asm('xor eax, eax\\nret')
+        >>> encoded = encode_shellcode(shellcode, b'\\x00\\n')
+    """
+
+    if target is None:
+        target = pwnypack.target.current_target()
+
+    if target.arch is not pwnypack.target.Target.Arch.x86:
+        raise NotImplementedError('Decoder stubs are only available for x86.')
+
+    if key_lens is None:
+        key_lens = (1, 2, 4, 8) if target.bits == 64 else (1, 2, 4)
+
+    payload = bytes(payload)
+    if not payload:
+        raise ValueError('Can not encode an empty payload.')
+    badchars = bytes(bytearray(sorted(set(bytearray(badchars)))))
+    cache_key = (payload, badchars, target.arch, target.bits, target.endian, target.mode,
+                 tuple(key_lens), tuple(ops) if ops is not None else None)
+
+    result = _encoder_cache.pop(cache_key, None)
+    if result is None:
+        result = _encode_shellcode(payload, badchars, target, key_lens, ops, processes)
+        if len(_encoder_cache) >= ENCODER_CACHE_SIZE:
+            _encoder_cache.popitem(last=False)
+    _encoder_cache[cache_key] = result
+    return result
+
+
+def _encode_shellcode(payload, badchars, target, key_lens, ops, processes):
+    bad = frozenset(bytearray(badchars))
+    nop = b'\x90'
+
+    for padding in range(8):
+        padded = payload + nop * padding
+        # The decoder stub depends on the operation and key, so if it
+        # contains bad characters the next candidate may still work.
+        for op, key in _encoder_keys(padded, badchars, key_lens, ops, processes):
+            try:
+                stub = _x86_decoder(op, key, len(padded), target)
+            except ValueError:
+                # The key doesn't fit the decoder's key register.
+                continue
+            if bad & set(bytearray(stub)):
+                continue
+
+            f = ENCODER_OPS[op]
+            key_bytes = bytearray(key)
+            encoded = bytes(bytearray(
+                f(v, key_bytes[i % len(key_bytes)])
+                for i, v in enumerate(bytearray(padded))
+            ))
+            return stub + encoded
+
+    raise ValueError('Could not encode payload without bad characters.')
+
+
+@pwnypack.main.register('encode')
+def encode_app(parser, cmd, args):  # pragma: no cover
+    """
+    Encode shellcode to avoid bad characters.
+    """
+
+    parser.add_argument('value', help='the shellcode to encode, read from stdin if omitted', nargs='?')
+    parser.add_argument(
+        '-c', '--badchars',
+        default='00',
+        help='the hex encoded bad characters (defaults to 00)',
+    )
+    pwnypack.main.add_target_arguments(parser)
+    args = parser.parse_args(args)
+
+    target = pwnypack.main.target_from_arguments(args)
+    try:
+        return encode_shellcode(
+            pwnypack.main.binary_value_or_stdin(args.value),
+            pwnypack.codec.dehex(args.badchars),
+            target=target,
+        )
+    except (ValueError, NotImplementedError) as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
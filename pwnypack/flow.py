@@ -29,10 +29,12 @@ Examples:
     >>> f.readline(echo=True)
 """
 
+import os
 import subprocess
 import sys
 import socket
 import select
+import time
 try:
     import paramiko
     HAVE_PARAMIKO = True
@@ -45,9 +47,47 @@ __all__ = [
     'SocketChannel',
     'TCPClientSocketChannel',
     'Flow',
+    'FlowTimeout',
 ]
 
 
+RECV_SIZE = 1 << 16
+
+_clock = getattr(time, 'monotonic', time.time)
+
+
+class FlowTimeout(Exception):
+    """
+    Raised when a :class:`Flow` read operation doesn't complete before its
+    timeout expires.
+
+    The data that was received but not consumed is kept in the flow's
+    receive buffer (so the operation can be retried) and is also available
+    as the :attr:`data` attribute of the exception.
+
+    Args:
+        data(bytes): The data that was received so far.
+    """
+
+    def __init__(self, data):
+        super(FlowTimeout, self).__init__('Timed out after receiving %d bytes' % len(data))
+        self.data = data  #: The data that was received before the timeout expired.
+
+
+def _wait_readable(fileno, timeout):
+    """
+    Wait at most *timeout* seconds for a file descriptor to become readable.
+    Uses ``poll`` if it's available, ``select`` otherwise.
+    """
+
+    if hasattr(select, 'poll'):
+        poll = select.poll()
+        poll.register(fileno, select.POLLIN | select.POLLPRI | select.POLLHUP | select.POLLERR)
+        return bool(poll.poll(max(0, timeout) * 1000))
+    else:
+        return bool(select.select([fileno], [], [], max(0, timeout))[0])
+
+
 class ProcessChannel(object):
     """ProcessChannel(executable, argument..., redirect_stderr=False)
 
@@ -97,18 +137,36 @@ class ProcessChannel(object):
             EOFError: If the process exited.
         """
 
-        d = b''
+        d = bytearray()
         while n:
-            try:
-                block = self._process.stdout.read(n)
-            except ValueError:
-                block = None
-            if not block:
-                self._process.poll()
-                raise EOFError('Process ended')
+            block = self.recv(n)
             d += block
             n -= len(block)
-        return d
+        return bytes(d)
+
+    def recv(self, n):
+        """
+        Read at most *n* bytes from the subprocess' output channel. Blocks
+        until at least one byte is available.
+
+        Args:
+            n(int): The maximum number of bytes to read.
+
+        Returns:
+            bytes: The output that was available (at most *n* bytes).
+
+        Raises:
+            EOFError: If the process exited.
+        """
+
+        try:
+            block = os.read(self.fileno(), n)
+        except (OSError, ValueError):
+            block = None
+        if not block:
+            self._process.poll()
+            raise EOFError('Process ended')
+        return block
 
     def write(self, data):
         """
@@ -173,17 +231,35 @@ class SocketChannel(object):
             EOFError: If the socket was closed.
         """
 
-        d = b''
+        d = bytearray()
         while n:
-            try:
-                block = self._socket.recv(n)
-            except socket.error:
-                block = None
-            if not block:
-                raise EOFError('Socket closed')
+            block = self.recv(n)
             d += block
             n -= len(block)
-        return d
+        return bytes(d)
+
+    def recv(self, n):
+        """
+        Receive at most *n* bytes from the socket. Blocks until at least
+        one byte is available.
+
+        Args:
+            n(int): The maximum number of bytes to receive.
+
+        Returns:
+            bytes: The data that was available (at most *n* bytes).
+
+        Raises:
+            EOFError: If the socket was closed.
+        """
+
+        try:
+            block = self._socket.recv(n)
+        except socket.error:
+            block = None
+        if not block:
+            raise EOFError('Socket closed')
+        return block
 
     def write(self, data):
         """
@@ -229,11 +305,22 @@ class TCPClientSocketChannel(SocketChannel):
     Args:
         host(str): The hostname or IP address to connect to.
         port(int): The port number to connect to.
+        timeout(float): The maximum number of seconds to wait for the
+            connection to be established.
+
+    Raises:
+        socket.timeout: If the connection could not be established in time.
     """
 
-    def __init__(self, host, port):
+    def __init__(self, host, port, timeout=None):
         s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        s.connect((host, port))
+        s.settimeout(timeout)
+        try:
+            s.connect((host, port))
+        except Exception:
+            s.close()
+            raise
+        s.settimeout(None)
         super(TCPClientSocketChannel, self).__init__(s)
 
 
@@ -273,7 +360,7 @@ if HAVE_PARAMIKO:
             super(SSHClient, self).__init__()
             self.set_missing_host_key_policy(paramiko.client.WarningPolicy())
 
-        def execute(self, command, pty=False, echo=False):
+        def execute(self, command, pty=False, echo=False, timeout=None):
             """
             Execute `command` on the server this :class:`SSHClient` instance is connected
             to.
@@ -284,6 +371,7 @@ if HAVE_PARAMIKO:
                     this is `False` (the default) then `stderr` will be combined
                     into `stdout` to prevent the buffers from filling up.
                 echo(bool): Whether to write the read data to stdout.
+                timeout(float): The default timeout of read operations.
 
             Returns:
                 :class:`Flow`: A Flow instance initialised with the SSH channel.
@@ -295,9 +383,9 @@ if HAVE_PARAMIKO:
             else:
                 channel.set_combine_stderr(True)
             channel.exec_command(command)
-            return Flow(SocketChannel(channel), echo=echo)
+            return Flow(SocketChannel(channel), echo=echo, timeout=timeout)
 
-        def invoke_shell(self, pty=True, echo=False):
+        def invoke_shell(self, pty=True, echo=False, timeout=None):
             """
             Start a new shell on the server this :class:`SSHClient` is connected
             to.
@@ -307,6 +395,7 @@ if HAVE_PARAMIKO:
                     this is `False` then `stderr` will be combined into `stdout`
                     to prevent the buffers from filling up.
                 echo(bool): Whether to write the read data to stdout.
+                timeout(float): The default timeout of read operations.
 
             Returns:
                 :class:`Flow`: A Flow instance initialised with the SSH channel.
@@ -318,7 +407,7 @@ if HAVE_PARAMIKO:
             else:
                 channel.set_combine_stderr(True)
             channel.invoke_shell()
-            return Flow(SocketChannel(channel), echo=echo)
+            return Flow(SocketChannel(channel), echo=echo, timeout=timeout)
 else:
     class SSHClient(object):
         def __init__(self):
@@ -330,6 +419,17 @@ class Flow(object):
     The core class of *Flow*. Takes a channel and exposes synchronous
     utility functions for communications.
 
+    Data is received from the channel in large blocks and kept in a receive
+    buffer. Data that was received but not yet consumed (f.e. the data that
+    follows the delimiter passed to :meth:`read_until`) is returned by the
+    next read operation.
+
+    All read operations accept a timeout (in seconds) which acts as a
+    deadline for the entire operation. If it expires, :class:`FlowTimeout`
+    is raised. Waiting for data uses the channel's ``fileno()``. If no
+    timeout is passed to a read operation, the flow's default timeout is
+    used.
+
     Usually, you'll use the convenience classmethods :meth:`connect_tcp`
     or :meth:`execute` instead of manually creating the constructor
     directly.
@@ -337,111 +437,185 @@ class Flow(object):
     Args:
         channel(``Channel``): A channel.
         echo(bool): Whether or not to echo all input / output.
+        timeout(float): The default timeout of read operations in seconds.
+            ``None`` means read operations block until they complete.
     """
 
-    def __init__(self, channel, echo=False):
+    def __init__(self, channel, echo=False, timeout=None):
         self.channel = channel
         self.echo = echo
+        self.timeout = timeout
+        self._buffer = bytearray()
+
+    @property
+    def buffered(self):
+        """
+        The data that was received but not yet consumed by a read operation.
+        """
+
+        return bytes(self._buffer)
+
+    def _deadline(self, timeout):
+        if timeout is None:
+            timeout = self.timeout
+        return None if timeout is None else _clock() + timeout
+
+    def _fill(self, deadline=None):
+        """
+        Receive a block of data from the channel and append it to the
+        receive buffer. Channels that don't support receiving partial
+        blocks are read one byte at a time.
+
+        Raises:
+            EOFError: If the channel was closed.
+            FlowTimeout: If no data arrived before the deadline.
+        """
+
+        if deadline is not None and not _wait_readable(self.channel.fileno(), deadline - _clock()):
+            raise FlowTimeout(bytes(self._buffer))
+
+        recv = getattr(self.channel, 'recv', None)
+        if recv is not None:
+            self._buffer += recv(RECV_SIZE)
+        else:
+            self._buffer += self.channel.read(1)
+
+    def _consume(self, n, echo):
+        """
+        Remove the first *n* bytes from the receive buffer and return them.
+        """
+
+        d = bytes(self._buffer[:n])
+        del self._buffer[:n]
+        if echo or (echo is None and self.echo):
+            sys.stdout.write(d.decode('latin1'))
+            sys.stdout.flush()
+        return d
 
-    def read(self, n, echo=None):
+    def _find(self, s, count, deadline):
+        """
+        Receive data until the receive buffer contains *count* occurrences
+        of *s* and return the offset just past the last one.
+        """
+
+        start = 0
+        while True:
+            index = self._buffer.find(s, start)
+            if index != -1:
+                start = index + len(s)
+                count -= 1
+                if not count:
+                    return start
+            else:
+                # Only rescan the tail that could hold the start of s.
+                start = max(start, len(self._buffer) - len(s) + 1)
+                self._fill(deadline)
+
+    def read(self, n, echo=None, timeout=None):
         """
         Read *n* bytes from the channel.
 
         Args:
             n(int): The number of bytes to read from the channel.
             echo(bool): Whether to write the read data to stdout.
+            timeout(float): The maximum number of seconds to wait.
 
         Returns:
             bytes: *n* bytes of data.
 
         Raises:
             EOFError: If the channel was closed.
+            FlowTimeout: If the timeout expired.
         """
 
-        d = self.channel.read(n)
-        if echo or (echo is None and self.echo):
-            sys.stdout.write(d.decode('latin1'))
-            sys.stdout.flush()
-        return d
+        deadline = self._deadline(timeout)
+        while len(self._buffer) < n:
+            self._fill(deadline)
+        return self._consume(n, echo)
 
-    def read_eof(self, echo=None):
+    def read_eof(self, echo=None, timeout=None):
         """
         Read until the channel is closed.
 
         Args:
             echo(bool): Whether to write the read data to stdout.
+            timeout(float): The maximum number of seconds to wait.
 
         Returns:
             bytes: The read data.
+
+        Raises:
+            FlowTimeout: If the timeout expired.
         """
 
-        d = b''
+        deadline = self._deadline(timeout)
         while True:
             try:
-                d += self.read(1, echo)
+                self._fill(deadline)
             except EOFError:
-                return d
+                return self._consume(len(self._buffer), echo)
 
-    def read_until(self, s, echo=None):
+    def read_until(self, s, echo=None, timeout=None):
         """
         Read until a certain string is encountered..
 
         Args:
             s(bytes): The string to wait for.
             echo(bool): Whether to write the read data to stdout.
+            timeout(float): The maximum number of seconds to wait.
 
         Returns:
             bytes: The data up to and including *s*.
 
         Raises:
             EOFError: If the channel was closed.
+            FlowTimeout: If the timeout expired.
         """
 
-        s_len = len(s)
-        buf = self.read(s_len, echo)
-
-        while buf[-s_len:] != s:
-            buf += self.read(1, echo)
-
-        return buf
+        return self._consume(self._find(s, 1, self._deadline(timeout)), echo)
 
     until = read_until  #: Alias of :meth:`read_until`.
 
-    def readlines(self, n, echo=None):
+    def readlines(self, n, echo=None, timeout=None):
         """
         Read *n* lines from channel.
 
         Args:
             n(int): The number of lines to read.
             echo(bool): Whether to write the read data to stdout.
+            timeout(float): The maximum number of seconds to wait for all
+                lines.
 
         Returns:
             list of bytes: *n* lines which include new line characters.
 
         Raises:
             EOFError: If the channel was closed before *n* lines were read.
+            FlowTimeout: If the timeout expired before *n* lines were read.
         """
 
-        return [
-            self.until(b'\n', echo)
-            for _ in range(n)
-        ]
+        if n < 1:
+            return []
+        lines = self._consume(self._find(b'\n', n, self._deadline(timeout)), echo).split(b'\n')
+        return [line + b'\n' for line in lines[:-1]]
 
-    def readline(self, echo=None):
+    def readline(self, echo=None, timeout=None):
         """
         Read 1 line from channel.
 
         Args:
             echo(bool): Whether to write the read data to stdout.
+            timeout(float): The maximum number of seconds to wait.
 
         Returns:
             bytes: The read line which includes new line character.
 
         Raises:
             EOFError: If the channel was closed before a line was read.
+            FlowTimeout: If the timeout expired.
         """
 
-        return self.readlines(1, echo)[0]
+        return self.readlines(1, echo, timeout)[0]
 
     def write(self, data, echo=None):
         """
@@ -512,6 +686,8 @@ class Flow(object):
         socket and input from the socket to the console until an EOF occurs.
         """
 
+        self._consume(len(self._buffer), echo=True)
+
         sockets = [sys.stdin, self.channel]
         while True:
             ready = select.select(sockets, [], [])[0]
@@ -523,11 +699,12 @@ class Flow(object):
                 self.write(line)
 
             if self.channel in ready:
-                self.read(1, echo=True)
+                self._fill()
+                self._consume(len(self._buffer), echo=True)
 
     @classmethod
     def execute(cls, executable, *arguments, **kwargs):
-        """execute(executable, argument..., redirect_stderr=False, echo=False):
+        """execute(executable, argument..., redirect_stderr=False, echo=False, timeout=None):
 
         Set up a :class:`ProcessChannel` and create a :class:`Flow` instance
         for it.
@@ -537,6 +714,7 @@ class Flow(object):
             argument...(list of str): The arguments to pass to the executable.
             redirect_stderr(bool): Whether to also capture the output of stderr.
             echo(bool): Whether to echo read/written data to stdout by default.
+            timeout(float): The default timeout of read operations.
 
         Returns:
             :class:`Flow`: A Flow instance initialised with the process
@@ -544,10 +722,11 @@ class Flow(object):
         """
 
         echo = kwargs.pop('echo', False)
-        return cls(ProcessChannel(executable, *arguments, **kwargs), echo=echo)
+        timeout = kwargs.pop('timeout', None)
+        return cls(ProcessChannel(executable, *arguments, **kwargs), echo=echo, timeout=timeout)
 
     @classmethod
-    def connect_tcp(cls, host, port, echo=False):
+    def connect_tcp(cls, host, port, echo=False, timeout=None):
         """
         Set up a :class:`TCPClientSocketChannel` and create a :class:`Flow`
         instance for it.
@@ -556,16 +735,18 @@ class Flow(object):
             host(str): The hostname or IP address to connect to.
             port(int): The port number to connect to.
             echo(bool): Whether to echo read/written data to stdout by default.
+            timeout(float): The timeout for establishing the connection and
+                the default timeout of read operations.
 
         Returns:
             :class:`Flow`: A Flow instance initialised with the TCP socket
                 channel.
         """
 
-        return cls(TCPClientSocketChannel(host, port), echo=echo)
+        return cls(TCPClientSocketChannel(host, port, timeout), echo=echo, timeout=timeout)
 
     @classmethod
-    def listen_tcp(cls, host='', port=0, echo=False):
+    def listen_tcp(cls, host='', port=0, echo=False, timeout=None):
         """
         Set up a :class:`TCPServerSocketChannel` and create a :class:`Flow`
         instance for it.
@@ -574,13 +755,14 @@ class Flow(object):
             host(str): The hostname or IP address to bind to.
             port(int): The port number to listen on.
             echo(bool): Whether to echo read/written data to stdout by default.
+            timeout(float): The default timeout of read operations.
 
         Returns:
             :class:`Flow`: A Flow instance initialised with the TCP socket
                 channel.
         """
 
-        return cls(TCPServerSocketChannel(host, port), echo=echo)
+        return cls(TCPServerSocketChannel(host, port), echo=echo, timeout=timeout)
 
     @staticmethod
     def connect_ssh(*args, **kwargs):
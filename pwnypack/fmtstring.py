@@ -56,7 +56,7 @@ def fmtstring(offset, writes, written=0, max_width=2, target=None):
         raise ValueError('max_width should be 1, 2 or 4')
 
     if target is None:
-        target = pwnypack.target.target
+        target = pwnypack.target.current_target()
 
     addrs = []
     cmds = []
@@ -0,0 +1,284 @@
+"""
+The grep module searches files (or entire directory trees) for byte
+patterns. Each file is memory mapped and searched for all patterns in a
+single pass using :func:`~pwnypack.util.reghex_set`. Files are distributed
+over a pool of worker processes. If a file is an ELF file, the virtual
+address of each match is reported as well.
+"""
+
+from __future__ import print_function
+
+import functools
+import mmap
+import multiprocessing
+import os
+import stat
+import sys
+
+import six
+
+import pwnypack.asm
+import pwnypack.codec
+import pwnypack.elf
+import pwnypack.main
+import pwnypack.util
+
+
+__all__ = [
+    'grep_file',
+    'grep',
+]
+
+
+GREP_CHUNK_SIZE = 16
+
+
+def _iter_files(paths):
+    """
+    Yield the paths of all regular files in ``paths``, descending into
+    directories. Symbolic links and special files (devices, pipes, sockets)
+    are skipped.
+    """
+
+    for path in paths:
+        try:
+            mode = os.lstat(path).st_mode
+        except OSError:
+            continue
+
+        if stat.S_ISREG(mode):
+            yield path
+        elif stat.S_ISDIR(mode):
+            for dir_path, dir_names, file_names in os.walk(path):
+                dir_names.sort()
+                for file_name in sorted(file_names):
+                    file_path = os.path.join(dir_path, file_name)
+                    try:
+                        if stat.S_ISREG(os.lstat(file_path).st_mode):
+                            yield file_path
+                    except OSError:
+                        continue
+
+
+def _elf_segments(f):
+    """
+    Return the ``(offset, size, vaddr)`` of the loadable segments of an ELF
+    file or ``None`` if the file can't be parsed.
+    """
+
+    try:
+        elf = pwnypack.elf.ELF(f)
+        return [
+            (header.offset, header.filesz, header.vaddr)
+            for header in elf.program_headers
+            if header.type is pwnypack.elf.ELF.ProgramHeader.Type.load
+        ]
+    except Exception:
+        return None
+
+
+def _vaddr(segments, offset):
+    for segment_offset, segment_size, segment_vaddr in segments:
+        if segment_offset <= offset < segment_offset + segment_size:
+            return segment_vaddr + offset - segment_offset
+    return None
+
+
+def grep_file(path, patterns):
+    """
+    Search a single file for a set of reghex patterns. The file is memory
+    mapped, so it is never read into memory as a whole.
+
+    Args:
+        path(str): The path of the file to search.
+        patterns(list of str): The reghex patterns to search for.
+
+    Returns:
+        list of dict: The matches in order of offset. Each match is
+            described by a dictionary with the following fields:
+
+            - path: The path of the file.
+            - offset: The offset of the match in the file.
+            - addr: The virtual address of the match if the file is an ELF
+              file and the match is in a loadable segment, ``None``
+              otherwise.
+            - pattern: The pattern that matched.
+            - match: The matched bytes.
+
+    Raises:
+        IOError: If the file can't be opened or mapped.
+    """
+
+    reghex_set = pwnypack.util.reghex_set(patterns)
+
+    with open(path, 'rb') as f:
+        if not os.fstat(f.fileno()).st_size:
+            return []
+
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            segments = _elf_segments(f) if data[:4] == b'\x7fELF' else None
+            return [
+                {
+                    'path': path,
+                    'offset': offset,
+                    'addr': _vaddr(segments, offset) if segments else None,
+                    'pattern': pattern,
+                    'match': match,
+                }
+                for pattern, offset, match in reghex_set.scan(data)
+            ]
+        finally:
+            data.close()
+
+
+def _grep_file(patterns, path):
+    try:
+        return path, grep_file(path, patterns), None
+    except (IOError, OSError, ValueError) as e:
+        # mmap raises ValueError for files that shrunk to zero bytes.
+        return path, None, e
+
+
+def grep(paths, patterns, processes=None, onerror=None):
+    """
+    Search files and directory trees for a set of reghex patterns (see
+    :func:`~pwnypack.util.reghex`). Directories are searched recursively,
+    symbolic links and special files are skipped.
+
+    The files are distributed over a pool of ``processes`` worker processes
+    and the matches are produced as soon as a file has been searched. The
+    order in which files are reported is therefore not defined, the matches
+    in a single file are reported in order of offset.
+
+    Args:
+        paths(list of str): The files and directories to search.
+        patterns(str or list of str): The reghex pattern(s) to search for.
+        processes(int): The number of worker processes to use. Defaults to
+            the number of CPUs. Use ``1`` to search in the current process.
+        onerror(callable): Called with the path and the exception if a file
+            can't be searched. Errors are ignored if this is ``None``.
+
+    Returns:
+        generator of dict: The matches, see :func:`grep_file`.
+
+    Raises:
+        SyntaxError: If one of the patterns is not a valid reghex pattern.
+
+    Example:
+        >>> from pwny import *
+        >>> for match in grep(['/lib'], ['0f 05 c3']):
+        ...     print(match['path'], match['addr'])
+    """
+
+    if isinstance(patterns, six.string_types):
+        patterns = [patterns]
+    patterns = tuple(patterns)
+
+    # Fail early on invalid patterns.
+    pwnypack.util.reghex_set(patterns)
+
+    files = _iter_files(paths)
+    worker = functools.partial(_grep_file, patterns)
+
+    if processes == 1:
+        results = six.moves.map(worker, files)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(processes)
+        results = pool.imap_unordered(worker, files, GREP_CHUNK_SIZE)
+
+    try:
+        for path, matches, error in results:
+            if error is not None:
+                if onerror is not None:
+                    onerror(path, error)
+                continue
+            for match in matches:
+                yield match
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+
+@pwnypack.main.register('grep')
+def grep_app(parser, cmd, args):  # pragma: no cover
+    """
+    Search files and directories for byte patterns.
+    """
+
+    parser.add_argument('pattern', help='the pattern to search for')
+    parser.add_argument('path', nargs='+', help='the files and directories to search')
+    parser.add_argument(
+        '-p', '--pattern',
+        dest='patterns',
+        action='append',
+        default=[],
+        help='an additional pattern to search for',
+    )
+    parser.add_argument(
+        '--reghex', '-r',
+        dest='mode',
+        action='store_const',
+        const='reghex',
+        default='reghex',
+        help='the patterns are reghex expressions (default)',
+    )
+    parser.add_argument(
+        '--hex', '-x',
+        dest='mode',
+        action='store_const',
+        const='hex',
+        help='the patterns are hex encoded bytes',
+    )
+    parser.add_argument(
+        '--fixed-strings', '-F',
+        dest='mode',
+        action='store_const',
+        const='literal',
+        help='the patterns are literal strings',
+    )
+    parser.add_argument(
+        '--asm', '-s',
+        dest='mode',
+        action='store_const',
+        const='asm',
+        help='the patterns are assembler source (separate lines with semi-colon)',
+    )
+    pwnypack.main.add_target_arguments(parser)
+    parser.add_argument('--jobs', '-j', type=int, help='the number of worker processes (defaults to the number of CPUs)')
+    args = parser.parse_args(args)
+
+    patterns = []
+    for pattern in [args.pattern] + args.patterns:
+        if args.mode == 'hex':
+            pattern = pwnypack.codec.enhex(pwnypack.codec.dehex(pattern))
+        elif args.mode == 'literal':
+            pattern = pwnypack.codec.enhex(pattern.encode('latin1'))
+        elif args.mode == 'asm':
+            try:
+                pattern = pwnypack.codec.enhex(pwnypack.asm.asm(
+                    pattern.replace(';', '\n'),
+                    target=pwnypack.main.target_from_arguments(args),
+                ))
+            except SyntaxError as e:
+                parser.error('Could not assemble: %s' % e.msg)
+        patterns.append(pattern)
+
+    def onerror(path, error):
+        print('%s: %s' % (path, error), file=sys.stderr)
+
+    try:
+        matches = grep(args.path, patterns, args.jobs, onerror)
+        for match in matches:
+            hex_match = pwnypack.codec.enhex(match['match'])
+            print('%s:0x%x%s: %s%s' % (
+                match['path'],
+                match['offset'],
+                ' (vaddr 0x%x)' % match['addr'] if match['addr'] is not None else '',
+                ' '.join(hex_match[i:i + 2] for i in range(0, len(hex_match), 2)),
+                ' [%s]' % match['pattern'] if len(patterns) > 1 else '',
+            ))
+    except SyntaxError:
+        parser.error('Invalid reghex pattern.')
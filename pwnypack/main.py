@@ -16,6 +16,8 @@ __all__ = []
 
 MAIN_FUNCTIONS = OrderedDict()
 
+STREAM_CHUNK_SIZE = 1 << 20
+
 
 def register(name=None, symlink=True):
     def wrapper(f):
@@ -46,6 +48,24 @@ def binary_value_or_stdin(value):
         return value
 
 
+def binary_chunks_or_stdin(value, chunk_size=None):
+    """
+    Yield the fsencoded value or read raw data from stdin in chunks of at
+    most ``chunk_size`` bytes if value is None.
+    """
+    if value is None:
+        if chunk_size is None:
+            chunk_size = STREAM_CHUNK_SIZE
+        reader = io.open(sys.stdin.fileno(), mode='rb', closefd=False)
+        while True:
+            chunk = reader.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    else:
+        yield binary_value_or_stdin(value)
+
+
 def string_value_or_stdin(value):
     """
     Return value or read string from stdin if value is None.
@@ -78,6 +98,14 @@ def add_target_arguments(parser):
     )
 
 
+def add_stream_argument(parser):
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='process the input in chunks using a constant amount of memory',
+    )
+
+
 def target_from_arguments(args):
     if args.endian is not None:
         endian = pwnypack.target.Target.Endian.__members__[args.endian]
@@ -112,6 +140,38 @@ def symlink(parser, cmd, args):
             print('Not creating symlink %s (file already exists)' % dest)
 
 
+def write_stream(args, output):
+    """
+    Write the chunks produced by a streaming app to stdout, applying the
+    selected output format along the way.
+    """
+
+    import pwny
+
+    # Text encoders produce str chunks, the output formats work on bytes.
+    output = (
+        chunk.encode('latin1') if isinstance(chunk, six.text_type) else chunk
+        for chunk in output
+    )
+
+    if args.format == 'hex':
+        output = pwny.enhex_stream(output)
+    elif args.format == 'b64':
+        output = pwny.enb64_stream(output)
+    elif args.format != 'raw':
+        print('The %s output format is not supported when streaming.' % args.format, file=sys.stderr)
+        sys.exit(1)
+
+    writer = io.open(sys.stdout.fileno(), mode='wb', closefd=False)
+    for chunk in output:
+        if isinstance(chunk, six.text_type):
+            chunk = chunk.encode('latin1')
+        writer.write(chunk)
+    if not args.no_newline and sys.stdout.isatty():
+        writer.write(b'\n')
+    writer.close()
+
+
 def main(args=sys.argv):
     def usage():
         global MAIN_FUNCTIONS
@@ -164,7 +224,9 @@ def main(args=sys.argv):
 
     output = f(parser, app, app_args)
 
-    if output is not None:
+    if output is not None and not isinstance(output, (six.binary_type, six.text_type)):
+        write_stream(parser.parse_args(app_args), output)
+    elif output is not None:
         if six.PY3:
             output_bytes = os.fsencode(output)
         else:
@@ -1,5 +1,20 @@
-import pwnypack.target
+import array
+import itertools
+import re
 import struct
+import sys
+
+import six
+from enum import Enum
+
+import pwnypack.target
+import pwnypack.util
+
+try:
+    import numpy
+    HAVE_NUMPY = True
+except ImportError:
+    HAVE_NUMPY = False
 
 
 __all__ = [
@@ -10,16 +25,64 @@ __all__ = [
     'p',
     'U',
     'u',
+    'Packer',
+    'P_many',
+    'p_many',
+    'U_many',
+    'u_many',
+    'Record',
+    'record',
+    'flat',
+    'VarintMode',
+    'pack_varint',
+    'unpack_varint',
+    'pack_varints',
+    'unpack_varints',
 ]
 
 
+STRUCT_CACHE_SIZE = 256
+_struct_cache = {}
+
+
+def _endian_prefix(endian):
+    if endian is pwnypack.target.Target.Endian.little:
+        return '<'
+    elif endian is pwnypack.target.Target.Endian.big:
+        return '>'
+    else:
+        raise NotImplementedError('Unsupported endianness: %s' % endian)
+
+
+def _struct(fmt, endian, target):
+    """
+    Get the (cached) precompiled ``struct.Struct`` for a format string using
+    the byte order of ``endian``, ``target`` or the current target.
+    """
+
+    if endian is None:
+        endian = target.endian if target is not None else pwnypack.target.current_target().endian
+
+    key = (fmt, endian)
+    s = _struct_cache.get(key)
+    if s is None:
+        if fmt and fmt[0] not in '@=<>!':
+            s = struct.Struct(_endian_prefix(endian) + fmt)
+        else:
+            s = struct.Struct(fmt)
+        if len(_struct_cache) >= STRUCT_CACHE_SIZE:
+            _struct_cache.clear()
+        _struct_cache[key] = s
+    return s
+
+
 def pack(fmt, *args, **kwargs):
     """pack(fmt, v1, v2, ..., endian=None, target=None)
 
     Return a string containing the values v1, v2, ... packed according to the
     given format. The actual packing is performed by ``struct.pack`` but the
     byte order will be set according to the given `endian`, `target` or
-    byte order of the global target.
+    byte order of the current target.
 
     Args:
         fmt(str): The format string.
@@ -29,22 +92,14 @@ def pack(fmt, *args, **kwargs):
             the ``target`` argument.
         target(:class:`~pwnypack.target.Target`): Override the default byte
             order. If ``None``, it will look at the byte order of
-            the global :data:`~pwnypack.target.target`.
+            the current target (see
+            :func:`~pwnypack.target.current_target`).
 
     Returns:
         bytes: The provided values packed according to the format.
     """
 
-    endian, target = kwargs.get('endian'), kwargs.get('target')
-    endian = endian if endian is not None else target.endian if target is not None else pwnypack.target.target.endian
-    if fmt and fmt[0] not in '@=<>!':
-        if endian is pwnypack.target.Target.Endian.little:
-            fmt = '<' + fmt
-        elif endian is pwnypack.target.Target.Endian.big:
-            fmt = '>' + fmt
-        else:
-            raise NotImplementedError('Unsupported endianness: %s' % endian)
-    return struct.pack(fmt, *args)
+    return _struct(fmt, kwargs.get('endian'), kwargs.get('target')).pack(*args)
 
 
 def unpack(fmt, data, endian=None, target=None):
@@ -52,7 +107,7 @@ def unpack(fmt, data, endian=None, target=None):
     Unpack the string (presumably packed by pack(fmt, ...)) according to the
     given format. The actual unpacking is performed by ``struct.unpack``
     but the byte order will be set according to the given `endian`, `target`
-    or byte order of the global target.
+    or byte order of the current target.
 
     Args:
         fmt(str): The format string.
@@ -62,41 +117,52 @@ def unpack(fmt, data, endian=None, target=None):
             the ``target`` argument.
         target(:class:`~pwnypack.target.Target`): Override the default byte
             order. If ``None``, it will look at the byte order of
-            the global :data:`~pwnypack.target.target`.
+            the current target (see
+            :func:`~pwnypack.target.current_target`).
 
     Returns:
         list: The unpacked values according to the format.
     """
 
-    endian = endian if endian is not None else target.endian if target is not None else pwnypack.target.target.endian
-    if fmt and fmt[0] not in '@=<>!':
-        if endian is pwnypack.target.Target.Endian.little:
-            fmt = '<' + fmt
-        elif endian is pwnypack.target.Target.Endian.big:
-            fmt = '>' + fmt
-        else:
-            raise NotImplementedError('Unsupported endianness: %s' % endian)
-    return struct.unpack(fmt, data)
+    return _struct(fmt, endian, target).unpack(data)
 
 
 def pack_size(fmt, endian=None, target=None):
-    endian = endian if endian is not None else target.endian if target is not None else pwnypack.target.target.endian
-    if fmt and fmt[0] not in '@=<>!':
-        if endian is pwnypack.target.Target.Endian.little:
-            fmt = '<' + fmt
-        elif endian is pwnypack.target.Target.Endian.big:
-            fmt = '>' + fmt
-        else:
-            raise NotImplementedError('Unsupported endianness: %s' % endian)
-    return struct.calcsize(fmt)
+    return _struct(fmt, endian, target).size
 
 
 def _pack_closure(fmt):
-    return lambda value, endian=None, target=None: pack(fmt, value, endian=endian, target=target)
+    return lambda value, endian=None, target=None: _struct(fmt, endian, target).pack(value)
 
 
 def _unpack_closure(fmt):
-    return lambda data, endian=None, target=None: unpack(fmt, data, endian=endian, target=target)[0]
+    return lambda data, endian=None, target=None: _struct(fmt, endian, target).unpack(data)[0]
+
+
+def _array_typecode(size, signed):
+    """
+    Find the array typecode for integers of ``size`` bytes (or ``None`` if
+    there is no such typecode).
+    """
+
+    for typecode in ('bhilq' if signed else 'BHILQ'):
+        try:
+            if array.array(typecode).itemsize == size:
+                return typecode
+        except ValueError:
+            # 'q' and 'Q' are not available on older versions of python.
+            pass
+    return None
+
+
+_array_tobytes = getattr(array.array, 'tobytes', None) or array.array.tostring
+_array_frombytes = getattr(array.array, 'frombytes', None) or array.array.fromstring
+_NATIVE_PREFIX = '<' if sys.byteorder == 'little' else '>'
+
+
+def _bound_unpack_closure(s):
+    unpack = s.unpack
+    return lambda data: unpack(data)[0]
 
 
 for _w, _f in ((8, 'b'), (16, 'h'), (32, 'l'), (64, 'q')):
@@ -122,6 +188,182 @@ for _w, _f in ((8, 'b'), (16, 'h'), (32, 'l'), (64, 'q')):
 del _w, _f, _pack_closure, _unpack_closure
 
 
+class Packer(object):
+    """
+    Pack and unpack values using a fixed word size and byte order. All
+    formats are compiled when the packer is created, so there's no
+    per-call overhead of resolving the target. Use :meth:`for_target` to
+    get a shared packer for a target.
+
+    Besides the :meth:`pack`, :meth:`unpack` and :meth:`pack_size` methods, a
+    packer provides the ``p``, ``P``, ``u`` and ``U`` pointer functions and
+    the ``p8``, ``P8``, ``u8``, ``U8`` (and 16, 32 and 64 bit) integer
+    functions. These take a single value (or buffer) argument.
+
+    Args:
+        bits(:class:`~pwnypack.target.Target.Bits`): The word size. If
+            ``None``, the word size of ``target`` is used.
+        endian(:class:`~pwnypack.target.Target.Endian`): The byte order. If
+            ``None``, the byte order of ``target`` is used.
+        target(:class:`~pwnypack.target.Target`): The target to take the
+            defaults from. If ``None``, the current target (see
+            :func:`~pwnypack.target.current_target`) is used.
+
+    Example:
+        >>> from pwny import *
+        >>> packer = Packer(64, Target.Endian.big)
+        >>> packer.P(0x41424344)
+        b'\\x00\\x00\\x00\\x00ABCD'
+        >>> packer.U16(b'AB')
+        16706
+    """
+
+    _packers = {}
+
+    def __init__(self, bits=None, endian=None, target=None):
+        if target is None:
+            target = pwnypack.target.current_target()
+        self.bits = pwnypack.target.Target.Bits(bits if bits is not None else target.bits)
+        self.endian = endian if endian is not None else target.endian
+        prefix = _endian_prefix(self.endian)
+
+        for w, f in ((8, 'b'), (16, 'h'), (32, 'l'), (64, 'q')):
+            signed, unsigned = struct.Struct(prefix + f), struct.Struct(prefix + f.upper())
+            setattr(self, 'p%d' % w, signed.pack)
+            setattr(self, 'P%d' % w, unsigned.pack)
+            setattr(self, 'u%d' % w, _bound_unpack_closure(signed))
+            setattr(self, 'U%d' % w, _bound_unpack_closure(unsigned))
+
+        self.p = getattr(self, 'p%d' % self.bits.value)
+        self.P = getattr(self, 'P%d' % self.bits.value)
+        self.u = getattr(self, 'u%d' % self.bits.value)
+        self.U = getattr(self, 'U%d' % self.bits.value)
+
+        self._prefix = prefix
+        self._swap = prefix != _NATIVE_PREFIX
+        self._size = self.bits.value // 8
+        self._formats = {True: 'q' if self._size == 8 else 'l', False: 'Q' if self._size == 8 else 'L'}
+        self._typecodes = {signed: _array_typecode(self._size, signed) for signed in (True, False)}
+
+    @classmethod
+    def for_target(cls, target=None, bits=None, endian=None):
+        """
+        Get the shared packer for the word size and byte order of a target.
+
+        Args:
+            target(:class:`~pwnypack.target.Target`): The target. If ``None``,
+                the current target (see
+                :func:`~pwnypack.target.current_target`) is used.
+            bits(:class:`~pwnypack.target.Target.Bits`): Override the word
+                size of the target.
+            endian(:class:`~pwnypack.target.Target.Endian`): Override the
+                byte order of the target.
+
+        Returns:
+            :class:`Packer`: The packer.
+        """
+
+        if target is None:
+            target = pwnypack.target.current_target()
+        key = (bits if bits is not None else target.bits, endian if endian is not None else target.endian)
+        packer = cls._packers.get(key)
+        if packer is None:
+            packer = cls._packers[key] = cls(*key)
+        return packer
+
+    def pack(self, fmt, *args):
+        """
+        Pack values according to a format string using the byte order of
+        the packer. See :func:`pack`.
+        """
+
+        return _struct(fmt, self.endian, None).pack(*args)
+
+    def unpack(self, fmt, data):
+        """
+        Unpack data according to a format string using the byte order of the
+        packer. See :func:`unpack`.
+        """
+
+        return _struct(fmt, self.endian, None).unpack(data)
+
+    def pack_size(self, fmt):
+        """
+        Return the size of a format string using the byte order of the
+        packer.
+        """
+
+        return _struct(fmt, self.endian, None).size
+
+    def _pack_many(self, values, signed):
+        typecode = self._typecodes[signed]
+        if typecode is None:
+            values = list(values)
+            return struct.pack('%s%d%s' % (self._prefix, len(values), self._formats[signed]), *values)
+
+        a = array.array(typecode, values)
+        if self._swap:
+            a.byteswap()
+        return _array_tobytes(a)
+
+    def _unpack_many(self, data, signed, as_array):
+        data = memoryview(data)
+        if data.format != 'B' and hasattr(data, 'cast'):
+            data = data.cast('B')
+        if len(data) % self._size:
+            raise ValueError('The length of the data should be a multiple of %d' % self._size)
+
+        typecode = self._typecodes[signed]
+        if typecode is None:
+            if as_array:
+                raise ValueError('Arrays of %d bit integers are not supported.' % self.bits.value)
+            return list(struct.unpack(
+                '%s%d%s' % (self._prefix, len(data) // self._size, self._formats[signed]),
+                data.tobytes(),
+            ))
+
+        if not as_array and not self._swap and hasattr(data, 'cast'):
+            # Read the values straight from the buffer.
+            return data.cast(typecode).tolist()
+
+        a = array.array(typecode)
+        _array_frombytes(a, data)
+        if self._swap:
+            a.byteswap()
+        return a if as_array else a.tolist()
+
+    def p_many(self, values):
+        """
+        Pack a sequence of signed pointers. See :func:`p_many`.
+        """
+
+        return self._pack_many(values, True)
+
+    def P_many(self, values):
+        """
+        Pack a sequence of unsigned pointers. See :func:`P_many`.
+        """
+
+        return self._pack_many(values, False)
+
+    def u_many(self, data, as_array=False):
+        """
+        Unpack a sequence of signed pointers. See :func:`u_many`.
+        """
+
+        return self._unpack_many(data, True, as_array)
+
+    def U_many(self, data, as_array=False):
+        """
+        Unpack a sequence of unsigned pointers. See :func:`U_many`.
+        """
+
+        return self._unpack_many(data, False, as_array)
+
+    def __repr__(self):
+        return '%s(bits=%s,endian=%s)' % (self.__class__.__name__, self.bits.value, self.endian.name)
+
+
 def P(value, bits=None, endian=None, target=None):
     """
     Pack an unsigned pointer for a given target.
@@ -136,12 +378,11 @@ def P(value, bits=None, endian=None, target=None):
             the ``target`` argument.
         target(:class:`~pwnypack.target.Target`): Override the default byte
             order. If ``None``, it will look at the byte order of
-            the global :data:`~pwnypack.target.target`.
+            the current target (see
+            :func:`~pwnypack.target.current_target`).
     """
 
-    bits = pwnypack.target.Target.Bits(bits) if bits is not None else target.bits if target is not None else \
-        pwnypack.target.target.bits
-    return globals()['P%d' % bits.value](value, endian=endian, target=target)
+    return Packer.for_target(target, bits, endian).P(value)
 
 
 def p(value, bits=None, endian=None, target=None):
@@ -158,12 +399,11 @@ def p(value, bits=None, endian=None, target=None):
             the ``target`` argument.
         target(:class:`~pwnypack.target.Target`): Override the default byte
             order. If ``None``, it will look at the byte order of
-            the global :data:`~pwnypack.target.target`.
+            the current target (see
+            :func:`~pwnypack.target.current_target`).
     """
 
-    bits = pwnypack.target.Target.Bits(bits) if bits is not None else target.bits if target is not None else \
-        pwnypack.target.target.bits
-    return globals()['p%d' % bits.value](value, endian=endian, target=target)
+    return Packer.for_target(target, bits, endian).p(value)
 
 
 def U(data, bits=None, endian=None, target=None):
@@ -180,15 +420,14 @@ def U(data, bits=None, endian=None, target=None):
             the ``target`` argument.
         target(:class:`~pwnypack.target.Target`): Override the default byte
             order. If ``None``, it will look at the byte order of
-            the global :data:`~pwnypack.target.target`.
+            the current target (see
+            :func:`~pwnypack.target.current_target`).
 
     Returns:
         int: The pointer value.
     """
 
-    bits = pwnypack.target.Target.Bits(bits) if bits is not None else target.bits if target is not None else \
-        pwnypack.target.target.bits
-    return globals()['U%d' % bits.value](data, endian=endian, target=target)
+    return Packer.for_target(target, bits, endian).U(data)
 
 
 def u(data, bits=None, endian=None, target=None):
@@ -205,12 +444,801 @@ def u(data, bits=None, endian=None, target=None):
             the ``target`` argument.
         target(:class:`~pwnypack.target.Target`): Override the default byte
             order. If ``None``, it will look at the byte order of
-            the global :data:`~pwnypack.target.target`.
+            the current target (see
+            :func:`~pwnypack.target.current_target`).
 
     Returns:
         int: The pointer value.
     """
 
-    bits = pwnypack.target.Target.Bits(bits) if bits is not None else target.bits if target is not None else \
-        pwnypack.target.target.bits
-    return globals()['u%d' % bits.value](data, endian=endian, target=target)
+    return Packer.for_target(target, bits, endian).u(data)
+
+
+def P_many(values, bits=None, endian=None, target=None):
+    """
+    Pack a sequence of unsigned pointers for a given target in one go.
+
+    Args:
+        values(iterable of int): The values to pack.
+        bits(:class:`~pwnypack.target.Target.Bits`): Override the default
+            word size. If ``None`` it will look at the word size of
+            ``target``.
+        endian(:class:`~pwnypack.target.Target.Endian`): Override the default
+            byte order. If ``None``, it will look at the byte order of
+            the ``target`` argument.
+        target(:class:`~pwnypack.target.Target`): Override the default byte
+            order. If ``None``, it will look at the byte order of
+            the current target (see
+            :func:`~pwnypack.target.current_target`).
+
+    Returns:
+        bytes: The packed pointers.
+
+    Example:
+        >>> from pwny import *
+        >>> P_many([0x41424344, 0x45464748], bits=32, endian=Target.Endian.big)
+        b'ABCDEFGH'
+    """
+
+    return Packer.for_target(target, bits, endian).P_many(values)
+
+
+def p_many(values, bits=None, endian=None, target=None):
+    """
+    Pack a sequence of signed pointers for a given target in one go.
+
+    Args:
+        values(iterable of int): The values to pack.
+        bits(:class:`~pwnypack.target.Target.Bits`): Override the default
+            word size. If ``None`` it will look at the word size of
+            ``target``.
+        endian(:class:`~pwnypack.target.Target.Endian`): Override the default
+            byte order. If ``None``, it will look at the byte order of
+            the ``target`` argument.
+        target(:class:`~pwnypack.target.Target`): Override the default byte
+            order. If ``None``, it will look at the byte order of
+            the current target (see
+            :func:`~pwnypack.target.current_target`).
+
+    Returns:
+        bytes: The packed pointers.
+    """
+
+    return Packer.for_target(target, bits, endian).p_many(values)
+
+
+def U_many(data, bits=None, endian=None, target=None, as_array=False):
+    """
+    Unpack a buffer of unsigned pointers for a given target in one go. The
+    data is read directly from the buffer when possible, so passing a
+    :class:`memoryview` avoids copying large dumps.
+
+    Args:
+        data(bytes): The data to unpack. Its length should be a multiple of
+            the word size.
+        bits(:class:`~pwnypack.target.Target.Bits`): Override the default
+            word size. If ``None`` it will look at the word size of
+            ``target``.
+        endian(:class:`~pwnypack.target.Target.Endian`): Override the default
+            byte order. If ``None``, it will look at the byte order of
+            the ``target`` argument.
+        target(:class:`~pwnypack.target.Target`): Override the default byte
+            order. If ``None``, it will look at the byte order of
+            the current target (see
+            :func:`~pwnypack.target.current_target`).
+        as_array(bool): Return a compact :class:`array.array` instead of a
+            list.
+
+    Returns:
+        list or array.array: The pointer values.
+
+    Raises:
+        ValueError: If the length of the data is not a multiple of the word
+            size.
+
+    Example:
+        >>> from pwny import *
+        >>> U_many(b'ABCDEFGH', bits=32, endian=Target.Endian.big)
+        [1094861636, 1162233672]
+    """
+
+    return Packer.for_target(target, bits, endian).U_many(data, as_array)
+
+
+def u_many(data, bits=None, endian=None, target=None, as_array=False):
+    """
+    Unpack a buffer of signed pointers for a given target in one go. See
+    :func:`U_many`.
+
+    Args:
+        data(bytes): The data to unpack. Its length should be a multiple of
+            the word size.
+        bits(:class:`~pwnypack.target.Target.Bits`): Override the default
+            word size. If ``None`` it will look at the word size of
+            ``target``.
+        endian(:class:`~pwnypack.target.Target.Endian`): Override the default
+            byte order. If ``None``, it will look at the byte order of
+            the ``target`` argument.
+        target(:class:`~pwnypack.target.Target`): Override the default byte
+            order. If ``None``, it will look at the byte order of
+            the current target (see
+            :func:`~pwnypack.target.current_target`).
+        as_array(bool): Return a compact :class:`array.array` instead of a
+            list.
+
+    Returns:
+        list or array.array: The pointer values.
+    """
+
+    return Packer.for_target(target, bits, endian).u_many(data, as_array)
+
+
+_RECORD_FIELD_FORMAT = re.compile(r'^(?:[cbB?hHiIlLqQefdPp]|\d*[sx])$')
+_RECORD_WORD_FORMATS = {
+    ('P', 32): 'I',
+    ('P', 64): 'Q',
+    ('p', 32): 'i',
+    ('p', 64): 'q',
+}
+
+
+def _iter_unpack(s, data):
+    if hasattr(s, 'iter_unpack'):
+        return s.iter_unpack(data)
+    return (s.unpack_from(data, offset) for offset in range(0, len(data), s.size))
+
+
+class Record(object):
+    """
+    The base class of record layouts created by :func:`record`. A record
+    describes a C-like binary structure. Its layout is compiled to a
+    ``struct.Struct`` once for each word size and byte order it is used
+    with.
+
+    Records can be created from their field values (positional or by
+    keyword, missing fields default to zero), unpacked from a buffer using
+    :meth:`_unpack` or :meth:`_unpack_many` and packed using :meth:`_pack`.
+    Like in :func:`collections.namedtuple`, the names of these methods start
+    with an underscore to avoid conflicts with field names.
+    """
+
+    __slots__ = ()
+
+    _fields = ()
+    _formats = ()
+    _defaults = ()
+    _word_sized = False
+    _structs = None
+
+    def __init__(self, *args, **kwargs):
+        fields = self._fields
+        if not kwargs and len(args) == len(fields):
+            for name, value in zip(fields, args):
+                setattr(self, name, value)
+            return
+
+        if len(args) > len(fields):
+            raise TypeError('%s takes at most %d arguments' % (self.__class__.__name__, len(fields)))
+        for name, value in zip(fields, args):
+            if name in kwargs:
+                raise TypeError('Got multiple values for field %s' % name)
+            kwargs[name] = value
+        for name, default in zip(fields, self._defaults):
+            setattr(self, name, kwargs.pop(name, default))
+        if kwargs:
+            raise TypeError('Unknown field(s): %s' % ', '.join(sorted(kwargs)))
+
+    @classmethod
+    def _layout(cls, target=None):
+        """
+        Get the compiled layout of the record for a target.
+
+        Args:
+            target(:class:`~pwnypack.target.Target`): The target whose word
+                size and byte order to use. If ``None``, the current target
+                (see :func:`~pwnypack.target.current_target`) is used.
+
+        Returns:
+            struct.Struct: The compiled layout.
+        """
+
+        if target is None:
+            target = pwnypack.target.current_target()
+        endian = target.endian
+        bits = target.bits if cls._word_sized else None
+
+        s = cls._structs.get((bits, endian))
+        if s is None:
+            s = cls._structs[(bits, endian)] = struct.Struct(_endian_prefix(endian) + ''.join(
+                _RECORD_WORD_FORMATS[(fmt, bits)] if fmt in ('P', 'p') else fmt
+                for _, fmt in cls._formats
+            ))
+        return s
+
+    @classmethod
+    def _size(cls, target=None):
+        """
+        Get the size of the record for a target.
+
+        Args:
+            target(:class:`~pwnypack.target.Target`): The target. If ``None``,
+                the current target (see
+                :func:`~pwnypack.target.current_target`) is used.
+
+        Returns:
+            int: The size of the record in bytes.
+        """
+
+        return cls._layout(target).size
+
+    @classmethod
+    def _unpack(cls, data, offset=0, target=None):
+        """
+        Unpack a record from a buffer.
+
+        Args:
+            data(bytes): The buffer to unpack the record from.
+            offset(int): The offset of the record in the buffer.
+            target(:class:`~pwnypack.target.Target`): The target. If ``None``,
+                the current target (see
+                :func:`~pwnypack.target.current_target`) is used.
+
+        Returns:
+            Record: The unpacked record.
+        """
+
+        return cls(*cls._layout(target).unpack_from(data, offset))
+
+    @classmethod
+    def _unpack_many(cls, data, offset=0, count=None, target=None):
+        """
+        Unpack an array of consecutive records from a buffer in a single
+        pass. The buffer is not copied.
+
+        Args:
+            data(bytes): The buffer to unpack the records from.
+            offset(int): The offset of the first record in the buffer.
+            count(int): The number of records to unpack. If ``None``, all
+                the data starting at ``offset`` is unpacked.
+            target(:class:`~pwnypack.target.Target`): The target. If ``None``,
+                the current target (see
+                :func:`~pwnypack.target.current_target`) is used.
+
+        Returns:
+            list: The unpacked records.
+
+        Raises:
+            ValueError: If the data does not contain a whole number of
+                records (or less than ``count`` records).
+        """
+
+        s = cls._layout(target)
+        data = memoryview(data)[offset:]
+        if count is not None:
+            if len(data) < count * s.size:
+                raise ValueError('The data does not contain %d records' % count)
+            data = data[:count * s.size]
+        elif len(data) % s.size:
+            raise ValueError('The length of the data should be a multiple of %d' % s.size)
+        return list(itertools.starmap(cls, _iter_unpack(s, data)))
+
+    def _pack(self, target=None):
+        """
+        Pack the record.
+
+        Args:
+            target(:class:`~pwnypack.target.Target`): The target. If ``None``,
+                the current target (see
+                :func:`~pwnypack.target.current_target`) is used.
+
+        Returns:
+            bytes: The packed record.
+        """
+
+        return self._layout(target).pack(*[getattr(self, name) for name in self._fields])
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(
+            getattr(self, name) == getattr(other, name)
+            for name in self._fields
+        )
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '%s(%s)' % (self.__class__.__name__, ', '.join(
+            '%s=%r' % (name, getattr(self, name))
+            for name in self._fields
+        ))
+
+
+def record(name, fields, doc=None):
+    """
+    Create a :class:`Record` class for a C-like binary structure.
+
+    Each field is described by a name and a single ``struct`` format
+    character (``'s'`` and the ``'x'`` padding format can be prefixed by a
+    count). The special formats ``'P'`` and ``'p'`` describe an unsigned
+    and a signed integer with the word size of the target. Use ``None`` as
+    name for padding fields. The byte order is always determined by the
+    target and fields are never aligned.
+
+    Args:
+        name(str): The name of the record class.
+        fields(list of tuple): The ``(name, format)`` pairs describing the
+            fields of the record.
+        doc(str): The docstring of the record class.
+
+    Returns:
+        type: A :class:`Record` subclass using ``__slots__`` for its fields.
+
+    Example:
+        >>> from pwny import *
+        >>> Node = record('Node', [('next', 'P'), ('value', 'I'), (None, '4x')])
+        >>> Node._unpack(b'\\x00\\x10\\x00\\x00\\x00\\x00\\x00\\x00*\\x00\\x00\\x00\\x00\\x00\\x00\\x00',
+        ...             target=Target(arch=Target.Arch.x86, bits=64))
+        Node(next=4096, value=42)
+        >>> Node(next=0x41414141)._pack(Target(arch=Target.Arch.x86, bits=32))
+        b'AAAA\\x00\\x00\\x00\\x00\\x00\\x00\\x00\\x00'
+    """
+
+    formats, names, defaults = [], [], []
+    for field_name, fmt in fields:
+        if not _RECORD_FIELD_FORMAT.match(fmt):
+            raise ValueError('Invalid format for field %s: %r' % (field_name, fmt))
+        if field_name is None:
+            if fmt[-1] != 'x':
+                raise ValueError('Only padding fields can be unnamed')
+        else:
+            if fmt[-1] == 'x':
+                raise ValueError('Padding field %s should be unnamed' % field_name)
+            if field_name in names or field_name.startswith('_'):
+                raise ValueError('Invalid or duplicate field name: %s' % field_name)
+            names.append(field_name)
+            defaults.append(b'' if fmt[-1] == 's' else b'\0' if fmt == 'c' else 0)
+        formats.append((field_name, fmt))
+
+    return type(name, (Record,), {
+        '__doc__': doc,
+        '__slots__': tuple(names),
+        '_fields': tuple(names),
+        '_formats': tuple(formats),
+        '_defaults': tuple(defaults),
+        '_word_sized': any(fmt in ('P', 'p') for _, fmt in formats),
+        '_structs': {},
+    })
+
+
+def _flat_layout(item, offset, segments, packer):
+    """
+    Determine the position of each piece of data of a :func:`flat` item,
+    starting at ``offset``. Returns the offset of the end of the item.
+    """
+
+    if isinstance(item, dict):
+        start = offset
+        for key in sorted(item):
+            if start + key < offset:
+                raise ValueError('Item at offset %d overlaps with the previous item' % key)
+            offset = _flat_layout(item[key], start + key, segments, packer)
+        return offset
+    elif isinstance(item, (list, tuple)):
+        for sub_item in item:
+            offset = _flat_layout(sub_item, offset, segments, packer)
+        return offset
+    elif isinstance(item, six.integer_types):
+        data = packer.P(item) if item >= 0 else packer.p(item)
+    elif isinstance(item, six.text_type):
+        data = item.encode('latin1')
+    else:
+        data = item
+
+    if len(data):
+        segments.append((offset, data))
+    return offset + len(data)
+
+
+def flat(*items, **kwargs):
+    """flat(item1, item2, ..., length=None, filler=None, badchars=None, bits=None, endian=None, target=None)
+
+    Build a payload from a (nested) sequence of items in a single buffer.
+    The layout of the payload is determined first, after which all the
+    items are written into one preallocated buffer.
+
+    Items can be:
+
+    - :class:`bytes` (or any other buffer) and :class:`str`: Copied as-is.
+    - :class:`int`: Packed as a pointer for the target (see :func:`P` and
+      :func:`p`).
+    - :class:`list` and :class:`tuple`: The items are laid out one after the
+      other.
+    - :class:`dict`: Maps offsets (relative to the start of the dict) to
+      items. The gaps between the items are filled with the filler.
+
+    Args:
+        item1,item2,...: The items of the payload.
+        length(int): Pad the payload with the filler up to this length.
+        filler(bytes): The pattern used to fill gaps. Gaps contain the
+            pattern's bytes at the same positions they'd have if the entire
+            payload consisted of the pattern. If ``None``, the de Bruijn
+            sequence produced by :func:`~pwnypack.util.cycle` is used so the
+            offset of any part of the filler can be found using
+            :func:`~pwnypack.util.cycle_find`.
+        badchars(bytes): Raise an error if the payload contains any of
+            these bytes.
+        bits(:class:`~pwnypack.target.Target.Bits`): Override the word size
+            of the target.
+        endian(:class:`~pwnypack.target.Target.Endian`): Override the byte
+            order of the target.
+        target(:class:`~pwnypack.target.Target`): The target to pack the
+            pointers for. If ``None``, the current target (see
+            :func:`~pwnypack.target.current_target`) is used.
+
+    Returns:
+        bytes: The payload.
+
+    Raises:
+        ValueError: If items overlap, the payload exceeds ``length``, the
+            filler is empty or the payload contains bad characters.
+
+    Example:
+        >>> from pwny import *
+        >>> flat({4: 0x41424344, 12: [b'pw', b'ny']}, length=20, target=Target(arch=Target.Arch.x86, bits=32))
+        b'AAAADCBACAAApwnyEAAA'
+    """
+
+    length = kwargs.pop('length', None)
+    filler = kwargs.pop('filler', None)
+    badchars = kwargs.pop('badchars', None)
+    packer = Packer.for_target(kwargs.pop('target', None), kwargs.pop('bits', None), kwargs.pop('endian', None))
+    if kwargs:
+        raise TypeError('Unexpected keyword argument(s): %s' % ', '.join(sorted(kwargs)))
+    if filler is not None:
+        if isinstance(filler, six.text_type):
+            filler = filler.encode('latin1')
+        if not len(filler):
+            raise ValueError('The filler can not be empty')
+
+    segments = []
+    end = _flat_layout(items, 0, segments, packer)
+    if length is not None:
+        if end > length:
+            raise ValueError('The payload is %d bytes long, which exceeds the length of %d bytes' % (end, length))
+        end = length
+
+    buf = bytearray(end)
+    gaps = []
+    offset = 0
+    for segment_offset, data in segments + [(end, b'')]:
+        if segment_offset > offset:
+            gaps.append((offset, segment_offset))
+        buf[segment_offset:segment_offset + len(data)] = data
+        offset = segment_offset + len(data)
+
+    if gaps:
+        # Only generate the filler up to the end of the last gap.
+        fill_end = gaps[-1][1]
+        if filler is None:
+            fill = pwnypack.util.cycle_bytes(fill_end)
+        else:
+            fill = bytes(filler) * (fill_end // len(filler) + 1)
+        for gap_start, gap_end in gaps:
+            buf[gap_start:gap_end] = fill[gap_start:gap_end]
+
+    if badchars:
+        bad_offsets = [
+            bad_offset
+            for bad_offset in (buf.find(six.int2byte(c)) for c in set(bytearray(badchars)))
+            if bad_offset != -1
+        ]
+        if bad_offsets:
+            bad_offset = min(bad_offsets)
+            raise ValueError('The payload contains bad character 0x%02x at offset %d' % (buf[bad_offset], bad_offset))
+
+    return bytes(buf)
+
+
+class VarintMode(Enum):
+    """
+    The flavour of variable length integer encoding.
+    """
+
+    unsigned = 'unsigned'  #: Unsigned LEB128 (protobuf varint).
+    signed = 'signed'      #: Signed (two's complement) LEB128.
+    zigzag = 'zigzag'      #: Zigzag encoded signed integer (protobuf sint).
+
+
+def _zigzag_encode(value):
+    return value << 1 if value >= 0 else (-value << 1) - 1
+
+
+def _zigzag_decode(value):
+    return (value >> 1) ^ -(value & 1)
+
+
+def pack_varint(value, mode=VarintMode.unsigned):
+    """
+    Encode an integer as a variable length integer.
+
+    Args:
+        value(int): The value to encode.
+        mode(:class:`VarintMode`): The flavour of the encoding.
+
+    Returns:
+        bytes: The encoded value.
+
+    Raises:
+        ValueError: If a negative value is encoded as an unsigned varint.
+
+    Example:
+        >>> from pwny import *
+        >>> pack_varint(300)
+        b'\\xac\\x02'
+        >>> pack_varint(-2, VarintMode.zigzag)
+        b'\\x03'
+    """
+
+    mode = VarintMode(mode)
+    if mode is VarintMode.zigzag:
+        value = _zigzag_encode(value)
+    elif mode is VarintMode.unsigned and value < 0:
+        raise ValueError('Unsigned varints can not be negative')
+
+    result = bytearray()
+    if mode is VarintMode.signed:
+        while True:
+            byte = value & 0x7f
+            value >>= 7
+            if (value == 0 and not byte & 0x40) or (value == -1 and byte & 0x40):
+                result.append(byte)
+                return bytes(result)
+            result.append(byte | 0x80)
+    else:
+        while value >= 0x80:
+            result.append((value & 0x7f) | 0x80)
+            value >>= 7
+        result.append(value)
+        return bytes(result)
+
+
+def unpack_varint(data, offset=0, mode=VarintMode.unsigned):
+    """
+    Decode a variable length integer.
+
+    Args:
+        data(bytes): The buffer that contains the varint.
+        offset(int): The offset of the varint in the buffer.
+        mode(:class:`VarintMode`): The flavour of the encoding.
+
+    Returns:
+        tuple: The decoded value and the offset of the first byte after the
+            varint.
+
+    Raises:
+        ValueError: If the buffer ends before the varint is complete.
+
+    Example:
+        >>> from pwny import *
+        >>> unpack_varint(b'\\xac\\x02')
+        (300, 2)
+    """
+
+    mode = VarintMode(mode)
+    data = memoryview(data)
+    value = shift = 0
+    for pos in range(offset, len(data)):
+        byte = six.indexbytes(data, pos) if six.PY2 else data[pos]
+        value |= (byte & 0x7f) << shift
+        shift += 7
+        if not byte & 0x80:
+            break
+    else:
+        raise ValueError('Incomplete varint at offset %d' % offset)
+
+    if mode is VarintMode.signed:
+        if byte & 0x40:
+            value -= 1 << shift
+    elif mode is VarintMode.zigzag:
+        value = _zigzag_decode(value)
+    return value, pos + 1
+
+
+def _pack_varints_numpy(values, mode):
+    if mode is VarintMode.signed:
+        v = numpy.array(values, dtype=numpy.int64)
+        # The number of groups is determined by the magnitude and the sign bit.
+        magnitude = (v ^ (v >> 63)).view(numpy.uint64) << numpy.uint64(1)
+        shifts = numpy.arange(10, dtype=numpy.int64) * 7
+    else:
+        if mode is VarintMode.zigzag:
+            v = numpy.array(values, dtype=numpy.int64)
+            v = ((v << 1) ^ (v >> 63)).view(numpy.uint64)
+        else:
+            v = numpy.array(values, dtype=numpy.uint64)
+        magnitude = v
+        shifts = numpy.arange(10, dtype=numpy.uint64) * numpy.uint64(7)
+
+    n = numpy.ones(len(v), dtype=numpy.intp)
+    for k in range(1, 10):
+        n += (magnitude >> numpy.uint64(7 * k)) != 0
+
+    # One row of 10 groups per value, keep the first n groups of each row.
+    groups = (v[:, None] >> shifts).astype(numpy.uint8) & 0x7f
+    index = numpy.arange(10)
+    groups[index < (n[:, None] - 1)] |= 0x80
+    return groups[index < n[:, None]].tobytes()
+
+
+def pack_varints(values, mode=VarintMode.unsigned):
+    """
+    Encode a sequence of integers as consecutive variable length integers.
+    If *numpy* is installed and all values fit in 64 bits, the values are
+    encoded in a single vectorized pass.
+
+    Args:
+        values(iterable of int): The values to encode.
+        mode(:class:`VarintMode`): The flavour of the encoding.
+
+    Returns:
+        bytes: The encoded values.
+
+    Raises:
+        ValueError: If a negative value is encoded as an unsigned varint.
+
+    Example:
+        >>> from pwny import *
+        >>> pack_varints([1, 300, 2])
+        b'\\x01\\xac\\x02\\x02'
+    """
+
+    mode = VarintMode(mode)
+    if not isinstance(values, (list, tuple, array.array)):
+        values = list(values)
+
+    if HAVE_NUMPY and len(values):
+        try:
+            return _pack_varints_numpy(values, mode)
+        except OverflowError:
+            # Negative or larger than 64 bit values, use the generic path.
+            pass
+
+    if mode is VarintMode.signed:
+        return b''.join(pack_varint(value, mode) for value in values)
+
+    result = bytearray()
+    append = result.append
+    for value in values:
+        if mode is VarintMode.zigzag:
+            value = value << 1 if value >= 0 else (-value << 1) - 1
+        elif value < 0:
+            raise ValueError('Unsigned varints can not be negative')
+        while value >= 0x80:
+            append((value & 0x7f) | 0x80)
+            value >>= 7
+        append(value)
+    return bytes(result)
+
+
+def _unpack_varints_numpy(data, offset, count, signed):
+    a = numpy.frombuffer(data, dtype=numpy.uint8, offset=offset)
+    ends = numpy.flatnonzero(a < 0x80)
+    if count is not None:
+        ends = ends[:count]
+    if not len(ends):
+        return numpy.array([offset], dtype=numpy.uint64), numpy.zeros(0, dtype=numpy.uint64), None
+
+    a = a[:ends[-1] + 1]
+    starts = numpy.concatenate(([0], ends[:-1] + 1))
+    lengths = ends - starts + 1
+    long_ones = numpy.flatnonzero(lengths > 9)
+
+    # The position of each byte within its varint.
+    position = numpy.arange(len(a)) - numpy.repeat(starts, lengths)
+    position[position > 9] = 9
+    shifted = (a & 0x7f).astype(numpy.uint64) << (position.astype(numpy.uint64) * numpy.uint64(7))
+    values = numpy.add.reduceat(shifted, starts)
+
+    if signed:
+        negative = (a[ends] & 0x40) != 0
+        short = lengths < 10
+        sign = negative & short
+        values[sign] |= ~((numpy.uint64(1) << (lengths[sign].astype(numpy.uint64) * numpy.uint64(7))) -
+                          numpy.uint64(1))
+
+    offsets = numpy.concatenate((starts, [len(a)])).astype(numpy.uint64) + numpy.uint64(offset)
+    return offsets, values, long_ones
+
+
+def unpack_varints(data, offset=0, count=None, mode=VarintMode.unsigned):
+    """
+    Decode consecutive variable length integers from a buffer in one pass.
+    The buffer is read in place, it is not copied. If *numpy* is installed,
+    the varints are decoded using vectorized operations.
+
+    Decoding stops at the end of the buffer (an incomplete varint at the end
+    is not consumed) or after ``count`` varints.
+
+    Args:
+        data(bytes): The buffer that contains the varints.
+        offset(int): The offset of the first varint in the buffer.
+        count(int): The maximum number of varints to decode.
+        mode(:class:`VarintMode`): The flavour of the encoding.
+
+    Returns:
+        tuple: An :class:`array.array` of offsets and an
+            :class:`array.array` of values. Varint ``i`` spans from
+            ``offsets[i]`` to ``offsets[i + 1]``. The last offset is the
+            offset of the first byte that was not consumed.
+
+    Raises:
+        ValueError: If a value doesn't fit in 64 bits.
+
+    Example:
+        >>> from pwny import *
+        >>> offsets, values = unpack_varints(b'\\x01\\xac\\x02\\x02\\x80')
+        >>> list(offsets), list(values)
+        ([0, 1, 3, 4], [1, 300, 2])
+    """
+
+    mode = VarintMode(mode)
+    data = memoryview(data)
+    signed = mode is VarintMode.signed
+    offsets = array.array(_array_typecode(8, False))
+    values = array.array(_array_typecode(8, mode is not VarintMode.unsigned))
+
+    if HAVE_NUMPY:
+        np_offsets, np_values, long_ones = _unpack_varints_numpy(data, offset, count, signed)
+        if long_ones is not None and len(long_ones):
+            # Varints of 10 bytes or more are checked and decoded separately.
+            np_values = np_values.astype(object)
+            for i in long_ones:
+                value, _ = unpack_varint(data, int(np_offsets[i]), VarintMode.unsigned if not signed else mode)
+                if signed:
+                    if not -1 << 63 <= value < 1 << 63:
+                        raise ValueError('Varint at offset %d does not fit in 64 bits' % np_offsets[i])
+                    value &= (1 << 64) - 1
+                elif value >> 64:
+                    raise ValueError('Varint at offset %d does not fit in 64 bits' % np_offsets[i])
+                np_values[i] = value
+            np_values = np_values.astype(numpy.uint64)
+        if mode is VarintMode.zigzag:
+            np_values = ((np_values >> numpy.uint64(1)).view(numpy.int64) ^
+                         -(np_values & numpy.uint64(1)).view(numpy.int64))
+        _array_frombytes(offsets, np_offsets.tobytes())
+        _array_frombytes(values, np_values.tobytes())
+        return offsets, values
+
+    if six.PY2:
+        data = bytearray(data)
+    end = len(data)
+    pos = offset
+    while pos < end and (count is None or len(values) < count):
+        start = pos
+        byte = data[pos]
+        value = byte & 0x7f
+        shift = 7
+        pos += 1
+        while byte & 0x80 and pos < end:
+            byte = data[pos]
+            value |= (byte & 0x7f) << shift
+            shift += 7
+            pos += 1
+        if byte & 0x80:
+            # Incomplete varint at the end of the buffer.
+            pos = start
+            break
+
+        if signed and byte & 0x40:
+            value -= 1 << shift
+        elif mode is VarintMode.zigzag:
+            value = (value >> 1) ^ -(value & 1)
+        offsets.append(start)
+        try:
+            values.append(value)
+        except OverflowError:
+            raise ValueError('Varint at offset %d does not fit in 64 bits' % start)
+    offsets.append(pos)
+    return offsets, values
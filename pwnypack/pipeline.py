@@ -0,0 +1,323 @@
+"""
+The pipeline module lets you chain the transformations from the
+:mod:`~pwnypack.codec` module into a single streaming pipeline. Data flows
+through the stages of a pipeline chunk by chunk, stateful stages (like xor
+or base64 decoding) carry their state across chunk boundaries.
+
+A pipeline can be built from stage callables or from a textual
+specification in which stages are separated by ``|`` and stage arguments
+are separated by ``:``.
+
+Examples:
+    >>> from pwny import *
+    >>> p = Pipeline.parse('deb64 | xor:pwny | enhex')
+    >>> p.process(b'MTUtPQ==')
+    b'41424344'
+"""
+
+import argparse
+import functools
+import inspect
+
+from six.moves.urllib.parse import quote, quote_plus, unquote_to_bytes
+try:
+    from collections import OrderedDict
+except ImportError:
+    from ordereddict import OrderedDict
+
+import pwnypack.codec
+import pwnypack.main
+
+
+__all__ = [
+    'Pipeline',
+    'register_stage',
+]
+
+
+PIPELINE_STAGES = OrderedDict()
+
+
+def register_stage(name=None):
+    """
+    Register a function as a pipeline stage that can be used in pipeline
+    specifications. The function receives an iterable of byte chunks
+    followed by the (string) arguments of the stage and should return an
+    iterable of byte chunks.
+
+    Args:
+        name(str): The name of the stage. Defaults to the function's name.
+    """
+
+    def wrapper(f):
+        f_name = f.__name__ if name is None else name
+        if f_name in PIPELINE_STAGES:
+            raise ValueError('Duplicate pipeline stage %s' % f_name)
+        PIPELINE_STAGES[f_name] = f
+        return f
+    return wrapper
+
+
+def _encode_chunks(chunks):
+    for chunk in chunks:
+        yield chunk.encode('ascii')
+
+
+def _parse_key(key):
+    if key.startswith('0x'):
+        return pwnypack.codec.dehex(key[2:])
+    return key.encode('latin1')
+
+
+@register_stage('xor')
+def xor_stage(chunks, key):
+    """
+    xor:KEY - xor with a key (use a 0x prefix for a hexadecimal key).
+    """
+
+    return pwnypack.codec.xor_stream(_parse_key(key), chunks)
+
+
+@register_stage('caesar')
+def caesar_stage(chunks, shift, *shift_ranges):
+    """
+    caesar:SHIFT[:RANGE...] - apply a caesar shift (ranges default to az:AZ).
+    """
+
+    shift = int(shift)
+    shift_ranges = shift_ranges or ('az', 'AZ')
+    for chunk in chunks:
+        yield pwnypack.codec.caesar(shift, bytes(chunk), shift_ranges)
+
+
+@register_stage('rot13')
+def rot13_stage(chunks):
+    """
+    rot13 - rotate the letters of the alphabet by 13 positions.
+    """
+
+    return caesar_stage(chunks, 13)
+
+
+@register_stage('enhex')
+def enhex_stage(chunks, separator=''):
+    """
+    enhex[:SEPARATOR] - hex encode.
+    """
+
+    return _encode_chunks(pwnypack.codec.enhex_stream(chunks, separator))
+
+
+@register_stage('dehex')
+def dehex_stage(chunks):
+    """
+    dehex - hex decode, ignoring non-hex characters.
+    """
+
+    return pwnypack.codec.dehex_stream(chunks)
+
+
+@register_stage('enb64')
+def enb64_stage(chunks):
+    """
+    enb64 - base64 encode.
+    """
+
+    return _encode_chunks(pwnypack.codec.enb64_stream(chunks))
+
+
+@register_stage('deb64')
+def deb64_stage(chunks):
+    """
+    deb64 - base64 decode, ignoring non-base64 characters.
+    """
+
+    return pwnypack.codec.deb64_stream(chunks)
+
+
+@register_stage('enbase')
+def enbase_stage(chunks, variant='b64', padding=None):
+    """
+    enbase[:VARIANT[:nopad]] - base-N encode (b64, b64url, b32, b85 or an alphabet).
+    """
+
+    return pwnypack.codec.enbase_stream(chunks, variant, padding != 'nopad')
+
+
+@register_stage('debase')
+def debase_stage(chunks, variant='b64'):
+    """
+    debase[:VARIANT] - base-N decode, ignoring characters not in the alphabet.
+    """
+
+    return pwnypack.codec.debase_stream(chunks, variant)
+
+
+@register_stage('enurlquote')
+def enurlquote_stage(chunks, plus=None):
+    """
+    enurlquote[:plus] - percent encode (optionally using + for spaces).
+    """
+
+    f = quote_plus if plus == 'plus' else quote
+    for chunk in chunks:
+        yield f(bytes(chunk)).encode('ascii')
+
+
+@register_stage('deurlquote')
+def deurlquote_stage(chunks, plus=None):
+    """
+    deurlquote[:plus] - percent decode (optionally parsing + as space).
+    """
+
+    pending = b''
+    for chunk in chunks:
+        chunk = pending + bytes(chunk)
+        # Keep an incomplete percent escape for the next chunk.
+        escape = chunk.find(b'%', len(chunk) - 2)
+        if escape != -1:
+            chunk, pending = chunk[:escape], chunk[escape:]
+        else:
+            pending = b''
+        if plus == 'plus':
+            chunk = chunk.replace(b'+', b' ')
+        yield unquote_to_bytes(chunk)
+    if pending:
+        yield unquote_to_bytes(pending.replace(b'+', b' ') if plus == 'plus' else pending)
+
+
+def _apply_stage(stage, args, chunks):
+    return stage(chunks, *args)
+
+
+_getargspec = getattr(inspect, 'getfullargspec', None) or inspect.getargspec
+
+
+def _check_stage_args(name, stage, args):
+    """
+    Raise ValueError if a stage doesn't accept the number of arguments given
+    in a pipeline specification.
+    """
+
+    try:
+        spec = _getargspec(stage)
+    except TypeError:
+        # Not a python function, let the stage sort it out.
+        return
+
+    max_args = len(spec.args) - 1
+    min_args = max_args - len(spec.defaults or ())
+    if spec.varargs is not None:
+        max_args = None
+
+    if len(args) < min_args or (max_args is not None and len(args) > max_args):
+        if max_args is None:
+            expected = 'at least %d' % min_args
+        elif min_args == max_args:
+            expected = '%d' % min_args
+        else:
+            expected = '%d to %d' % (min_args, max_args)
+        raise ValueError('Pipeline stage %s takes %s argument(s), got %d' % (name, expected, len(args)))
+
+
+class Pipeline(object):
+    """
+    A chain of streaming stages. Each stage is a callable that takes an
+    iterable of byte chunks and returns an iterable of byte chunks.
+
+    Args:
+        stage...(callable): The stages of the pipeline.
+    """
+
+    def __init__(self, *stages):
+        self.stages = list(stages)
+
+    @classmethod
+    def parse(cls, spec):
+        """
+        Create a pipeline from a textual specification. Stages are separated
+        by ``|``, a stage's arguments are separated from its name and from
+        each other by ``:``.
+
+        Args:
+            spec(str): The pipeline specification.
+
+        Returns:
+            :class:`Pipeline`: The pipeline.
+
+        Raises:
+            ValueError: If the specification refers to an unknown stage, if
+                a stage is passed the wrong number of arguments or if an
+                argument is empty.
+
+        Example:
+            >>> from pwny import *
+            >>> Pipeline.parse('deb64 | xor:0x2a | enhex').process(b'a2tr')
+            b'414141'
+        """
+
+        stages = []
+        for stage_spec in spec.split('|'):
+            name, sep, args = stage_spec.strip().partition(':')
+            stage = PIPELINE_STAGES.get(name)
+            if stage is None:
+                raise ValueError('Unknown pipeline stage: %s' % name)
+            args = args.split(':') if sep else []
+            if '' in args:
+                raise ValueError('Empty argument for pipeline stage: %s' % name)
+            _check_stage_args(name, stage, args)
+            if args:
+                stage = functools.partial(_apply_stage, stage, args)
+            stages.append(stage)
+        return cls(*stages)
+
+    def __call__(self, chunks):
+        """
+        Feed an iterable of chunks through the pipeline.
+
+        Args:
+            chunks(iterable of bytes): The input chunks.
+
+        Returns:
+            iterable of bytes: The output chunks.
+        """
+
+        for stage in self.stages:
+            chunks = stage(chunks)
+        return chunks
+
+    def process(self, data):
+        """
+        Feed a single buffer through the pipeline.
+
+        Args:
+            data(bytes): The input data.
+
+        Returns:
+            bytes: The output of the pipeline.
+        """
+
+        return b''.join(self([data]))
+
+
+@pwnypack.main.register('pipe')
+def pipe_app(parser, cmd, args):  # pragma: no cover
+    """
+    Stream a value through a pipeline of transformations.
+    """
+
+    parser.epilog = 'available stages:\n' + '\n'.join(
+        '  ' + stage.__doc__.strip()
+        for stage in PIPELINE_STAGES.values()
+    )
+    parser.formatter_class = argparse.RawDescriptionHelpFormatter
+    parser.add_argument('pipeline', help='the pipeline specification (f.e. \'deb64 | xor:key | enhex\')')
+    parser.add_argument('value', help='the value to transform, read from stdin if omitted', nargs='?')
+    args = parser.parse_args(args)
+
+    try:
+        pipeline = Pipeline.parse(args.pipeline)
+    except ValueError as e:
+        parser.error(str(e))
+
+    return pipeline(pwnypack.main.binary_chunks_or_stdin(args.value))
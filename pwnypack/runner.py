@@ -0,0 +1,494 @@
+"""
+The runner module runs the same exploit against many targets in parallel,
+for example against the services of all teams in an attack / defense CTF.
+
+The exploit is a function that receives a :class:`~pwnypack.flow.Flow`
+connected to a target. It is run for all targets concurrently, either
+using a bounded pool of worker threads or, if the exploit is a coroutine
+function that receives an :class:`~pwnypack.asyncflow.AsyncFlow`, on an
+asyncio event loop. Results (and exceptions) are produced as soon as a
+target is done, so the total run time is close to that of the slowest
+target.
+
+Examples:
+    >>> from pwny import *
+    >>> def exploit(flow):
+    ...     flow.writeline(b'get_flag')
+    ...     return flow.readline()
+    >>> results = list(run(exploit, ['10.0.%d.1:1337' % i for i in range(1, 30)], timeout=5))
+    >>> run_summary(results)['succeeded']
+    29
+"""
+
+from __future__ import division, print_function
+
+import argparse
+import importlib
+import inspect
+import itertools
+import os
+import runpy
+import socket
+import sys
+import threading
+import time
+from multiprocessing.pool import ThreadPool
+
+import six
+
+import pwnypack.flow
+import pwnypack.main
+
+
+__all__ = [
+    'parse_target',
+    'run',
+    'run_summary',
+]
+
+
+RUN_MAX_WORKERS = 64
+
+
+_clock = getattr(time, 'monotonic', time.time)
+
+
+def parse_target(target):
+    """
+    Parse a target specification.
+
+    Args:
+        target(str or tuple): A ``host:port`` string (use ``[host]:port``
+            for IPv6 addresses) or a ``(host, port)`` tuple.
+
+    Returns:
+        tuple: The host and the port number.
+
+    Raises:
+        ValueError: If the target specification is invalid.
+
+    Example:
+        >>> from pwny import *
+        >>> parse_target('10.0.0.1:1337')
+        ('10.0.0.1', 1337)
+    """
+
+    if isinstance(target, six.string_types):
+        host, sep, port = target.strip().rpartition(':')
+        if not sep or not host:
+            raise ValueError('Invalid target: %s' % target)
+        if host.startswith('[') and host.endswith(']'):
+            host = host[1:-1]
+    else:
+        host, port = target
+
+    try:
+        return host, int(port)
+    except ValueError:
+        raise ValueError('Invalid port number in target: %s' % (target,))
+
+
+def _run_result(target, elapsed, result=None, error=None):
+    return {
+        'target': target,
+        'result': result,
+        'error': error,
+        'timeout': isinstance(error, (pwnypack.flow.FlowTimeout, socket.timeout)),
+        'elapsed': elapsed,
+    }
+
+
+def _run_threads(exploit, targets, workers, timeout):
+    results = six.moves.queue.Queue()
+    active = {}
+    lock = threading.Lock()
+
+    def worker(index):
+        start = _clock()
+        flow = None
+        result = error = None
+        try:
+            flow = pwnypack.flow.Flow.connect_tcp(*targets[index], timeout=timeout)
+            with lock:
+                active[index] = start, flow
+            # Wake up the main thread so it can keep track of the deadline.
+            results.put((index, None))
+            result = exploit(flow)
+        except Exception as e:
+            error = e
+        finally:
+            with lock:
+                active.pop(index, None)
+            if flow is not None:
+                try:
+                    flow.close()
+                except Exception:
+                    pass
+        results.put((index, _run_result(targets[index], _clock() - start, result, error)))
+
+    pool = ThreadPool(workers)
+    try:
+        for index in range(len(targets)):
+            pool.apply_async(worker, (index,))
+        pool.close()
+
+        pending = set(range(len(targets)))
+        while pending:
+            wait = None
+            if timeout is not None:
+                # Abort the targets that have exceeded their timeout. Killing
+                # the flow wakes up the worker thread blocked on it.
+                now = _clock()
+                with lock:
+                    expired = [
+                        (index, start, flow)
+                        for index, (start, flow) in active.items()
+                        if now - start >= timeout
+                    ]
+                    for index, _, _ in expired:
+                        del active[index]
+                    if active:
+                        wait = timeout - (now - min(start for start, _ in active.values()))
+                    else:
+                        wait = timeout
+
+                for index, start, flow in expired:
+                    pending.discard(index)
+                    error = pwnypack.flow.FlowTimeout(flow.buffered)
+                    try:
+                        flow.kill()
+                    except Exception:
+                        pass
+                    yield _run_result(targets[index], now - start, error=error)
+
+            try:
+                index, result = results.get(timeout=wait)
+            except six.moves.queue.Empty:
+                continue
+
+            if result is not None and index in pending:
+                pending.discard(index)
+                yield result
+    finally:
+        pool.terminate()
+
+
+def _run_async(exploit, targets, workers, timeout):
+    """
+    Run a coroutine function exploit against the targets on a new asyncio
+    event loop, at most ``workers`` at a time.
+
+    This module has to remain importable on python 2, so the targets are
+    driven by callbacks on futures instead of by coroutines.
+    """
+
+    import asyncio
+    from pwnypack.asyncflow import AsyncFlow
+
+    loop = asyncio.new_event_loop()
+    active = {}
+    closing = {}
+
+    def close(flow):
+        # Gracefully close the flows of the targets that succeeded, they are
+        # only killed if closing them doesn't finish in time.
+        task = loop.create_task(flow.close())
+        closing[task] = flow
+        task.add_done_callback(on_close)
+
+    def on_close(task):
+        del closing[task]
+        if not task.cancelled():
+            # The target already succeeded, ignore errors while closing.
+            task.exception()
+
+    def start(target):
+        started = _clock()
+        done = loop.create_future()
+        state = active[done] = {'flow': None, 'task': None, 'timer': None}
+
+        def finish(result=None, error=None):
+            if done.done():
+                return
+            if state['timer'] is not None:
+                state['timer'].cancel()
+            flow = state['flow']
+            if flow is not None:
+                if error is None:
+                    close(flow)
+                else:
+                    flow.kill()
+            done.set_result(_run_result(target, _clock() - started, result, error))
+
+        def on_exploit(task):
+            if not task.cancelled():
+                error = task.exception()
+                finish(None if error is not None else task.result(), error)
+
+        def on_connect(task):
+            if task.cancelled():
+                return
+            error = task.exception()
+            if isinstance(error, asyncio.TimeoutError):
+                finish(error=pwnypack.flow.FlowTimeout(b''))
+            elif error is not None:
+                finish(error=error)
+            else:
+                state['flow'] = task.result()
+                state['task'] = loop.create_task(exploit(state['flow']))
+                state['task'].add_done_callback(on_exploit)
+
+        def on_timeout():
+            flow = state['flow']
+            state['task'].cancel()
+            finish(error=pwnypack.flow.FlowTimeout(flow.buffered if flow is not None else b''))
+
+        state['task'] = loop.create_task(AsyncFlow.connect_tcp(*target, timeout=timeout))
+        state['task'].add_done_callback(on_connect)
+        if timeout is not None:
+            state['timer'] = loop.call_later(timeout, on_timeout)
+        return done
+
+    queued = iter(targets)
+    pending = set()
+    try:
+        while True:
+            for target in itertools.islice(queued, workers - len(pending)):
+                pending.add(start(target))
+            if not pending:
+                break
+            done, pending = loop.run_until_complete(asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED))
+            for future in done:
+                del active[future]
+                yield future.result()
+    finally:
+        tasks = []
+        for state in active.values():
+            if state['timer'] is not None:
+                state['timer'].cancel()
+            state['task'].cancel()
+            tasks.append(state['task'])
+            if state['flow'] is not None:
+                state['flow'].kill()
+        if tasks:
+            loop.run_until_complete(asyncio.wait(tasks))
+        if closing:
+            _, tasks = loop.run_until_complete(asyncio.wait(list(closing), timeout=timeout))
+            for task in tasks:
+                task.cancel()
+                closing[task].kill()
+            if tasks:
+                loop.run_until_complete(asyncio.wait(tasks))
+        # Let the aborted transports clean up before closing the loop.
+        loop.run_until_complete(asyncio.sleep(0))
+        loop.close()
+
+
+def run(exploit, targets, workers=None, timeout=None, mode=None):
+    """
+    Run an exploit against a list of TCP services concurrently.
+
+    For each target, a connection is set up and passed to the exploit. The
+    connection is closed when the exploit returns. The exploit is either a
+    regular function which receives a :class:`~pwnypack.flow.Flow` and is
+    run by a pool of worker threads or a coroutine function which receives
+    an :class:`~pwnypack.asyncflow.AsyncFlow` and is run on an asyncio event
+    loop (python 3.5+).
+
+    The results are produced in the order in which the targets finish. Each
+    result is described by a dictionary with the following fields:
+
+    - target: The target as a ``(host, port)`` tuple.
+    - result: The return value of the exploit or ``None`` if it failed.
+    - error: The exception raised by the exploit (or while connecting) or
+      ``None`` if it succeeded.
+    - timeout: Whether the target timed out.
+    - elapsed: The number of seconds it took to run the exploit, including
+      setting up the connection.
+
+    Args:
+        exploit(callable): The exploit to run.
+        targets(list): The targets, see :func:`parse_target`.
+        workers(int): The maximum number of targets to run at the same time.
+            Defaults to the number of targets, limited to
+            :data:`RUN_MAX_WORKERS` worker threads.
+        timeout(float): The maximum number of seconds to spend on a single
+            target. It is also used as the connect timeout and as the default
+            timeout of the read operations on the flow.
+        mode(str): ``'thread'`` or ``'async'``. Defaults to ``'async'`` for
+            coroutine functions and to ``'thread'`` otherwise.
+
+    Returns:
+        generator of dict: The results.
+
+    Raises:
+        ValueError: If one of the targets or the mode is invalid.
+    """
+
+    targets = [parse_target(target) for target in targets]
+    if not targets:
+        return iter(())
+
+    if mode is None:
+        iscoroutinefunction = getattr(inspect, 'iscoroutinefunction', None)
+        mode = 'async' if iscoroutinefunction is not None and iscoroutinefunction(exploit) else 'thread'
+
+    if mode == 'thread':
+        if workers is None:
+            workers = min(len(targets), RUN_MAX_WORKERS)
+        return _run_threads(exploit, targets, workers, timeout)
+    elif mode == 'async':
+        if sys.version_info < (3, 5):
+            raise ValueError('The async run mode requires python 3.5 or newer.')
+        if not inspect.iscoroutinefunction(exploit):
+            raise ValueError('The exploit must be a coroutine function in async mode.')
+        return _run_async(exploit, targets, workers or len(targets), timeout)
+    else:
+        raise ValueError('Invalid run mode: %s' % mode)
+
+
+def _percentile(values, percentile):
+    return values[min(len(values) - 1, int(len(values) * percentile / 100))]
+
+
+def run_summary(results):
+    """
+    Summarize the results of :func:`run`.
+
+    Args:
+        results(list of dict): The results produced by :func:`run`.
+
+    Returns:
+        dict: A dictionary containing the number of ``targets``, the number
+            of targets that ``succeeded``, ``failed`` and for which a
+            ``timeout`` occurred (timeouts are included in the failures) and
+            the ``min``, ``mean``, ``median``, ``p90`` and ``max`` latency in
+            seconds (``None`` if there are no results).
+    """
+
+    latencies = sorted(result['elapsed'] for result in results)
+    failed = sum(1 for result in results if result['error'] is not None)
+    summary = {
+        'targets': len(results),
+        'succeeded': len(results) - failed,
+        'failed': failed,
+        'timeout': sum(1 for result in results if result['timeout']),
+        'min': None,
+        'mean': None,
+        'median': None,
+        'p90': None,
+        'max': None,
+    }
+    if latencies:
+        summary.update({
+            'min': latencies[0],
+            'mean': sum(latencies) / len(latencies),
+            'median': _percentile(latencies, 50),
+            'p90': _percentile(latencies, 90),
+            'max': latencies[-1],
+        })
+    return summary
+
+
+def _load_exploit(spec):
+    """
+    Load an exploit function from ``module:function`` or
+    ``path/to/file.py:function``. The function name defaults to
+    ``exploit``.
+    """
+
+    path, sep, name = spec.rpartition(':')
+    if not sep or os.sep in name or name.endswith('.py'):
+        path, name = spec, 'exploit'
+
+    if path.endswith('.py') or os.sep in path:
+        namespace = runpy.run_path(path)
+        if name not in namespace:
+            raise ImportError('%s does not define %s' % (path, name))
+        return namespace[name]
+    else:
+        return getattr(importlib.import_module(path), name)
+
+
+@pwnypack.main.register('run', symlink=False)
+def run_app(parser, cmd, args):  # pragma: no cover
+    """
+    Run an exploit against many targets in parallel.
+    """
+
+    parser.add_argument(
+        'exploit',
+        help='the exploit function (module:function or path/to/file.py:function, the function name '
+             'defaults to exploit)',
+    )
+    parser.add_argument('target', nargs='*', help='the targets (host:port)')
+    parser.add_argument(
+        '--targets', '-T',
+        type=argparse.FileType('r'),
+        help='read targets from a file (one host:port per line, use - for stdin)',
+    )
+    parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        help='the maximum number of targets to run at the same time',
+    )
+    parser.add_argument('--timeout', '-t', type=float, help='the timeout per target in seconds')
+    parser.add_argument(
+        '--thread',
+        dest='mode',
+        action='store_const',
+        const='thread',
+        help='run the exploit using worker threads (default for regular functions)',
+    )
+    parser.add_argument(
+        '--async',
+        dest='mode',
+        action='store_const',
+        const='async',
+        help='run the exploit on an asyncio event loop (default for coroutine functions)',
+    )
+    args = parser.parse_args(args)
+
+    targets = list(args.target)
+    if args.targets is not None:
+        targets.extend(
+            line.strip()
+            for line in args.targets
+            if line.strip() and not line.strip().startswith('#')
+        )
+    if not targets:
+        parser.error('No targets specified.')
+
+    try:
+        exploit = _load_exploit(args.exploit)
+    except (ImportError, AttributeError, IOError) as e:
+        parser.error('Could not load exploit: %s' % e)
+
+    try:
+        results = run(exploit, targets, args.jobs, args.timeout, args.mode)
+    except ValueError as e:
+        parser.error(str(e))
+
+    start = _clock()
+    collected = []
+    for result in results:
+        collected.append(result)
+        if result['error'] is None:
+            status, detail = 'ok', repr(result['result'])
+        else:
+            status = 'timeout' if result['timeout'] else 'error'
+            detail = '%s: %s' % (type(result['error']).__name__, result['error'])
+        print('%s:%d\t%s\t%.3fs\t%s' % (result['target'] + (status, result['elapsed'], detail)))
+        sys.stdout.flush()
+    wall_time = _clock() - start
+
+    summary = run_summary(collected)
+    print(
+        '%(targets)d targets, %(succeeded)d succeeded, %(failed)d failed (%(timeout)d timeouts)' % summary,
+        file=sys.stderr,
+    )
+    print(
+        'latency: min %(min).3fs, mean %(mean).3fs, median %(median).3fs, p90 %(p90).3fs, max %(max).3fs' % summary,
+        file=sys.stderr,
+    )
+    print('wall time: %.3fs' % wall_time, file=sys.stderr)
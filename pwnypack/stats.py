@@ -0,0 +1,415 @@
+"""
+The stats module contains functions to gather statistics about byte
+sequences, files or ELF sections. It can be used to find packed, compressed
+or encrypted regions in binaries.
+
+If *numpy* is installed, it is used to speed up counting bytes. Otherwise a
+(slower) pure python implementation is used.
+"""
+
+from __future__ import print_function, division
+
+import collections
+import heapq
+import io
+import math
+import struct
+import sys
+
+import six
+from six.moves import range
+
+import pwnypack.elf
+import pwnypack.main
+
+try:
+    from collections import Counter
+except ImportError:
+    from counter import Counter
+
+try:
+    import numpy
+    HAVE_NUMPY = True
+except ImportError:
+    HAVE_NUMPY = False
+
+
+__all__ = [
+    'histogram',
+    'ngrams',
+    'entropy',
+    'entropy_profile',
+]
+
+
+READ_SIZE = 1 << 20
+ENTROPY_BATCH_BLOCKS = 1 << 12
+ENTROPY_TABLE_SIZE = 1 << 16
+
+
+def _chunks(data, chunk_size):
+    """
+    Yield chunks of ``chunk_size`` bytes (except for the last one) of a
+    file-like object, an ELF section or a buffer.
+    """
+
+    if isinstance(data, pwnypack.elf.ELF.SectionHeader):
+        data = data.content
+
+    if hasattr(data, 'read'):
+        pending = b''
+        while True:
+            chunk = data.read(max(READ_SIZE, chunk_size))
+            if not chunk:
+                break
+            chunk = pending + chunk
+            tail = len(chunk) - len(chunk) % chunk_size
+            pending = chunk[tail:]
+            if tail:
+                yield memoryview(chunk)[:tail]
+        if pending:
+            yield memoryview(pending)
+    else:
+        data = memoryview(data)
+        read_size = max(READ_SIZE - READ_SIZE % chunk_size, chunk_size)
+        for offset in range(0, len(data), read_size):
+            yield data[offset:offset + read_size]
+
+
+def _block_histograms(chunk, block_size):
+    """
+    Return the byte histogram of each block of ``block_size`` bytes in
+    ``chunk`` as a ``(blocks, 256)`` array and the size of each block.
+    """
+
+    a = numpy.frombuffer(chunk, dtype=numpy.uint8)
+    n_blocks = (len(a) + block_size - 1) // block_size
+    n_full = len(a) // block_size
+    index = a.astype(numpy.intp)
+    index[:n_full * block_size].reshape(n_full, block_size)[:] += \
+        (numpy.arange(n_full, dtype=numpy.intp) * 256)[:, None]
+    index[n_full * block_size:] += n_full * 256
+    rows = numpy.bincount(index, minlength=n_blocks * 256).reshape(n_blocks, 256)
+    sizes = numpy.full(n_blocks, block_size, dtype=numpy.int64)
+    sizes[-1] = len(a) - (n_blocks - 1) * block_size
+    return rows, sizes
+
+
+def _window_sums(rows, k):
+    """
+    Sum each run of ``k`` consecutive rows. The runs are assembled from the
+    sums of runs whose lengths are powers of two, which takes ``log2(k)``
+    additions instead of ``k``.
+    """
+
+    n = len(rows) - k + 1
+    result = None
+    offset = 0
+    size = 1
+    sums = rows
+    while True:
+        if k & size:
+            part = sums[offset:offset + n]
+            if result is None:
+                result = part.copy()
+            else:
+                result += part
+            offset += size
+        if size * 2 > k:
+            return result
+        sums = sums[:-size] + sums[size:]
+        size *= 2
+
+
+def _entropy(counts, total):
+    if not total:
+        return 0.0
+    return 0.0 - sum(
+        c / total * math.log(c / total, 2)
+        for c in counts
+        if c
+    )
+
+
+def histogram(data):
+    """
+    Count the occurrences of each byte value in a byte sequence.
+
+    Args:
+        data(bytes, file or :class:`~pwnypack.elf.ELF.SectionHeader`): The
+            data to analyse. Files are read in chunks.
+
+    Returns:
+        list of int: The number of occurrences of each byte value.
+
+    Example:
+        >>> from pwny import *
+        >>> histogram(b'pwnypack')[ord('p')]
+        2
+    """
+
+    if HAVE_NUMPY:
+        result = numpy.zeros(256, dtype=numpy.int64)
+        for chunk in _chunks(data, READ_SIZE):
+            result += numpy.bincount(numpy.frombuffer(chunk, dtype=numpy.uint8), minlength=256)
+        return [int(c) for c in result]
+    else:
+        counts = Counter()
+        for chunk in _chunks(data, READ_SIZE):
+            counts.update(six.iterbytes(chunk.tobytes()))
+        return [counts.get(c, 0) for c in range(256)]
+
+
+def _ngrams_numpy(data, n, top, capacity):
+    # Each n-gram is packed in a (big endian) integer, the counts of the
+    # chunk and the n-grams retained so far are merged in a single pass.
+    keys = numpy.zeros(0, dtype=numpy.uint64)
+    counts = numpy.zeros(0, dtype=numpy.float64)
+    pending = b''
+    for chunk in _chunks(data, READ_SIZE):
+        chunk = pending + chunk.tobytes()
+        pending = chunk[max(0, len(chunk) - n + 1):]
+        a = numpy.frombuffer(chunk, dtype=numpy.uint8)
+        m = len(a) - n + 1
+        if m <= 0:
+            continue
+        values = numpy.zeros(m, dtype=numpy.uint64)
+        for i in range(n):
+            values <<= numpy.uint64(8)
+            values |= a[i:i + m]
+        keys, inverse = numpy.unique(numpy.concatenate((keys, values)), return_inverse=True)
+        counts = numpy.bincount(inverse.ravel(), weights=numpy.concatenate((counts, numpy.ones(m))))
+        if len(keys) > capacity:
+            keep = numpy.argpartition(counts, len(keys) - capacity)[len(keys) - capacity:]
+            keys, counts = keys[keep], counts[keep]
+
+    order = numpy.lexsort((keys, -counts))[:top]
+    return [
+        (struct.pack('>Q', key)[8 - n:], int(count))
+        for key, count in zip(keys[order].tolist(), counts[order].tolist())
+    ]
+
+
+def _ngrams_python(data, n, top, capacity):
+    counts = Counter()
+    pending = b''
+    for chunk in _chunks(data, READ_SIZE):
+        chunk = pending + chunk.tobytes()
+        counts.update(chunk[i:i + n] for i in range(len(chunk) - n + 1))
+        pending = chunk[max(0, len(chunk) - n + 1):]
+        if len(counts) > capacity:
+            counts = Counter(dict(heapq.nlargest(capacity, six.iteritems(counts), key=lambda i: i[1])))
+
+    return sorted(six.iteritems(counts), key=lambda i: (-i[1], i[0]))[:top]
+
+
+def ngrams(data, n=2, top=10, capacity=None):
+    """
+    Find the most common sequences of ``n`` bytes in a byte sequence.
+
+    To keep memory usage bounded, only the ``capacity`` most common n-grams
+    are retained after processing each chunk of input. The counts of the
+    n-grams that are returned can therefore be an underestimation when the
+    number of distinct n-grams exceeds the capacity. Without numpy (or for
+    n-grams longer than 8 bytes) the n-grams of a whole chunk are counted
+    before pruning, so memory usage scales with the chunk size
+    (:data:`READ_SIZE`) as well.
+
+    Args:
+        data(bytes, file or :class:`~pwnypack.elf.ELF.SectionHeader`): The
+            data to analyse. Files are read in chunks.
+        n(int): The length of the n-grams.
+        top(int): The number of n-grams to return.
+        capacity(int): The maximum number of distinct n-grams to track.
+            Defaults to the larger of 65536 and ``100 * top``.
+
+    Returns:
+        list of tuple: ``(ngram, count)`` tuples ordered from the most to
+            the least common n-gram.
+
+    Example:
+        >>> from pwny import *
+        >>> ngrams(b'pwnypack', 2, top=1)
+        [(b'ac', 1)]
+    """
+
+    if n < 1:
+        raise ValueError('n should be at least 1')
+    if capacity is None:
+        capacity = max(65536, 100 * top)
+
+    if HAVE_NUMPY and n <= 8:
+        return _ngrams_numpy(data, n, top, capacity)
+    else:
+        return _ngrams_python(data, n, top, capacity)
+
+
+def entropy(data):
+    """
+    Calculate the Shannon entropy of a byte sequence.
+
+    Args:
+        data(bytes, file or :class:`~pwnypack.elf.ELF.SectionHeader`): The
+            data to analyse. Files are read in chunks.
+
+    Returns:
+        float: The entropy in bits per byte (between 0.0 and 8.0).
+
+    Example:
+        >>> from pwny import *
+        >>> entropy(b'pwnypack')
+        2.75
+    """
+
+    counts = histogram(data)
+    return _entropy(counts, sum(counts))
+
+
+def entropy_profile(data, window=4096, step=None, base=0):
+    """
+    Calculate the Shannon entropy of a sliding window over a byte sequence.
+
+    The data is split in blocks of ``step`` bytes. Each window consists of
+    ``window // step`` consecutive blocks. The last block (and therefore
+    the last window) can be shorter. If the data is smaller than a single
+    window, one window covering all the data is produced.
+
+    Args:
+        data(bytes, file or :class:`~pwnypack.elf.ELF.SectionHeader`): The
+            data to analyse. Files are read in chunks.
+        window(int): The size of the window.
+        step(int): The distance between the start of each window. Must be a
+            divisor of ``window``. Defaults to ``window``.
+        base(int): The offset (or virtual address) of the start of the data.
+
+    Returns:
+        generator of tuple: ``(offset, entropy)`` tuples for each window.
+
+    Example:
+        >>> from pwny import *
+        >>> list(entropy_profile(b'\\0' * 8 + b'pwnypack', 8))
+        [(0, 0.0), (8, 2.75)]
+    """
+
+    if step is None:
+        step = window
+    if step < 1 or window < step or window % step:
+        raise ValueError('The window size should be a multiple of the step size')
+    k = window // step
+
+    if HAVE_NUMPY:
+        profile = _entropy_profile_numpy(data, step, k)
+    else:
+        profile = _entropy_profile_python(data, step, k)
+
+    offset = base
+    for values in profile:
+        for value in values:
+            yield offset, value
+            offset += step
+
+
+def _entropy_profile_numpy(data, step, k):
+    # The histograms of at most ENTROPY_BATCH_BLOCKS blocks are kept in
+    # memory at once. Each window is the sum of the histograms of its k
+    # blocks.
+    batch = step * max(1, min(READ_SIZE // step, ENTROPY_BATCH_BLOCKS))
+    if k * step < ENTROPY_TABLE_SIZE:
+        # Small windows: the counts fit in 16 bits and c * log2(c) is looked
+        # up for every possible count.
+        count_type = numpy.uint16
+        table = numpy.arange(k * step + 1, dtype=numpy.float64)
+        table[1:] *= numpy.log2(table[1:])
+    else:
+        count_type = numpy.int64
+        table = None
+
+    carry_rows = numpy.zeros((0, 256), dtype=count_type)
+    carry_sizes = numpy.zeros(0, dtype=numpy.int64)
+    produced = False
+
+    for chunk in _chunks(data, step):
+        for start in range(0, len(chunk), batch):
+            rows, sizes = _block_histograms(chunk[start:start + batch], step)
+            rows = numpy.concatenate((carry_rows, rows.astype(count_type)))
+            sizes = numpy.concatenate((carry_sizes, sizes))
+
+            if len(rows) >= k:
+                counts = _window_sums(rows, k)
+                totals = _window_sums(sizes, k)
+                if table is not None:
+                    clogc = table[counts].sum(axis=1)
+                else:
+                    clogc = (counts * numpy.log2(numpy.maximum(counts, 1))).sum(axis=1)
+                # H = log2(T) - sum(c * log2(c)) / T
+                entropies = numpy.abs(numpy.log2(totals) - clogc / totals)
+                yield entropies.tolist()
+                produced = True
+
+            carry_rows, carry_sizes = rows[len(rows) - min(len(rows), k - 1):], \
+                sizes[len(sizes) - min(len(sizes), k - 1):]
+
+    if not produced and len(carry_sizes):
+        yield [_entropy(carry_rows.sum(axis=0).tolist(), int(carry_sizes.sum()))]
+
+
+def _entropy_profile_python(data, step, k):
+    # Keep a running histogram of the current window, add each new block
+    # and subtract the block that falls out of the window.
+    counts = Counter()
+    total = 0
+    blocks = collections.deque()
+    produced = False
+
+    for chunk in _chunks(data, step):
+        for offset in range(0, len(chunk), step):
+            block = chunk[offset:offset + step].tobytes()
+            block_counts = Counter(six.iterbytes(block))
+            blocks.append((block_counts, len(block)))
+            counts.update(block_counts)
+            total += len(block)
+
+            if len(blocks) > k:
+                old_counts, old_size = blocks.popleft()
+                counts.subtract(old_counts)
+                total -= old_size
+
+            if len(blocks) == k:
+                yield [_entropy(six.itervalues(counts), total)]
+                produced = True
+
+    if not produced and blocks:
+        yield [_entropy(six.itervalues(counts), total)]
+
+
+@pwnypack.main.register('entropy')
+def entropy_app(parser, cmd, args):  # pragma: no cover
+    """
+    Show the entropy profile of a file or ELF section.
+    """
+
+    parser.add_argument('file', help='the file to analyse, read from stdin if omitted', nargs='?')
+    parser.add_argument('-w', '--window', type=lambda v: int(v, 0), default=4096, help='the window size')
+    parser.add_argument(
+        '-s', '--step',
+        type=lambda v: int(v, 0),
+        help='the distance between windows (must divide the window size, defaults to the window size)'
+    )
+    parser.add_argument('-S', '--section', help='only analyse this section of an ELF file')
+    parser.add_argument('-p', '--plot', action='store_true', help='plot the entropy of each window')
+    args = parser.parse_args(args)
+
+    base = 0
+    if args.file is None:
+        data = io.open(sys.stdin.fileno(), mode='rb', closefd=False)
+    elif args.section is not None:
+        section = pwnypack.elf.ELF(args.file).get_section_header(args.section)
+        data, base = section, section.addr
+    else:
+        data = io.open(args.file, mode='rb')
+
+    for offset, value in entropy_profile(data, args.window, args.step, base):
+        if args.plot:
+            print('0x%08x %.4f %s' % (offset, value, '#' * int(round(value * 8))))
+        else:
+            print('0x%08x %.4f' % (offset, value))
@@ -9,13 +9,22 @@ or emitted.
 
 
 import platform
+import threading
+from contextlib import contextmanager
 from enum import IntEnum, Enum
 import sys
 
+try:
+    import contextvars
+except ImportError:
+    contextvars = None
+
 
 __all__ = [
     'Target',
     'target',
+    'current_target',
+    'target_scope',
 ]
 
 
@@ -200,3 +209,67 @@ target = Target()
 The global, default target. If no targeting information is provided to a
 function, this is the target that will be used.
 """
+
+
+if contextvars is not None:
+    _scoped_target = contextvars.ContextVar('pwnypack.target', default=None)
+    _get_scoped_target = _scoped_target.get
+    _set_scoped_target = _scoped_target.set
+    _reset_scoped_target = _scoped_target.reset
+else:
+    # Without contextvars, scopes are local to the current thread.
+    _scoped_target = threading.local()
+
+    def _get_scoped_target():
+        return getattr(_scoped_target, 'target', None)
+
+    def _set_scoped_target(value):
+        previous = _get_scoped_target()
+        _scoped_target.target = value
+        return previous
+
+    def _reset_scoped_target(previous):
+        _scoped_target.target = previous
+
+
+def current_target():
+    """
+    Get the target that is in effect in the current context: the target of
+    the innermost active :func:`target_scope` or the global
+    :data:`target` if there's no active scope.
+
+    This is the target that is used by functions that accept a ``target``
+    argument when it is ``None``.
+
+    Returns:
+        :class:`Target`: The current target.
+    """
+
+    scoped = _get_scoped_target()
+    return target if scoped is None else scoped
+
+
+@contextmanager
+def target_scope(scoped_target):
+    """
+    Make a target the current target for the duration of a ``with`` block
+    without changing the global :data:`target`. Scopes are local to the
+    current thread and (on python 3.7+, using :mod:`contextvars`) to the
+    current asyncio task, so workers for different architectures can run
+    in parallel.
+
+    Args:
+        scoped_target(:class:`Target`): The target to use in the scope.
+
+    Example:
+        >>> from pwny import *
+        >>> with target_scope(Target(arch=Target.Arch.x86, bits=64)):
+        ...     P(0x41)
+        b'A\\x00\\x00\\x00\\x00\\x00\\x00\\x00'
+    """
+
+    token = _set_scoped_target(scoped_target)
+    try:
+        yield scoped_target
+    finally:
+        _reset_scoped_target(token)
@@ -5,50 +5,185 @@ The util module contains various utility functions.
 from __future__ import print_function
 
 import argparse
+import array
 import binascii
 import re
 import sys
 
+import six
 from six.moves import range
+try:
+    from collections import OrderedDict
+except ImportError:
+    from ordereddict import OrderedDict
 
 import pwnypack.codec
 import pwnypack.main
+import pwnypack.target
 
 __all__ = [
     'cycle',
+    'cycle_bytes',
+    'cycle_stream',
     'cycle_find',
     'reghex',
+    'reghex_set',
+    'ReghexSet',
 ]
 
 
+DE_BRUIJN_ALPHABET = b'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+DE_BRUIJN_MAX_WIDTH = 8
+DE_BRUIJN_CHUNK_SIZE = 1 << 16
+DE_BRUIJN_CACHE_SIZE = 16
+_de_bruijn_cache = OrderedDict()
+CYCLE_INDEX_LIMIT = 1 << 22
+CYCLE_INDEX_CACHE_SIZE = 4
+_cycle_index_cache = OrderedDict()
+
+
+def _lyndon_chunks(n, alphabet):
+    """
+    An iterative implementation of the FKM algorithm for generating the de
+    Bruijn sequence containing all strings of length n over an alphabet, as
+    described in "Combinatorial Generation" by Frank Ruskey. The Lyndon
+    words whose length divides n are concatenated in lexicographic order
+    and yielded in chunks of at least ``DE_BRUIJN_CHUNK_SIZE`` bytes.
+    """
+
+    alphabet = bytearray(alphabet)
+    first, last = alphabet[0], alphabet[-1]
+    succ = dict(zip(alphabet, alphabet[1:]))
+    position = dict((c, i) for i, c in enumerate(alphabet))
+
+    w = bytearray([first])
+    out = bytearray()
+    while True:
+        m = len(w)
+        if m == n:
+            # Replacing the last character of a Lyndon word of length n by
+            # any larger character produces the next Lyndon word, so emit
+            # them all at once.
+            tail = alphabet[position[w[-1]]:]
+            start = len(out)
+            out += w * len(tail)
+            out[start + n - 1::n] = tail
+            w[-1] = last
+        elif n % m == 0:
+            out += w
+
+        if len(out) >= DE_BRUIJN_CHUNK_SIZE:
+            yield bytes(out)
+            out = bytearray()
+
+        # Extend the prenecklace periodically, then find the next one.
+        w = (w * (n // m + 1))[:n]
+        while w and w[-1] == last:
+            w.pop()
+        if not w:
+            break
+        w[-1] = succ[w[-1]]
+
+    if out:
+        yield bytes(out)
+
+
 def deBruijn(n, k):
     """
-    An implementation of the FKM algorithm for generating the de Bruijn
-    sequence containing all k-ary strings of length n, as described in
-    "Combinatorial Generation" by Frank Ruskey.
+    Generate the de Bruijn sequence containing all k-ary strings of length
+    n. Yields the sequence one symbol (an int in ``range(k)``) at a time.
     """
 
-    a = [ 0 ] * (n + 1)
+    for chunk in _lyndon_chunks(n, bytearray(range(k))):
+        for v in bytearray(chunk):
+            yield v
 
-    def gen(t, p):
-        if t > n:
-            for v in a[1:p + 1]:
-                yield v
-        else:
-            a[t] = a[t - p]
-         
-            for v in gen(t + 1, p):
-                yield v
-         
-            for j in range(a[t - p] + 1, k):
-                a[t] = j
-                for v in gen(t + 1, t):
-                    yield v
 
-    return gen(1, 1)
+def _cycle_alphabet(width, alphabet=None, badchars=None, length=None):
+    """
+    Validate the width (and length) and return the alphabet (as bytes) of a
+    de Bruijn sequence, with the bad characters removed.
+    """
+
+    if not 1 <= width <= DE_BRUIJN_MAX_WIDTH:
+        raise ValueError('The width should be between 1 and %d.' % DE_BRUIJN_MAX_WIDTH)
 
+    if alphabet is None:
+        alphabet = DE_BRUIJN_ALPHABET
+    elif isinstance(alphabet, (bytes, bytearray)):
+        # The alphabet is used as a cache key, so it has to be hashable.
+        alphabet = bytes(alphabet)
+    else:
+        alphabet = alphabet.encode('latin1')
+    if badchars:
+        if not isinstance(badchars, (bytes, bytearray)):
+            badchars = badchars.encode('latin1')
+        alphabet = alphabet.translate(None, bytes(badchars))
+
+    if len(alphabet) < 2 or len(set(bytearray(alphabet))) != len(alphabet):
+        raise ValueError('The alphabet should consist of at least two unique characters.')
+    if length is not None and length > len(alphabet) ** width:
+        raise ValueError('The de Bruijn sequence of width %d only has %d elements.' % (width, len(alphabet) ** width))
+    return alphabet
+
+
+def _de_bruijn(length, width, alphabet=DE_BRUIJN_ALPHABET):
+    """
+    Return (at least) the first ``length`` bytes of the de Bruijn sequence
+    for the given width and alphabet, or the entire sequence if ``length``
+    is ``None`` or exceeds the length of the sequence. Sequences are
+    generated lazily and cached.
+    """
 
-def cycle(length, width=4):
+    key = (width, alphabet)
+    entry = _de_bruijn_cache.pop(key, None)
+    if entry is None:
+        entry = [bytearray(), _lyndon_chunks(width, alphabet)]
+        if len(_de_bruijn_cache) >= DE_BRUIJN_CACHE_SIZE:
+            _de_bruijn_cache.popitem(last=False)
+    _de_bruijn_cache[key] = entry
+
+    sequence, chunks = entry
+    if chunks is not None:
+        while length is None or len(sequence) < length:
+            chunk = next(chunks, None)
+            if chunk is None:
+                entry[1] = None
+                break
+            sequence += chunk
+    return sequence
+
+
+def cycle_bytes(length, width=4, alphabet=None, badchars=None):
+    """
+    Generate a de Bruijn sequence of a given length (and width) as bytes.
+    See :func:`cycle` for more information.
+
+    Args:
+        length(int): The length of the sequence to generate.
+        width(int): The width of each element in the sequence (at most 8).
+        alphabet(bytes): The characters to use in the sequence. Defaults to
+            the upper case letters.
+        badchars(bytes): Characters to remove from the alphabet.
+
+    Returns:
+        bytes: The sequence.
+
+    Raises:
+        ValueError: If the width or alphabet is invalid or if the sequence
+            is longer than the full de Bruijn sequence.
+
+    Example:
+        >>> from pwny import *
+        >>> cycle_bytes(16)
+        b'AAAABAAACAAADAAA'
+    """
+
+    alphabet = _cycle_alphabet(width, alphabet, badchars, length)
+    return bytes(_de_bruijn(length, width, alphabet)[:length])
+
+
+def cycle(length, width=4, alphabet=None, badchars=None):
     """
     Generate a de Bruijn sequence of a given length (and width). A de Bruijn
     sequence is a set of varying repetitions where each sequence of *n*
@@ -56,90 +191,368 @@ def cycle(length, width=4):
     used to easily find the offset to the return pointer when exploiting a
     buffer overflow.
 
+    The sequence is cached, so generating another (shorter) sequence of the
+    same width and alphabet is cheap. Use :func:`cycle_stream` to generate
+    very long sequences without keeping them in memory.
+
     Args:
         length(int): The length of the sequence to generate.
-        width(int): The width of each element in the sequence.
+        width(int): The width of each element in the sequence (at most 8).
+        alphabet(bytes): The characters to use in the sequence. Defaults to
+            the upper case letters.
+        badchars(bytes): Characters to remove from the alphabet.
 
     Returns:
         str: The sequence.
 
+    Raises:
+        ValueError: If the width or alphabet is invalid or if the sequence
+            is longer than the full de Bruijn sequence.
+
     Example:
         >>> from pwny import *
         >>> cycle(80)
         AAAABAAACAAADAAAEAAAFAAAGAAAHAAAIAAAJAAAKAAALAAAMAAANAAAOAAAPAAAQAAARAAASAAATAAA
     """
 
-    iter = deBruijn(width, 26)
-    return ''.join([chr(ord('A') + next(iter)) for i in range(length)])
+    return str(cycle_bytes(length, width, alphabet, badchars).decode('latin1'))
+
+
+def _cycle_stream(length, width, alphabet):
+    for chunk in _lyndon_chunks(width, alphabet):
+        if length is not None:
+            if len(chunk) >= length:
+                yield chunk[:length]
+                return
+            length -= len(chunk)
+        yield chunk
 
 
-def cycle_find(key, width=4):
+def cycle_stream(length=None, width=4, alphabet=None, badchars=None):
     """
-    Given an element of a de Bruijn sequence, find its index in that sequence.
+    Generate a de Bruijn sequence of a given length (and width) in chunks.
+    Unlike :func:`cycle`, the sequence is not kept in memory. This makes it
+    possible to stream very long sequences to a file or a
+    :class:`~pwnypack.flow.Flow`.
 
     Args:
-        key(str): The piece of the de Bruijn sequence to find.
-        width(int): The width of each element in the sequence.
+        length(int): The length of the sequence to generate. Generates the
+            entire de Bruijn sequence if ``None``.
+        width(int): The width of each element in the sequence (at most 8).
+        alphabet(bytes): The characters to use in the sequence. Defaults to
+            the upper case letters.
+        badchars(bytes): Characters to remove from the alphabet.
 
     Returns:
-        int: The index of ``key`` in the de Bruijn sequence.
-    """
+        generator of bytes: The chunks of the sequence.
+
+    Raises:
+        ValueError: If the width or alphabet is invalid or if the sequence
+            is longer than the full de Bruijn sequence.
 
-    key_len = len(key)
-    buf = ''
+    Example:
+        >>> from pwny import *
+        >>> f = Flow.connect_tcp('127.0.0.1', 1234)
+        >>> for chunk in cycle_stream(1 << 28, width=8):
+        ...     f.write(chunk)
+    """
 
-    it = deBruijn(width, 26)
+    return _cycle_stream(length, width, _cycle_alphabet(width, alphabet, badchars, length))
 
-    for i in range(key_len):
-        buf += chr(ord('A') + next(it))
 
-    if buf == key:
-        return 0
+def _cycle_index(width, alphabet=DE_BRUIJN_ALPHABET):
+    """
+    Build (or get the cached) index of the de Bruijn sequence for the given
+    width and alphabet. The index maps the rank of each window (its value
+    as a base ``len(alphabet)`` number) to its offset in the sequence.
+    Returns ``None`` if the index would exceed ``CYCLE_INDEX_LIMIT`` entries.
+    """
 
-    for i, c in enumerate(it):
-        buf = buf[1:] + chr(ord('A') + c)
-        if buf == key:
-            return i + 1
+    k = len(alphabet)
+    size = k ** width
+    if size > CYCLE_INDEX_LIMIT:
+        return None
+
+    key = (width, alphabet)
+    entry = _cycle_index_cache.pop(key, None)
+    if entry is None:
+        sequence = _de_bruijn(None, width, alphabet)
+        table = _digit_table(alphabet)
+        digits = bytearray(bytes(sequence).translate(table))
+
+        index = array.array('i', [-1]) * size
+        rank = 0
+        for d in digits[:width - 1]:
+            rank = rank * k + d
+        for offset, d in enumerate(digits[width - 1:]):
+            rank = (rank * k + d) % size
+            index[rank] = offset
+
+        entry = (sequence, index, table)
+        if len(_cycle_index_cache) >= CYCLE_INDEX_CACHE_SIZE:
+            _cycle_index_cache.popitem(last=False)
+    _cycle_index_cache[key] = entry
+    return entry
+
+
+def _digit_table(alphabet):
+    table = bytearray(256)
+    for digit, c in enumerate(bytearray(alphabet)):
+        table[c] = digit
+    return bytes(table)
+
+
+def _cycle_scan(key, width, alphabet=DE_BRUIJN_ALPHABET, limit=None):
+    """
+    Find ``key`` by scanning (the first ``limit`` bytes of) the de Bruijn
+    sequence chunk by chunk without caching it. Used for keys shorter than
+    the width of sequences that are too large to index.
+    """
 
+    pending = b''
+    offset = 0
+    for chunk in _lyndon_chunks(width, alphabet):
+        chunk = pending + chunk
+        if limit is not None:
+            chunk = chunk[:limit - offset]
+        index = chunk.find(key)
+        if index != -1:
+            return offset + index
+        if limit is not None and offset + len(chunk) >= limit:
+            break
+        pending = chunk[len(chunk) - len(key) + 1:] if len(key) > 1 else b''
+        offset += len(chunk) - len(pending)
     return -1
 
 
-REGHEX_PATTERN = r'(([a-fA-F0-9]{2})|(([?.])(\{\d+\})?)|(\*|\+)|\s+)'
-reghex_check = re.compile(REGHEX_PATTERN + '+')
-reghex_regex = re.compile(REGHEX_PATTERN)
+def _period(word):
+    """
+    Return the length of the shortest prefix of ``word`` that, repeated,
+    produces ``word``.
+    """
 
+    n = len(word)
+    return next(p for p in range(1, n + 1) if n % p == 0 and word[:p] * (n // p) == word)
 
-def reghex(pattern):
+
+def _is_necklace(word):
+    return all(word <= word[i:] + word[:i] for i in range(1, len(word)))
+
+
+def _next_necklace(word, k):
+    """
+    Return the smallest necklace that is larger than the necklace ``word``
+    (or ``None`` if there is none) using the FKM successor rule.
     """
-    Compile a regular hexpression (a short form regular expression subset
-    specifically designed for searching for binary strings).
 
-    A regular hexpression consists of hex tuples interspaced with control
-    characters. The available control characters are:
+    n = len(word)
+    word = list(word)
+    while True:
+        while word and word[-1] == k - 1:
+            word.pop()
+        if not word:
+            return None
+        word[-1] += 1
+        p = len(word)
+        word = (word * (n // p + 1))[:n]
+        if n % p == 0:
+            return word
+
+
+def _necklace_rank(necklace, k):
+    """
+    Return the offset of the Lyndon word of ``necklace`` in the de Bruijn
+    sequence. This is the number of strings whose necklace is smaller than
+    ``necklace``, which is calculated by counting the strings that have no
+    rotation smaller than ``necklace``.
+
+    A rotation is smaller if the cyclic string contains a prefix of the
+    necklace followed by a smaller character. The automaton that detects
+    this only has to track the length of the matched prefix: a larger
+    character resets it, a smaller one rejects the string. The number of
+    accepted strings is the trace of the n-th power of its transition
+    matrix.
+    """
 
-    - ``?``: Any byte (optional).
-    - ``.``: Any byte (required).
-    - ``?{n}``: A set of 0 up to *n* bytes.
-    - ``.{n}``: A set of exactly *n* bytes.
-    - ``*``: Any number of bytes (or no bytes at all).
-    - ``+``: Any number of bytes (at least one byte).
+    n = len(necklace)
+    p = _period(necklace)
+    accepted = 0
+    for start in range(n):
+        counts = [0] * n
+        counts[start] = 1
+        for _ in range(n):
+            step = [0] * n
+            for state, count in enumerate(counts):
+                if count:
+                    step[state + 1 if state + 1 < n else n - p] += count
+                    step[0] += count * (k - 1 - necklace[state])
+            counts = step
+        accepted += counts[start]
+    return k ** n - accepted
+
+
+def _cycle_rank(window, k):
+    """
+    Find the offset of ``window`` (a list of digits in ``range(k)`` as long
+    as the width of the sequence) in the de Bruijn sequence without
+    generating it. Returns -1 if the window only occurs when wrapping
+    around the end of the sequence.
+
+    The window starting at the Lyndon word of a necklace is the necklace
+    itself, so a window that starts inside a Lyndon word ``u c z`` (where
+    ``z`` consists of the largest digit) is either a rotation of its
+    necklace or, if it starts inside ``z``, a run of the largest digit
+    followed by the start of the next necklace, which starts with
+    ``u (c + 1)``.
+    """
+
+    n = len(window)
+    top = k - 1
+    if n == 1:
+        return window[0]
+
+    necklace = min(window[i:] + window[:i] for i in range(n))
+    p = _period(necklace)
+    t = next(i for i in range(p) if necklace[i:] + necklace[:i] == window)
+    z = p - len(bytearray(necklace[:p]).rstrip(six.int2byte(top)))
+    if necklace != [top] * n and t < p - z:
+        return _necklace_rank(necklace, k) + t
+
+    lead = n - len(bytearray(window).lstrip(six.int2byte(top)))
+    for s in range(1, min(lead, n - 1) + 1):
+        tail = window[s:]
+        for m in range(1, n - s + 1):
+            if not tail[m - 1]:
+                continue
+            necklace = tail[:m - 1] + [tail[m - 1] - 1] + [top] * (n - m)
+            if not _is_necklace(necklace):
+                continue
+            successor = _next_necklace(necklace, k)
+            if successor is None or successor[:n - s] != tail:
+                continue
+            if n - s > 1 and successor == [top] * n:
+                # The window of the last necklace wraps around.
+                continue
+            return _necklace_rank(necklace, k) + _period(necklace) - s
+    return -1
+
+
+def cycle_find(key, width=4, target=None, alphabet=None, badchars=None, limit=None):
+    """
+    Given an element of a de Bruijn sequence, find its index in that sequence.
+
+    The element can also be an integer (f.e. the value of the instruction
+    pointer after a crash), it will be packed to ``width`` bytes (more if
+    the value doesn't fit, but at most the pointer width of the target)
+    using the endianness of the target.
+
+    For sequences that have at most ``CYCLE_INDEX_LIMIT`` windows, an
+    index of all windows is built once (and cached), after which each
+    lookup takes ``O(width)``. For larger sequences, the offset of a key of
+    at least ``width`` bytes is calculated directly from the construction
+    of the sequence in a time that only depends on ``width``. Shorter keys
+    can occur more than once, finding the first occurrence in a large
+    sequence requires scanning it: use ``limit`` to bound the time spent
+    looking for values that are not present.
 
     Args:
-        pattern(str): The reghex pattern.
+        key(str, bytes or int): The piece of the de Bruijn sequence to find.
+        width(int): The width of each element in the sequence.
+        target(:class:`~pwnypack.target.Target`): The target used to pack
+            integer keys. The current target is used if this argument is
+            ``None``.
+        alphabet(bytes): The characters used in the sequence. Defaults to
+            the upper case letters.
+        badchars(bytes): Characters that were removed from the alphabet.
+        limit(int): Only look for ``key`` in the first ``limit`` bytes of
+            the sequence (f.e. the length of the generated pattern).
 
     Returns:
-        regexp: A regular expression as returned by ``re.compile()``.
+        int: The index of ``key`` in the de Bruijn sequence or -1 if it was
+        not found.
+
+    Example:
+        >>> from pwny import *
+        >>> cycle_find('PAAA')
+        60
+        >>> cycle_find(0x41414150, target=Target(arch=Target.Arch.x86, bits=32))
+        60
+    """
+
+    if isinstance(key, six.integer_types):
+        if target is None:
+            target = pwnypack.target.current_target()
+        key &= (1 << target.bits) - 1
+        # Pack to the width of the sequence, so a 32 bit value read from a
+        # 64 bit register still matches a sequence of width 4.
+        size = min(max(width, (key.bit_length() + 7) // 8), target.bits // 8)
+        key = bytes(bytearray((key >> (8 * i)) & 0xff for i in range(size)))
+        if target.endian is pwnypack.target.Target.Endian.big:
+            key = key[::-1]
+    elif not isinstance(key, bytes):
+        key = key.encode('latin1')
+
+    alphabet = _cycle_alphabet(width, alphabet, badchars)
+    if not key or key.translate(None, alphabet):
+        return -1
+
+    entry = _cycle_index(width, alphabet)
+    if entry is None:
+        if len(key) < width:
+            return _cycle_scan(key, width, alphabet, limit)
+
+        k = len(alphabet)
+        digits = list(bytearray(key.translate(_digit_table(alphabet))))
+        offset = _cycle_rank(digits[:width], k)
+        for i in range(1, len(key) - width + 1):
+            if offset == -1:
+                break
+            if _cycle_rank(digits[i:i + width], k) != offset + i:
+                offset = -1
+    elif len(key) < width:
+        sequence, index, table = entry
+        offset = sequence.find(key)
+    else:
+        sequence, index, table = entry
+        k = len(alphabet)
+        rank = 0
+        for d in bytearray(key[:width].translate(table)):
+            rank = rank * k + d
+        offset = index[rank]
+        if offset != -1 and sequence[offset:offset + len(key)] != key:
+            offset = -1
+
+    if offset == -1 or (limit is not None and offset + len(key) > limit):
+        return -1
+    return offset
+
+
+REGHEX_PATTERN = r'(([a-fA-F0-9]{2})|(([?.])(\{\d+\})?)|(\*|\+)|\s+)'
+reghex_check = re.compile(REGHEX_PATTERN + '+$')
+reghex_regex = re.compile(REGHEX_PATTERN)
+
+
+def _reghex_source(pattern):
+    """
+    Translate a reghex pattern to the source of a bytes regular expression.
+    Returns the literal bytes the pattern starts with and the source of the
+    regular expression for the remainder of the pattern.
     """
 
     if not reghex_check.match(pattern):
         raise SyntaxError('Invalid reghex pattern.')
 
+    prefix = b''
     b_pattern = b''
 
     for match in reghex_regex.finditer(pattern):
         _, match_hex, _, match_char, match_char_len, match_star_plus = match.groups()
         if match_hex:
-            b_pattern += pwnypack.codec.dehex(match_hex)
+            literal = pwnypack.codec.dehex(match_hex)
+            if b_pattern:
+                b_pattern += re.escape(literal)
+            else:
+                prefix += literal
         elif match_char:
             if match_char == '?':
                 if match_char_len is None:
@@ -154,22 +567,201 @@ def reghex(pattern):
         elif match_star_plus:
             b_pattern += b'.' + match_star_plus.encode('ascii') + b'?'
 
+    return prefix, b_pattern
+
+
+def reghex(pattern):
+    """
+    Compile a regular hexpression (a short form regular expression subset
+    specifically designed for searching for binary strings).
+
+    A regular hexpression consists of hex tuples interspaced with control
+    characters. The available control characters are:
+
+    - ``?``: Any byte (optional).
+    - ``.``: Any byte (required).
+    - ``?{n}``: A set of 0 up to *n* bytes.
+    - ``.{n}``: A set of exactly *n* bytes.
+    - ``*``: Any number of bytes (or no bytes at all).
+    - ``+``: Any number of bytes (at least one byte).
+
+    Args:
+        pattern(str): The reghex pattern.
+
+    Returns:
+        regexp: A regular expression as returned by ``re.compile()``.
+
+    Raises:
+        SyntaxError: If the pattern is not a valid reghex pattern.
+    """
+
+    prefix, source = _reghex_source(pattern)
     try:
-        return re.compile(b_pattern)
+        return re.compile(re.escape(prefix) + source, re.DOTALL)
     except (TypeError, binascii.Error, re.error):
         raise SyntaxError('Invalid reghex pattern.')
 
 
+def _reghex_trie(items):
+    """
+    Build the source of a regular expression that matches any of the
+    ``(prefix, source)`` items. The literal prefixes are merged into a trie
+    so the regular expression engine only has to look at each alternative
+    once it has matched the shared prefix.
+    """
+
+    children = OrderedDict()
+    alternatives = []
+    for prefix, source in items:
+        if prefix:
+            children.setdefault(prefix[:1], []).append((prefix[1:], source))
+        else:
+            alternatives.append(source)
+
+    alternatives[:0] = [
+        re.escape(c) + _reghex_trie(child_items)
+        for c, child_items in six.iteritems(children)
+    ]
+    if len(alternatives) == 1:
+        return alternatives[0]
+    return b'(?:' + b'|'.join(alternatives) + b')'
+
+
+class ReghexSet(object):
+    """
+    A set of reghex patterns (see :func:`reghex`) that can be searched for
+    in a single pass over the data.
+
+    The literal prefixes of the patterns are merged into a trie and the
+    patterns are combined into a single regular expression that is used to
+    find the offsets at which any of the patterns match (including
+    overlapping matches). At each of those offsets, the patterns that can
+    start with the byte found there are matched to find out which patterns
+    matched.
+
+    You'll usually want to use :func:`reghex_set` which caches compiled
+    sets.
+
+    Args:
+        patterns(list of str): The reghex patterns.
+
+    Raises:
+        SyntaxError: If one of the patterns is not a valid reghex pattern.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = list(OrderedDict.fromkeys(patterns))
+
+        items = [_reghex_source(pattern) for pattern in self.patterns]
+
+        self._candidates = [[] for _ in range(256)]
+        for i, (prefix, _) in enumerate(items):
+            for c in (range(256) if not prefix else [six.indexbytes(prefix, 0)]):
+                self._candidates[c].append(i)
+
+        try:
+            self._regexes = [re.compile(re.escape(prefix) + source, re.DOTALL) for prefix, source in items]
+            self.regex = re.compile(b'(?=' + _reghex_trie(items) + b')', re.DOTALL)
+        except (TypeError, binascii.Error, re.error):
+            raise SyntaxError('Invalid reghex pattern.')
+
+    def scan(self, data, start=0, end=None):
+        """
+        Find all matches of all patterns in a buffer.
+
+        Args:
+            data(bytes, bytearray or mmap): The data to scan.
+            start(int): The offset at which to start scanning.
+            end(int): The offset at which to stop scanning. Defaults to the
+                end of the data.
+
+        Returns:
+            generator of tuple: ``(pattern, offset, match)`` tuples in order
+            of offset, where ``match`` are the matched bytes.
+
+        Example:
+            >>> from pwny import *
+            >>> list(reghex_set(['41 42', '42 ?{2} 44']).scan(b'ABCD'))
+            [('41 42', 0, b'AB'), ('42 ?{2} 44', 1, b'BCD')]
+        """
+
+        if end is None:
+            end = len(data)
+
+        patterns, regexes, candidates = self.patterns, self._regexes, self._candidates
+        for match in self.regex.finditer(data, start, end):
+            offset = match.start()
+            c = six.indexbytes(data[offset:offset + 1], 0) if offset < end else 0
+            for i in candidates[c]:
+                m = regexes[i].match(data, offset, end)
+                if m is not None:
+                    yield patterns[i], offset, m.group()
+
+
+REGHEX_SET_CACHE_SIZE = 32
+_reghex_set_cache = OrderedDict()
+
+
+def reghex_set(patterns):
+    """
+    Compile a set of reghex patterns (see :func:`reghex`) so they can all be
+    searched for in a single pass over the data. Compiled sets are cached.
+
+    Args:
+        patterns(list of str): The reghex patterns.
+
+    Returns:
+        :class:`ReghexSet`: The compiled set of patterns.
+
+    Raises:
+        SyntaxError: If one of the patterns is not a valid reghex pattern.
+    """
+
+    key = tuple(patterns)
+    result = _reghex_set_cache.pop(key, None)
+    if result is None:
+        result = ReghexSet(key)
+        if len(_reghex_set_cache) >= REGHEX_SET_CACHE_SIZE:
+            _reghex_set_cache.popitem(last=False)
+    _reghex_set_cache[key] = result
+    return result
+
+
+def _cycle_characters(value):
+    if value.startswith('0x'):
+        return pwnypack.codec.dehex(value[2:])
+    return value.encode('latin1')
+
+
+def _add_cycle_arguments(parser):
+    parser.add_argument('-w', '--width', type=int, default=4, help='the length of the cycled value')
+    parser.add_argument(
+        '-A', '--alphabet',
+        type=_cycle_characters,
+        help='the characters to use (use a 0x prefix for hex encoded characters, defaults to A-Z)',
+    )
+    parser.add_argument(
+        '-c', '--badchars',
+        type=pwnypack.codec.dehex,
+        help='the hex encoded characters to remove from the alphabet',
+    )
+
+
 @pwnypack.main.register('cycle')
 def cycle_app(parser, cmd, args):  # pragma: no cover
     """
     Generate a de Bruijn sequence of a given length.
     """
 
-    parser.add_argument('-w', '--width', type=int, default=4, help='the length of the cycled value')
+    _add_cycle_arguments(parser)
     parser.add_argument('length', type=int, help='the cycle length to generate')
     args = parser.parse_args(args)
-    return cycle(args.length, args.width)
+    try:
+        if args.format in ('py', 'sh'):
+            return cycle(args.length, args.width, args.alphabet, args.badchars)
+        return cycle_stream(args.length, args.width, args.alphabet, args.badchars)
+    except ValueError as e:
+        parser.error(str(e))
 
 
 @pwnypack.main.register('cycle-find')
@@ -182,10 +774,31 @@ def cycle_find_app(_parser, cmd, args):  # pragma: no cover
         prog=_parser.prog,
         description=_parser.description,
     )
-    parser.add_argument('-w', '--width', type=int, default=4, help='the length of the cycled value')
-    parser.add_argument('value', help='the value to determine the position of, read from stdin if missing', nargs='?')
+    _add_cycle_arguments(parser)
+    parser.add_argument('-l', '--limit', type=int, help='only search the first LIMIT bytes of the sequence')
+    parser.add_argument(
+        'value',
+        help='the value to determine the position of (use a 0x prefix for a register value), read from stdin if '
+             'missing',
+        nargs='?',
+    )
+    pwnypack.main.add_target_arguments(parser)
     args = parser.parse_args(args)
-    index = cycle_find(pwnypack.main.string_value_or_stdin(args.value), args.width)
+
+    value = pwnypack.main.string_value_or_stdin(args.value)
+    if value.startswith('0x'):
+        value = int(value, 16)
+    try:
+        index = cycle_find(
+            value,
+            args.width,
+            pwnypack.main.target_from_arguments(args),
+            args.alphabet,
+            args.badchars,
+            args.limit,
+        )
+    except ValueError as e:
+        parser.error(str(e))
     if index == -1:
         print('Not found.')
         sys.exit(1)
@@ -55,7 +55,8 @@ setup(
         'ssh': ['paramiko'],
         'shell': ['ipython'],
         'pwnbook': ['jupyter'],
-        'all': ['capstone', 'paramiko', 'ipython', 'jupyter'],
+        'stats': ['numpy'],
+        'all': ['capstone', 'paramiko', 'ipython', 'jupyter', 'numpy'],
     },
     tests_require=['mock', 'pytest-cov', 'pytest'],
     cmdclass = {'test': PyTest},
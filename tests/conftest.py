@@ -1,7 +1,57 @@
+import sys
+import threading
+import time
+
+import mock
 import pytest
+from six.moves import socketserver
+
 import pwny
 
 
+if sys.version_info < (3, 5):
+    collect_ignore = ['test_asyncflow.py']
+
+
 @pytest.fixture(autouse=True)
 def target():
     pwny.target.assume(pwny.Target(arch=pwny.Target.Arch.x86, bits=pwny.Target.Bits.bits_32))
+
+
+@pytest.fixture(params=[True, False], ids=['numpy', 'python'])
+def numpy(request, numpy_module):
+    """
+    Run a test both with and without numpy. The test module provides the
+    module whose ``HAVE_NUMPY`` flag to patch as the ``numpy_module``
+    fixture.
+    """
+
+    if request.param and not numpy_module.HAVE_NUMPY:
+        pytest.skip('numpy is not installed')
+    with mock.patch.object(numpy_module, 'HAVE_NUMPY', request.param):
+        yield
+
+
+class EchoHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if line.startswith(b'sleep'):
+                time.sleep(float(line.split()[1]))
+            self.wfile.write(line)
+
+
+class EchoServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128
+
+
+@pytest.fixture
+def server():
+    s = EchoServer(('127.0.0.1', 0), EchoHandler)
+    t = threading.Thread(target=s.serve_forever, args=(0.05,))
+    t.daemon = True
+    t.start()
+    yield s.server_address
+    s.shutdown()
+    s.server_close()
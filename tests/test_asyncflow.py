@@ -0,0 +1,259 @@
+import asyncio
+import socket
+import time
+
+import pytest
+
+import pwny
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+async def socket_flow(data, close=True, **kwargs):
+    a, b = socket.socketpair()
+    b.sendall(data)
+    if close:
+        b.close()
+    reader, writer = await asyncio.open_connection(sock=a)
+    f = pwny.AsyncFlow(reader, writer, **kwargs)
+    f._peer = b
+    return f
+
+
+async def close_flow(f):
+    await f.close()
+    f._peer.close()
+
+
+def test_read():
+    async def go():
+        f = await socket_flow(b'pwnypack')
+        try:
+            return await f.read(4), await f.read(4)
+        finally:
+            await close_flow(f)
+    assert run(go()) == (b'pwny', b'pack')
+
+
+def test_read_until_keeps_remainder():
+    async def go():
+        f = await socket_flow(b'abc:def:ghi')
+        try:
+            return await f.read_until(b':'), await f.until(b':'), await f.read_eof()
+        finally:
+            await close_flow(f)
+    assert run(go()) == (b'abc:', b'def:', b'ghi')
+
+
+def test_readlines():
+    async def go():
+        f = await socket_flow(b'a\nb\nc\nrest')
+        try:
+            return await f.readlines(2), await f.readline(), await f.read_eof()
+        finally:
+            await close_flow(f)
+    assert run(go()) == ([b'a\n', b'b\n'], b'c\n', b'rest')
+
+
+def test_read_large():
+    data = b'A' * (1 << 20) + b'\n'
+
+    async def go():
+        f = await socket_flow(b'', close=False)
+        try:
+            loop = asyncio.get_event_loop()
+            send = loop.run_in_executor(None, f._peer.sendall, data)
+            line = await f.readline()
+            await send
+            return line
+        finally:
+            await close_flow(f)
+    assert run(go()) == data
+
+
+def test_read_eof_error():
+    async def go():
+        f = await socket_flow(b'pwny')
+        try:
+            await f.read(5)
+        finally:
+            await close_flow(f)
+    with pytest.raises(EOFError):
+        run(go())
+
+
+def test_read_timeout():
+    async def go():
+        f = await socket_flow(b'partial', close=False)
+        try:
+            with pytest.raises(pwny.FlowTimeout) as e:
+                await f.read_until(b'\n', timeout=0.05)
+            return e.value.data, await f.read(7)
+        finally:
+            await close_flow(f)
+    assert run(go()) == (b'partial', b'partial')
+
+
+def test_default_timeout():
+    async def go():
+        f = await socket_flow(b'', close=False, timeout=0.05)
+        try:
+            await f.readline()
+        finally:
+            await close_flow(f)
+    with pytest.raises(pwny.FlowTimeout):
+        run(go())
+
+
+def test_echo(capsys):
+    async def go():
+        f = await socket_flow(b'pwny\n', close=False, echo=True)
+        try:
+            await f.writeline(b'pack')
+            return await f.readline(), f._peer.recv(5)
+        finally:
+            await close_flow(f)
+    assert run(go()) == (b'pwny\n', b'pack\n')
+    assert capsys.readouterr().out == 'pack\npwny\n'
+
+
+def free_port():
+    s = socket.socket()
+    s.bind(('127.0.0.1', 0))
+    port = s.getsockname()[1]
+    s.close()
+    return port
+
+
+def test_tcp():
+    port = free_port()
+
+    async def server():
+        f = await pwny.AsyncFlow.listen_tcp('127.0.0.1', port)
+        await f.write((await f.readline()).upper())
+        await f.close()
+
+    async def client():
+        for _ in range(100):
+            try:
+                f = await pwny.AsyncFlow.connect_tcp('127.0.0.1', port)
+                break
+            except OSError:
+                await asyncio.sleep(0.01)
+        try:
+            await f.writeline(b'pwny')
+            return await f.read_eof(timeout=5)
+        finally:
+            await f.close()
+
+    async def go():
+        return (await asyncio.gather(server(), client()))[1]
+    assert run(go()) == b'PWNY\n'
+
+
+def test_execute():
+    async def go():
+        f = await pwny.AsyncFlow.execute('cat')
+        await f.writelines([b'pwny', b'pack'])
+        lines = await f.readlines(2)
+        await f.close()
+        return lines, f.process.returncode
+    assert run(go()) == ([b'pwny\n', b'pack\n'], 0)
+
+
+def test_execute_process_ended():
+    async def go():
+        f = await pwny.AsyncFlow.execute('true')
+        try:
+            await f.read_eof()
+            await f.readline()
+        finally:
+            await f.close()
+    with pytest.raises(EOFError, match='Process ended'):
+        run(go())
+
+
+def test_concurrent():
+    async def go():
+        flows = await asyncio.gather(*[pwny.AsyncFlow.execute('cat') for _ in range(20)])
+        for i, f in enumerate(flows):
+            await f.writeline(str(i).encode('ascii'))
+        lines = await asyncio.gather(*[f.readline(timeout=5) for f in flows])
+        for f in flows:
+            await f.close()
+        return lines
+    assert run(go()) == [('%d\n' % i).encode('ascii') for i in range(20)]
+
+
+async def async_echo(flow):
+    await flow.writeline(b'sleep 0.2')
+    return await flow.readline()
+
+
+def test_run_async(server):
+    start = time.time()
+    results = list(pwny.run(async_echo, [server] * 50))
+    assert time.time() - start < 2
+    assert len(results) == 50
+    assert all(result['result'] == b'sleep 0.2\n' for result in results)
+
+
+def test_run_async_timeout(server):
+    async def stuck(flow):
+        return await flow.readline(timeout=10)
+
+    result, = pwny.run(stuck, [server], timeout=0.1)
+    assert result['timeout']
+    assert isinstance(result['error'], pwny.FlowTimeout)
+
+
+def test_run_async_errors(server):
+    async def fail(flow):
+        raise RuntimeError('failed')
+
+    result, = pwny.run(fail, [server], mode='async')
+    assert isinstance(result['error'], RuntimeError)
+    assert not result['timeout']
+
+
+def test_run_async_close(server, monkeypatch):
+    calls = []
+    close = pwny.AsyncFlow.close
+
+    async def record_close(self):
+        calls.append('close')
+        await close(self)
+
+    monkeypatch.setattr(pwny.AsyncFlow, 'close', record_close)
+    monkeypatch.setattr(pwny.AsyncFlow, 'kill', lambda self: calls.append('kill'))
+
+    result, = pwny.run(async_echo, [server])
+    assert result['error'] is None
+    assert calls == ['close']
+
+
+def test_run_async_bounded_workers(server):
+    running = []
+    peak = []
+
+    async def exploit(flow):
+        running.append(1)
+        peak.append(len(running))
+        await asyncio.sleep(0.05)
+        running.pop()
+
+    results = list(pwny.run(exploit, [server] * 8, workers=2))
+    assert len(results) == 8
+    assert max(peak) <= 2
+
+
+def test_run_async_connect_error():
+    result, = pwny.run(async_echo, [('127.0.0.1', free_port())])
+    assert isinstance(result['error'], OSError)
+    assert not result['timeout']
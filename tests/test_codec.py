@@ -1,3 +1,8 @@
+import binascii
+import io
+
+import pytest
+
 import pwny
 
 
@@ -64,3 +69,183 @@ def test_deurlquote_plus():
 
 def test_frequency():
     assert pwny.frequency('ABCD') == {'A': 1, 'B': 1, 'C': 1, 'D': 1}
+
+
+def test_xor_memoryview():
+    assert pwny.xor(b'abcd', memoryview(b'fooofooo')) == b'\x07\r\x0c\x0b\x07\r\x0c\x0b'
+
+
+def test_xor_out():
+    buf = bytearray(b'fooo')
+    assert pwny.xor(b'abcd', buf, out=buf) is buf
+    assert buf == bytearray(b'\x07\r\x0c\x0b')
+
+
+def test_xor_large():
+    data = bytes(bytearray(i * 7 & 0xff for i in range(200003)))
+    key = b'pwnyx'
+    expected = bytes(bytearray(c ^ bytearray(key)[i % len(key)] for i, c in enumerate(bytearray(data))))
+    assert pwny.xor(key, data) == expected
+
+
+def test_xor_empty_key():
+    with pytest.raises(ValueError):
+        pwny.xor(b'', b'')
+
+
+def test_xor_stream():
+    assert b''.join(pwny.xor_stream(b'abcd', [b'fo', b'oofo', b'oo'])) == b'\x07\r\x0c\x0b\x07\r\x0c\x0b'
+
+
+def test_enhex_stream():
+    assert ''.join(pwny.enhex_stream([b'AB', b'', b'CD'], ' ')) == '41 42 43 44'
+
+
+def test_dehex_stream():
+    assert b''.join(pwny.dehex_stream(['41 4', '2', '4', '3 4'.encode('ascii'), '4'])) == b'ABCD'
+
+
+def test_enb64_stream():
+    assert ''.join(pwny.enb64_stream([b'A', b'BC', b'D'])) == 'QUJDRA=='
+
+
+def test_deb64_stream():
+    assert b''.join(pwny.deb64_stream(['QU', 'JD\nR', b'A=='])) == b'ABCD'
+
+
+crack_plaintext = b'''It was the best of times, it was the worst of times, it was the age of wisdom, it was the age of
+foolishness, it was the epoch of belief, it was the epoch of incredulity, it was the season of Light, it was
+the season of Darkness, it was the spring of hope, it was the winter of despair, we had everything before us,
+we had nothing before us, we were all going direct to Heaven, we were all going direct the other way.'''
+
+
+def test_xor_key_lengths():
+    data = pwny.xor(b'pwnypack', crack_plaintext)
+    assert pwny.xor_key_lengths(data)[0][0] % 8 == 0
+
+
+def test_xor_crack():
+    assert pwny.xor_crack(pwny.xor(b'pwnypack', crack_plaintext)) == b'pwnypack'
+
+
+def test_xor_crack_single_byte():
+    assert pwny.xor_crack(pwny.xor(0x42, crack_plaintext)) == b'\x42'
+
+
+def test_xor_crack_table():
+    table = pwny.frequency_table(crack_plaintext)
+    assert pwny.xor_crack(pwny.xor(b'key', crack_plaintext), key_len=3, table=table) == b'key'
+
+
+def test_caesar_bytes():
+    assert pwny.caesar(1, b'abcXYZ') == b'bcdYZA'
+
+
+def test_caesar_brute():
+    assert pwny.caesar_brute(pwny.caesar(3, 'The quick brown fox jumps over the lazy dog'), top=1) == \
+        [(23, 'The quick brown fox jumps over the lazy dog')]
+
+
+def test_caesar_brute_all():
+    assert len(pwny.caesar_brute('Fmdofqsa')) == 26
+
+
+def test_caesar_brute_short():
+    assert pwny.caesar_brute(pwny.caesar(3, 'hello world'), top=1) == [(23, 'hello world')]
+
+
+def test_caesar_brute_short_all_shifts():
+    for shift in range(26):
+        assert pwny.caesar_brute(pwny.caesar(shift, 'attack at dawn'), top=1)[0][1] == 'attack at dawn'
+
+
+def test_caesar_brute_short_sentence():
+    assert pwny.caesar_brute('Wkh txlfn eurzq ira', top=3)[0] == (23, 'The quick brown fox')
+
+
+def test_caesar_brute_bytes():
+    assert pwny.caesar_brute(b'Phhw ph dw qrrq', top=1) == [(23, b'Meet me at noon')]
+
+
+def test_enhex_separator():
+    assert pwny.enhex(b'ABCD', ' ') == '41 42 43 44'
+    assert pwny.enhex(b'ABCD', ', ') == '41, 42, 43, 44'
+
+
+def test_hexdump():
+    assert list(pwny.hexdump(b'pwnypack' * 6 + b'abc')) == [
+        '00000000  70 77 6e 79 70 61 63 6b  70 77 6e 79 70 61 63 6b  |pwnypackpwnypack|',
+        '*',
+        '00000030  61 62 63                                          |abc|',
+        '00000033',
+    ]
+
+
+def test_hexdump_width_base():
+    assert list(pwny.hexdump(io.BytesIO(b'\x00ABC\xff'), width=4, base=0x400000)) == [
+        '00400000  00 41 42 43  |.ABC|',
+        '00400004  ff           |.|',
+        '00400005',
+    ]
+
+
+def test_dehex_bytes():
+    assert pwny.dehex(b'41:42:43:44\n') == b'ABCD'
+
+
+def test_hex_decoder():
+    decoder = pwny.HexDecoder()
+    assert decoder.feed('41 4') == b'A'
+    assert decoder.feed(bytearray(b'24')) == b'B'
+    assert decoder.feed(memoryview(b'34')) == b'C'
+    assert decoder.feed('4') == b'D'
+    assert decoder.finish() == b''
+
+
+@pytest.mark.xfail(raises=binascii.Error)
+def test_hex_decoder_incomplete():
+    decoder = pwny.HexDecoder()
+    decoder.feed('414')
+    decoder.finish()
+
+
+@pytest.mark.parametrize(('variant', 'encoded'), [
+    ('b64', 'cHdueXBhY2v7/w=='),
+    ('b64url', 'cHdueXBhY2v7_w=='),
+    ('b32', 'OB3W46LQMFRWX677'),
+    ('b85', 'aCdHbaA9L>`~L'),
+    (b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789.:', 'cHdueXBhY2v7:w=='),
+])
+def test_enbase_debase(variant, encoded):
+    assert pwny.enbase(b'pwnypack\xfb\xff', variant) == encoded
+    assert pwny.debase(encoded, variant) == b'pwnypack\xfb\xff'
+
+
+def test_enbase_no_padding():
+    assert pwny.enbase(b'pwnypack', padding=False) == 'cHdueXBhY2s'
+
+
+def test_debase_repair_padding():
+    assert pwny.deb64('cHdue XBh\nY2s') == b'pwnypack'
+    assert pwny.debase(b'OB3W46LQMFRWW', 'b32') == b'pwnypack'
+
+
+@pytest.mark.xfail(raises=binascii.Error)
+def test_debase_invalid_quantum():
+    pwny.debase('cHdueXBhY')
+
+
+@pytest.mark.xfail(raises=ValueError)
+def test_debase_invalid_alphabet():
+    pwny.debase('', 'abc')
+
+
+def test_base_stream():
+    data = bytes(bytearray(range(256))) * 3
+    for variant in ('b64', 'b64url', 'b32', 'b85'):
+        encoder = pwny.BaseEncoder(variant)
+        encoded = b''.join(encoder.feed(memoryview(data)[i:i + 7]) for i in range(0, len(data), 7))
+        encoded += encoder.finish()
+        assert encoded.decode('ascii') == pwny.enbase(data, variant)
+        chunks = [encoded[i:i + 5] + b'\r\n' for i in range(0, len(encoded), 5)]
+        assert b''.join(pwny.debase_stream(chunks, variant)) == data
@@ -0,0 +1,121 @@
+try:
+    import shutilwhich
+except ImportError:
+    pass
+
+import shutil
+
+import pytest
+
+import pwny
+import pwnypack.encoder
+
+
+PAYLOAD = bytes(bytearray(range(1, 256)))
+
+
+def _encode(payload, op, key):
+    f = pwnypack.encoder.ENCODER_OPS[op]
+    key = bytearray(key)
+    return bytearray(f(v, key[i % len(key)]) for i, v in enumerate(bytearray(payload)))
+
+
+def _decode(encoded, op, key):
+    payload = bytearray()
+    for i, e in enumerate(bytearray(encoded)):
+        payload.extend(
+            v for v in range(256)
+            if pwnypack.encoder.ENCODER_OPS[op](v, bytearray(key)[i % len(key)]) == e
+        )
+    return payload
+
+
+@pytest.mark.parametrize(('payload', 'badchars'), [
+    (b'\x00\x01\x02', b'\x00'),
+    (b'\x31\xc0\x50\x68\x2f\x2f\x73\x68\x0a\x00', b'\x00\x0a'),
+    (PAYLOAD, b'\x00'),
+    (PAYLOAD, b'\x00\x0a\x0d'),
+])
+def test_find_encoder_key(payload, badchars):
+    op, key = pwny.find_encoder_key(payload, badchars, processes=1)
+    bad = set(bytearray(badchars))
+    assert not bad & set(bytearray(key))
+    assert not bad & set(_encode(payload, op, key))
+
+
+def test_find_encoder_key_single_byte():
+    assert pwny.find_encoder_key(b'\x00\x01\x02', b'\x00') == (pwny.EncoderOp.xor, b'\x03')
+
+
+def test_find_encoder_key_multi_byte():
+    op, key = pwny.find_encoder_key(PAYLOAD + b'\x00', b'\x00', processes=1)
+    assert len(key) > 1
+
+
+def test_find_encoder_key_pool():
+    assert pwny.find_encoder_key(PAYLOAD + b'\x00', b'\x00\x0a', key_lens=(2, 4)) == \
+        pwny.find_encoder_key(PAYLOAD + b'\x00', b'\x00\x0a', key_lens=(2, 4), processes=2)
+
+
+@pytest.mark.parametrize('op', [pwny.EncoderOp.add, pwny.EncoderOp.sub, pwny.EncoderOp.rol])
+def test_find_encoder_key_op(op):
+    payload = b'\x02\x80\xff'
+    found_op, key = pwny.find_encoder_key(payload, b'\x00\x01', key_lens=(1,), ops=[op])
+    assert found_op is op
+    encoded = _encode(payload, op, key)
+    assert not set(encoded) & {0, 1}
+    assert _decode(encoded, op, key) == bytearray(payload)
+
+
+def test_find_encoder_key_impossible():
+    assert pwny.find_encoder_key(PAYLOAD, bytes(bytearray(range(128))), key_lens=(1,)) is None
+
+
+@pytest.mark.xfail(raises=NotImplementedError)
+def test_encode_shellcode_arm():
+    pwny.encode_shellcode(b'\x00', b'\x00', target=pwny.Target(arch=pwny.Target.Arch.arm))
+
+
+def test_encode_shellcode_next_op(monkeypatch):
+    # The add byte [ptr], bl instruction of the sub decoder contains a NUL byte.
+    monkeypatch.setattr(
+        pwnypack.encoder,
+        '_x86_decoder',
+        lambda op, key, length, target: b'\x00' if op is pwny.EncoderOp.sub else b'\x90',
+    )
+    payload = b'\x31\xc0\xc3'
+    encoded = pwny.encode_shellcode(payload, b'\x00', ops=[pwny.EncoderOp.sub, pwny.EncoderOp.xor])
+    assert encoded[:1] == b'\x90'
+    assert b'\x00' not in encoded
+    key = pwny.find_encoder_key(payload, b'\x00', ops=[pwny.EncoderOp.xor])[1]
+    assert _decode(encoded[1:], pwny.EncoderOp.xor, key) == bytearray(payload)
+
+
+def test_encode_shellcode_key_len(monkeypatch):
+    # A 3 byte key doesn't fit the 32 bit decoder's key register.
+    monkeypatch.setattr(pwnypack.asm, 'asm', lambda code, target: b'\x90')
+    target = pwny.Target(arch=pwny.Target.Arch.x86, bits=32)
+    payload = PAYLOAD + b'\x00'
+    encoded = pwny.encode_shellcode(payload, b'\x00', target=target, key_lens=(3, 4))
+    op, key = pwny.find_encoder_key(payload, b'\x00', key_lens=(4,))
+    assert _decode(encoded[1:], op, key) == bytearray(payload)
+
+
+@pytest.mark.skipif(shutil.which('nasm') is None, reason='nasm is not installed')
+@pytest.mark.parametrize('bits', [32, 64])
+def test_encode_shellcode_stub(bits):
+    target = pwny.Target(arch=pwny.Target.Arch.x86, bits=bits)
+    payload = pwny.asm('xor eax, eax\nret', target=target) + b'\x0a'
+    badchars = b'\x00\x0a'
+    encoded = pwny.encode_shellcode(payload, badchars, target=target)
+    assert not set(bytearray(encoded)) & set(bytearray(badchars))
+
+    op, key = pwny.find_encoder_key(payload, badchars)
+    stub = pwnypack.encoder._x86_decoder(op, key, len(payload), target)
+    assert encoded[:len(stub)] == stub
+    assert _decode(encoded[len(stub):], op, key) == bytearray(payload)
+
+
+def test_encode_shellcode_empty():
+    with pytest.raises(ValueError):
+        pwny.encode_shellcode(b'', b'\x00')
@@ -0,0 +1,133 @@
+import socket
+
+import pytest
+
+import pwny
+
+
+class ReadOnlyChannel(object):
+    def __init__(self, data):
+        self.data = data
+
+    def read(self, n):
+        if not self.data:
+            raise EOFError('Channel closed')
+        d, self.data = self.data[:n], self.data[n:]
+        return d
+
+
+def socket_flow(data):
+    a, b = socket.socketpair()
+    b.sendall(data)
+    b.close()
+    return pwny.Flow(pwny.SocketChannel(a))
+
+
+@pytest.fixture(params=['socket', 'read-only'])
+def make_flow(request):
+    if request.param == 'socket':
+        return socket_flow
+    else:
+        return lambda data: pwny.Flow(ReadOnlyChannel(data))
+
+
+def test_read(make_flow):
+    f = make_flow(b'pwnypack')
+    assert f.read(4) == b'pwny'
+    assert f.read(4) == b'pack'
+
+
+def test_read_until_keeps_remainder(make_flow):
+    f = make_flow(b'login: pwny\npassword: ')
+    assert f.read_until(b': ') == b'login: '
+    assert f.readline() == b'pwny\n'
+    assert f.read_eof() == b'password: '
+
+
+def test_readlines(make_flow):
+    f = make_flow(b'a\nb\nc')
+    assert f.readlines(2) == [b'a\n', b'b\n']
+    assert f.read_eof() == b'c'
+
+
+def test_buffered():
+    f = socket_flow(b'login: pwny\n')
+    assert f.buffered == b''
+    assert f.read_until(b': ') == b'login: '
+    assert f.buffered == b'pwny\n'
+    assert f.readline() == b'pwny\n'
+    assert f.buffered == b''
+
+
+def test_read_until_large(make_flow):
+    data = b'x' * 200000 + b'\r\n\r\n'
+    assert make_flow(data + b'body').read_until(b'\r\n\r\n') == data
+
+
+def test_read_until_eof(make_flow):
+    f = make_flow(b'pwny')
+    with pytest.raises(EOFError):
+        f.read_until(b'\n')
+    assert f.read_eof() == b'pwny'
+
+
+def test_read_eof_after_eof_error(make_flow):
+    f = make_flow(b'pwny')
+    with pytest.raises(EOFError):
+        f.read(8)
+    assert f.read_eof() == b'pwny'
+
+
+def test_execute():
+    f = pwny.Flow.execute('cat')
+    f.writelines([b'hello', b'world'])
+    assert f.readline() == b'hello\n'
+    assert f.read(6) == b'world\n'
+    f.kill()
+
+
+def hung_flow(data, timeout=None):
+    a, b = socket.socketpair()
+    b.sendall(data)
+    flow = pwny.Flow(pwny.SocketChannel(a), timeout=timeout)
+    flow.peer = b
+    return flow
+
+
+def test_read_timeout():
+    f = hung_flow(b'pwny')
+    with pytest.raises(pwny.FlowTimeout) as e:
+        f.read(8, timeout=0.01)
+    assert e.value.data == b'pwny'
+    f.peer.sendall(b'pack')
+    assert f.read(8, timeout=1) == b'pwnypack'
+
+
+def test_read_until_timeout():
+    f = hung_flow(b'login', timeout=0.01)
+    with pytest.raises(pwny.FlowTimeout) as e:
+        f.read_until(b': ')
+    assert e.value.data == b'login'
+
+
+def test_readlines_timeout():
+    f = hung_flow(b'a\nb')
+    with pytest.raises(pwny.FlowTimeout) as e:
+        f.readlines(2, timeout=0.01)
+    assert e.value.data == b'a\nb'
+    assert f.readline() == b'a\n'
+
+
+def test_read_eof_timeout():
+    f = hung_flow(b'pwny')
+    with pytest.raises(pwny.FlowTimeout) as e:
+        f.read_eof(timeout=0.01)
+    assert e.value.data == b'pwny'
+
+
+def test_timeout_process():
+    f = pwny.Flow.execute('cat', timeout=0.01)
+    f.write(b'pwny')
+    with pytest.raises(pwny.FlowTimeout):
+        f.readline()
+    f.kill()
@@ -0,0 +1,55 @@
+import os
+import struct
+
+import pwny
+
+
+def elf_file(payload):
+    size = 64 + 56 + len(payload)
+    return (
+        b'\x7fELF\x02\x01\x01' + b'\x00' * 9 +
+        struct.pack('<HHIQQQIHHHHHH', 2, 62, 1, 0x400078, 64, 0, 0, 64, 56, 1, 64, 0, 0) +
+        struct.pack('<IIQQQQQQ', 1, 5, 0, 0x400000, 0x400000, size, size, 0x1000) +
+        payload
+    )
+
+
+def make_tree(tmpdir):
+    tmpdir.join('a.bin').write_binary(b'xx\x0f\x05\xc3xx\x0f\x05\xc3')
+    tmpdir.mkdir('sub').join('b.elf').write_binary(elf_file(b'\x90\x0f\x05\xc3'))
+    tmpdir.join('empty').write_binary(b'')
+    os.symlink(str(tmpdir.join('a.bin')), str(tmpdir.join('link')))
+    return tmpdir
+
+
+def summary(matches):
+    return sorted((os.path.basename(m['path']), m['offset'], m['addr'], m['match']) for m in matches)
+
+
+def test_grep_file(tmpdir):
+    path = str(make_tree(tmpdir).join('a.bin'))
+    assert pwny.grep_file(path, ['0f 05 c3']) == [
+        {'path': path, 'offset': 2, 'addr': None, 'pattern': '0f 05 c3', 'match': b'\x0f\x05\xc3'},
+        {'path': path, 'offset': 7, 'addr': None, 'pattern': '0f 05 c3', 'match': b'\x0f\x05\xc3'},
+    ]
+
+
+def test_grep_file_elf_vaddr(tmpdir):
+    path = str(make_tree(tmpdir).join('sub', 'b.elf'))
+    assert [(m['offset'], m['addr']) for m in pwny.grep_file(path, ['0f 05 c3'])] == [(121, 0x400079)]
+
+
+def test_grep_tree(tmpdir):
+    make_tree(tmpdir)
+    assert summary(pwny.grep([str(tmpdir)], '0f 05', processes=1)) == [
+        ('a.bin', 2, None, b'\x0f\x05'),
+        ('a.bin', 7, None, b'\x0f\x05'),
+        ('b.elf', 121, 0x400079, b'\x0f\x05'),
+    ]
+
+
+def test_grep_pool(tmpdir):
+    make_tree(tmpdir)
+    assert summary(pwny.grep([str(tmpdir)], ['0f 05', '90'], processes=2)) == \
+        summary(pwny.grep([str(tmpdir)], ['0f 05', '90'], processes=1))
+
@@ -0,0 +1,51 @@
+import sys
+
+import pytest
+
+import pwny
+import pwnypack.main
+
+
+streaming_apps = [
+    ('xor', ['pwny', 'ABCDEFGH']),
+    ('enb64', ['pwnypack']),
+    ('deb64', ['cHdueXBhY2s=']),
+    ('enbase', ['pwnypack']),
+    ('debase', ['cHdueXBhY2s=']),
+    ('enhex', ['pwnypack']),
+    ('dehex', ['70776e797061636b']),
+]
+
+
+def run_app(capfd, app, args):
+    pwnypack.main.main(['pwny', app] + args)
+    return capfd.readouterr().out
+
+
+@pytest.mark.parametrize('format', ['raw', 'hex', 'b64'])
+@pytest.mark.parametrize(('app', 'args'), streaming_apps, ids=[app for app, _ in streaming_apps])
+def test_stream_format(capfd, app, args, format):
+    expected = run_app(capfd, app, ['-n', '-f', format] + args)
+    assert run_app(capfd, app, ['--stream', '-n', '-f', format] + args) == expected
+
+
+@pytest.mark.parametrize('format', ['py', 'sh'])
+@pytest.mark.parametrize(('app', 'args'), streaming_apps, ids=[app for app, _ in streaming_apps])
+def test_stream_format_unsupported(capfd, app, args, format):
+    with pytest.raises(SystemExit):
+        run_app(capfd, app, ['--stream', '-f', format] + args)
+
+
+@pytest.mark.parametrize('stdin', [False, True], ids=['file', 'stdin'])
+def test_hexdump_range(capfd, monkeypatch, tmpdir, stdin):
+    data = bytes(bytearray(range(256))) * 4
+    path = tmpdir.join('data')
+    path.write(data, mode='wb')
+    if stdin:
+        monkeypatch.setattr(sys, 'stdin', path.open('rb'))
+        args = []
+    else:
+        args = [str(path)]
+
+    output = run_app(capfd, 'hexdump', ['-s', '0x18', '-l', '100'] + args)
+    assert output == '\n'.join(pwny.hexdump(data[0x18:0x18 + 100], base=0x18)) + '\n'
@@ -1,10 +1,13 @@
 import pytest
 
 import pwny
+import pwnypack.packing
 
 
 target_little_endian = pwny.Target(arch=pwny.Target.Arch.unknown, endian=pwny.Target.Endian.little)
 target_big_endian = pwny.Target(arch=pwny.Target.Arch.unknown, endian=pwny.Target.Endian.big)
+target_big_endian_32 = pwny.Target(arch=pwny.Target.Arch.unknown, bits=32, endian=pwny.Target.Endian.big)
+target_big_endian_64 = pwny.Target(arch=pwny.Target.Arch.unknown, bits=64, endian=pwny.Target.Endian.big)
 
 
 def test_pack():
@@ -132,3 +135,172 @@ def check_short_form_unpack(f, num, bytestr):
 
 def check_short_form_unpack_endian(f, num, bytestr, endian):
     assert getattr(pwny, f)(bytestr, endian=endian) == num
+
+
+def test_packer():
+    packer = pwny.Packer(64, pwny.Target.Endian.big)
+    assert packer.P(0x41424344) == b'\x00\x00\x00\x00ABCD'
+    assert packer.u(b'\xff' * 8) == -1
+    assert packer.U16(b'AB') == 0x4142
+    assert packer.p8(-1) == b'\xff'
+    assert packer.pack('HB', 0x4142, 0x43) == b'ABC'
+    assert packer.unpack('<H', b'AB') == (0x4241,)
+    assert packer.pack_size('bq') == 9
+
+
+def test_packer_for_target():
+    packer = pwny.Packer.for_target(target_big_endian, bits=32)
+    assert packer is pwny.Packer.for_target(target_big_endian, bits=32)
+    assert packer.P(0x41424344) == b'ABCD'
+    assert pwny.Packer.for_target().P(0x41424344) == b'DCBA'
+
+
+@pytest.mark.xfail(raises=NotImplementedError)
+def test_packer_invalid_endian():
+    pwny.Packer(32, 'invalid')
+
+
+def test_pointer_many():
+    data = b'\xfc\xfd\xfe\xff\x01\x02\x03\x04'
+    assert pwny.U_many(data) == [0xfffefdfc, 0x04030201]
+    assert pwny.u_many(data) == [-66052, 0x04030201]
+    assert pwny.U_many(memoryview(data), endian=pwny.Target.Endian.big) == [0xfcfdfeff, 0x01020304]
+    assert pwny.U_many(data, bits=64) == [0x04030201fffefdfc]
+    assert pwny.P_many([0xfffefdfc, 0x04030201]) == data
+    assert pwny.p_many(iter([-66052, 0x04030201])) == data
+    assert pwny.P_many([0xfcfdfeff, 0x01020304], endian=pwny.Target.Endian.big) == data
+
+
+def test_pointer_many_array():
+    result = pwny.U_many(b'\x00\x01\x02\x03' * 4, bits=32, target=target_big_endian, as_array=True)
+    assert result.itemsize == 4
+    assert result.tolist() == [0x00010203] * 4
+
+
+@pytest.mark.xfail(raises=ValueError)
+def test_pointer_many_invalid_length():
+    pwny.U_many(b'\x00' * 5)
+
+
+Node = pwny.record('Node', [('next', 'P'), ('value', 'i'), (None, '2x'), ('tag', '2s')])
+
+
+def test_record():
+    node = Node(0x41424344, value=-1, tag=b'pw')
+    assert node._pack(target_big_endian_32) == b'ABCD\xff\xff\xff\xff\x00\x00pw'
+    assert Node._size(target_big_endian_64) == 16
+    assert Node() == Node(0, 0, b'')
+
+
+def test_record_unpack():
+    node = Node._unpack(b'\x00ABCD\xff\xff\xff\xff\x00\x00pw', offset=1, target=target_big_endian_32)
+    assert (node.next, node.value, node.tag) == (0x41424344, -1, b'pw')
+
+
+def test_record_unpack_many():
+    data = memoryview(b''.join(Node(i, -i, b'pw')._pack(target_big_endian_64) for i in range(10)))
+    nodes = Node._unpack_many(data, target=target_big_endian_64)
+    assert nodes == [Node(i, -i, b'pw') for i in range(10)]
+    assert Node._unpack_many(data, offset=16, count=2, target=target_big_endian_64) == nodes[1:3]
+
+
+@pytest.mark.xfail(raises=ValueError)
+def test_record_unpack_many_invalid_length():
+    Node._unpack_many(b'\x00' * 17, target=target_big_endian_64)
+
+
+@pytest.mark.xfail(raises=TypeError)
+def test_record_unknown_field():
+    Node(foo=1)
+
+
+@pytest.mark.xfail(raises=ValueError)
+def test_record_invalid_format():
+    pwny.record('Invalid', [('values', '3I')])
+
+
+def test_flat():
+    assert pwny.flat(b'AB', [1, -1, (u'xy', b'')], bits=32, endian=pwny.Target.Endian.big) == \
+        b'AB\x00\x00\x00\x01\xff\xff\xff\xffxy'
+
+
+def test_flat_offsets():
+    assert pwny.flat({4: 0x41424344, 12: [b'pw', b'ny']}, length=20) == b'AAAADCBACAAApwnyEAAA'
+
+
+def test_flat_filler():
+    assert pwny.flat(b'AB', {2: b'C'}, length=8, filler=b'0123') == b'AB23C123'
+
+
+def test_flat_large_item():
+    assert pwny.flat({4: b'x' * 500000}) == b'AAAA' + b'x' * 500000
+
+
+def test_flat_empty_filler():
+    with pytest.raises(ValueError):
+        pwny.flat({4: b'x'}, filler=b'')
+
+
+@pytest.mark.xfail(raises=ValueError)
+def test_flat_overlap():
+    pwny.flat({0: b'AAAA', 2: b'B'})
+
+
+@pytest.mark.xfail(raises=ValueError)
+def test_flat_too_long():
+    pwny.flat(b'AAAA', length=2)
+
+
+@pytest.mark.xfail(raises=ValueError)
+def test_flat_badchars():
+    pwny.flat(b'AB', 0x0a, badchars=b'\n\x00')
+
+
+@pytest.fixture
+def numpy_module():
+    return pwnypack.packing
+
+
+varint_data = [
+    (pwny.VarintMode.unsigned, 0, b'\x00'),
+    (pwny.VarintMode.unsigned, 300, b'\xac\x02'),
+    (pwny.VarintMode.unsigned, (1 << 64) - 1, b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\x01'),
+    (pwny.VarintMode.signed, -1, b'\x7f'),
+    (pwny.VarintMode.signed, 64, b'\xc0\x00'),
+    (pwny.VarintMode.signed, -(1 << 63), b'\x80\x80\x80\x80\x80\x80\x80\x80\x80\x7f'),
+    (pwny.VarintMode.zigzag, -1, b'\x01'),
+    (pwny.VarintMode.zigzag, 150, b'\xac\x02'),
+]
+
+
+@pytest.mark.parametrize(('mode', 'value', 'data'), varint_data)
+def test_varint(mode, value, data):
+    assert pwny.pack_varint(value, mode) == data
+    assert pwny.unpack_varint(b'?' + data, 1, mode) == (value, len(data) + 1)
+
+
+@pytest.mark.parametrize('mode', list(pwny.VarintMode))
+def test_varints(numpy, mode):
+    values = [value for value_mode, value, _ in varint_data if value_mode is mode] * 3
+    data = b''.join(pwny.pack_varint(value, mode) for value in values)
+    assert pwny.pack_varints(values, mode) == data
+    offsets, result = pwny.unpack_varints(b'?' + data + b'\x80', 1, mode=mode)
+    assert list(result) == values
+    assert offsets[0] == 1
+    assert offsets[-1] == len(data) + 1
+
+
+def test_varints_count(numpy):
+    offsets, values = pwny.unpack_varints(b'\x01\xac\x02\x02', count=2)
+    assert list(offsets) == [0, 1, 3]
+    assert list(values) == [1, 300]
+
+
+@pytest.mark.xfail(raises=ValueError)
+def test_varints_overflow(numpy):
+    pwny.unpack_varints(pwny.pack_varint(1 << 64))
+
+
+@pytest.mark.xfail(raises=ValueError)
+def test_varint_incomplete():
+    pwny.unpack_varint(b'\x80\x80')
@@ -0,0 +1,51 @@
+import pytest
+
+import pwny
+
+
+def test_pipeline_parse():
+    assert pwny.Pipeline.parse('deb64 | xor:pwny | enhex').process(b'MTUtPQ==') == b'41424344'
+
+
+def test_pipeline_hex_key():
+    assert pwny.Pipeline.parse('xor:0x2a').process(b'kkkk') == b'AAAA'
+
+
+def test_pipeline_chunks():
+    pipeline = pwny.Pipeline.parse('xor:abc|enb64|deb64|xor:abc|enhex:,|dehex')
+    assert b''.join(pipeline([b'pw', b'nyp', b'ack'])) == b'pwnypack'
+
+
+def test_pipeline_base_n():
+    pipeline = pwny.Pipeline.parse('enbase:b64url:nopad | debase:b64url')
+    assert b''.join(pipeline([b'\xfb', b'\xff\xfe', b'\xfb'])) == b'\xfb\xff\xfe\xfb'
+    assert pwny.Pipeline.parse('enbase:b32').process(b'pwnypack') == b'OB3W46LQMFRWW==='
+
+
+def test_pipeline_callables():
+    pipeline = pwny.Pipeline(lambda chunks: (chunk.upper() for chunk in chunks))
+    assert pipeline.process(b'pwnypack') == b'PWNYPACK'
+
+
+def test_pipeline_caesar():
+    assert pwny.Pipeline.parse('caesar:1 | rot13').process(b'abcXYZ') == b'opqLMN'
+
+
+def test_pipeline_urlquote():
+    pipeline = pwny.Pipeline.parse('deurlquote:plus')
+    assert b''.join(pipeline([b'Foo+Bar%2', b'FBaz%', b'41'])) == b'Foo Bar/BazA'
+
+
+@pytest.mark.xfail(raises=ValueError)
+def test_pipeline_unknown_stage():
+    pwny.Pipeline.parse('deb64 | frobnicate')
+
+
+@pytest.mark.parametrize('spec', ['xor', 'xor:', 'xor:a:b', 'rot13:1', 'enhex::', 'caesar'])
+def test_pipeline_invalid_args(spec):
+    with pytest.raises(ValueError):
+        pwny.Pipeline.parse(spec)
+
+
+def test_pipeline_varargs():
+    assert pwny.Pipeline.parse('caesar:1:az:AZ:09').process(b'az9') == b'ba0'
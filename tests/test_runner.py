@@ -0,0 +1,136 @@
+import socket
+import threading
+import time
+
+import pytest
+
+import pwny
+
+
+def closed_port():
+    s = socket.socket()
+    s.bind(('127.0.0.1', 0))
+    port = s.getsockname()[1]
+    s.close()
+    return port
+
+
+def echo(flow):
+    flow.writeline(b'pwny')
+    return flow.readline()
+
+
+def test_parse_target():
+    assert pwny.parse_target('10.0.0.1:1337') == ('10.0.0.1', 1337)
+    assert pwny.parse_target('[::1]:80') == ('::1', 80)
+    assert pwny.parse_target(('localhost', '80')) == ('localhost', 80)
+
+
+@pytest.mark.parametrize('target', ['localhost', ':80', 'localhost:http'])
+def test_parse_target_invalid(target):
+    with pytest.raises(ValueError):
+        pwny.parse_target(target)
+
+
+def test_run(server):
+    results = list(pwny.run(echo, [server] * 5))
+    assert len(results) == 5
+    for result in results:
+        assert result['target'] == server
+        assert result['result'] == b'pwny\n'
+        assert result['error'] is None
+        assert not result['timeout']
+
+
+def test_run_concurrent(server):
+    def slow(flow):
+        flow.writeline(b'sleep 0.3')
+        return flow.readline()
+
+    start = time.time()
+    results = list(pwny.run(slow, [server] * 10))
+    assert time.time() - start < 2
+    assert all(result['result'] == b'sleep 0.3\n' for result in results)
+
+
+def test_run_bounded_workers(server):
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def exploit(flow):
+        with lock:
+            running.append(1)
+            peak.append(len(running))
+        time.sleep(0.05)
+        with lock:
+            running.pop()
+
+    list(pwny.run(exploit, [server] * 8, workers=2))
+    assert max(peak) <= 2
+
+
+def test_run_errors(server):
+    def fail(flow):
+        raise RuntimeError('failed')
+
+    results = list(pwny.run(fail, [server]))
+    assert isinstance(results[0]['error'], RuntimeError)
+    assert results[0]['result'] is None
+
+    results = list(pwny.run(echo, [('127.0.0.1', closed_port())]))
+    assert isinstance(results[0]['error'], socket.error)
+    assert not results[0]['timeout']
+
+
+def test_run_read_timeout(server):
+    def silent(flow):
+        return flow.readline()
+
+    result, = pwny.run(silent, [server], timeout=0.1)
+    assert result['timeout']
+    assert isinstance(result['error'], pwny.FlowTimeout)
+
+
+def test_run_target_timeout(server):
+    def stuck(flow):
+        # The read timeout is larger than the target's timeout.
+        return flow.readline(timeout=10)
+
+    start = time.time()
+    result, = pwny.run(stuck, [server], timeout=0.2)
+    assert time.time() - start < 2
+    assert result['timeout']
+    assert result['elapsed'] < 2
+
+
+def test_run_invalid_mode(server):
+    with pytest.raises(ValueError):
+        pwny.run(echo, [server], mode='fork')
+    with pytest.raises(ValueError):
+        pwny.run(echo, [server], mode='async')
+
+
+def test_run_summary():
+    results = [
+        {'error': None, 'timeout': False, 'elapsed': 0.1 * i}
+        for i in range(1, 11)
+    ]
+    results[0]['error'] = pwny.FlowTimeout(b'')
+    results[0]['timeout'] = True
+    summary = pwny.run_summary(results)
+    assert summary['targets'] == 10
+    assert summary['succeeded'] == 9
+    assert summary['failed'] == 1
+    assert summary['timeout'] == 1
+    assert summary['min'] == pytest.approx(0.1)
+    assert summary['mean'] == pytest.approx(0.55)
+    assert summary['median'] == pytest.approx(0.6)
+    assert summary['p90'] == pytest.approx(1.0)
+    assert summary['max'] == pytest.approx(1.0)
+
+
+def test_run_summary_empty():
+    summary = pwny.run_summary([])
+    assert summary['targets'] == 0
+    assert summary['median'] is None
@@ -0,0 +1,63 @@
+import io
+
+import pytest
+
+import pwny
+import pwnypack.stats
+
+
+@pytest.fixture
+def numpy_module():
+    return pwnypack.stats
+
+
+def test_histogram(numpy):
+    histogram = pwny.histogram(b'pwnypack')
+    assert len(histogram) == 256
+    assert histogram[ord('p')] == 2
+    assert sum(histogram) == 8
+
+
+def test_histogram_file(numpy):
+    assert pwny.histogram(io.BytesIO(b'AAB'))[ord('A')] == 2
+
+
+def test_ngrams(numpy):
+    assert pwny.ngrams(b'\0' * 8 + b'pwnypack', 2, top=2) == [(b'\0\0', 7), (b'\0p', 1)]
+
+
+def test_ngrams_capacity(numpy):
+    assert pwny.ngrams(b'ABABABC', 2, top=1, capacity=1) == [(b'AB', 3)]
+
+
+def test_ngrams_file(numpy, monkeypatch):
+    monkeypatch.setattr(pwnypack.stats, 'READ_SIZE', 1)
+    assert pwny.ngrams(io.BytesIO(b'pwnypackpwny'), 4, top=2) == [(b'pwny', 2), (b'ackp', 1)]
+
+
+def test_entropy(numpy):
+    assert pwny.entropy(b'pwnypack') == 2.75
+    assert pwny.entropy(b'') == 0.0
+
+
+def test_entropy_profile(numpy):
+    assert list(pwny.entropy_profile(b'\0' * 8 + b'pwnypack', 8)) == [(0, 0.0), (8, 2.75)]
+
+
+def test_entropy_profile_step(numpy):
+    assert list(pwny.entropy_profile(b'\0' * 8 + b'pwnypack', 8, 4, base=0x1000)) == \
+        [(0x1000, 0.0), (0x1004, 2.0), (0x1008, 2.75)]
+
+
+def test_entropy_profile_batches(numpy, monkeypatch):
+    monkeypatch.setattr(pwnypack.stats, 'ENTROPY_BATCH_BLOCKS', 1)
+    assert list(pwny.entropy_profile(b'\0' * 8 + b'pwnypack', 8, 4)) == [(0, 0.0), (4, 2.0), (8, 2.75)]
+
+
+def test_entropy_profile_short(numpy):
+    assert list(pwny.entropy_profile(b'AB', 8)) == [(0, 1.0)]
+
+
+@pytest.mark.xfail(raises=ValueError)
+def test_entropy_profile_invalid_step():
+    list(pwny.entropy_profile(b'AB', 8, 3))
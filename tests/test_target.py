@@ -1,3 +1,5 @@
+import threading
+
 import mock
 import pytest
 
@@ -78,3 +80,33 @@ def test_target_assume():
            target.endian == pwny.Target.Endian.little and \
            target.bits == 64 and \
            target.mode == 2
+
+
+def test_target_scope():
+    scoped = pwny.Target(arch=pwny.Target.Arch.arm, bits=64, endian=pwny.Target.Endian.big)
+    assert pwny.current_target() is pwny.target
+    with pwny.target_scope(scoped) as t:
+        assert t is scoped
+        assert pwny.current_target() is scoped
+        assert pwny.P(0x41) == b'\x00' * 7 + b'A'
+    assert pwny.current_target() is pwny.target
+    assert pwny.P(0x41) == b'A\x00\x00\x00'
+
+
+def test_target_scope_nested():
+    outer = pwny.Target(arch=pwny.Target.Arch.x86, bits=64)
+    inner = pwny.Target(arch=pwny.Target.Arch.x86, bits=32)
+    with pwny.target_scope(outer):
+        with pwny.target_scope(inner):
+            assert pwny.current_target() is inner
+        assert pwny.current_target() is outer
+
+
+def test_target_scope_thread():
+    scoped = pwny.Target(arch=pwny.Target.Arch.x86, bits=64)
+    result = []
+    with pwny.target_scope(scoped):
+        thread = threading.Thread(target=lambda: result.append(pwny.current_target()))
+        thread.start()
+        thread.join()
+    assert result == [pwny.target]
@@ -1,3 +1,6 @@
+import mock
+import pytest
+
 import pwny
 
 
@@ -9,6 +12,20 @@ def test_cycle_width():
     assert pwny.cycle(64, width=2) == 'AABACADAEAFAGAHAIAJAKALAMANAOAPAQARASATAUAVAWAXAYAZBBCBDBEBFBGBH'
 
 
+def test_cycle_bytes():
+    assert pwny.cycle_bytes(16) == b'AAAABAAACAAADAAA'
+
+
+def test_cycle_unique():
+    sequence = pwny.cycle(26 ** 3, width=3)
+    assert len(set(sequence[i:i + 3] for i in range(len(sequence) - 2))) == len(sequence) - 2
+
+
+@pytest.mark.xfail(raises=ValueError)
+def test_cycle_too_long():
+    pwny.cycle(26 ** 2 + 1, width=2)
+
+
 def test_cycle_find():
     assert pwny.cycle_find('PAAA') == 60
 
@@ -19,3 +36,136 @@ def test_cycle_find_start():
 
 def test_cycle_find_not_found():
     assert pwny.cycle_find('\x00', width=1) == -1
+
+
+def test_cycle_find_long_key():
+    assert pwny.cycle_find(pwny.cycle_bytes(1000)[500:520]) == 500
+
+
+def test_cycle_find_short_key():
+    assert pwny.cycle_find('BAA') == 4
+
+
+def test_cycle_find_int():
+    target = pwny.Target(arch=pwny.Target.Arch.x86, bits=32)
+    assert pwny.cycle_find(0x41414150, target=target) == 60
+
+
+def test_cycle_find_int_big_endian():
+    target = pwny.Target(arch=pwny.Target.Arch.arm, bits=32, endian=pwny.Target.Endian.big)
+    assert pwny.cycle_find(0x50414141, target=target) == 60
+
+
+def test_cycle_find_int_64():
+    target = pwny.Target(arch=pwny.Target.Arch.x86, bits=64)
+    assert pwny.cycle_find(0x4141414b, target=target) == 40
+    assert pwny.cycle_find(0x4141414c4141414b, width=8, target=target) == pwny.cycle_find(b'KAAALAAA', width=8)
+
+
+def test_cycle_find_invalid_characters():
+    assert pwny.cycle_find('AAAa') == -1
+
+
+def test_cycle_find_unindexed():
+    with mock.patch('pwnypack.util.CYCLE_INDEX_LIMIT', 0):
+        assert pwny.cycle_find('PAAA') == 60
+
+
+def test_cycle_alphabet():
+    assert pwny.cycle(8, width=3, alphabet='ab') == 'aaababbb'
+
+
+def test_cycle_badchars():
+    assert pwny.cycle(16, badchars='ABC') == 'DDDDEDDDFDDDGDDD'
+
+
+def test_cycle_bytearray_alphabet():
+    assert pwny.cycle_bytes(8, width=3, alphabet=bytearray(b'abc'), badchars=bytearray(b'c')) == b'aaababbb'
+    assert pwny.cycle_find(b'bab', width=3, alphabet=bytearray(b'ab')) == 3
+
+
+@pytest.mark.xfail(raises=ValueError)
+def test_cycle_duplicate_alphabet():
+    pwny.cycle(8, alphabet='aab')
+
+
+@pytest.mark.xfail(raises=ValueError)
+def test_cycle_width_too_large():
+    pwny.cycle(8, width=9)
+
+
+def test_cycle_stream():
+    assert b''.join(pwny.cycle_stream(100000, width=8)) == pwny.cycle_bytes(100000, width=8)
+
+
+def test_cycle_stream_full():
+    sequence = b''.join(pwny.cycle_stream(width=8, alphabet=b'\x00\xff'))
+    assert len(sequence) == 256
+    assert len(set(sequence[i:i + 8] for i in range(len(sequence) - 7))) == len(sequence) - 7
+
+
+def test_cycle_find_alphabet():
+    assert pwny.cycle_find('yzz', width=3, alphabet='xyz') == 23
+
+
+def test_cycle_find_wide():
+    assert pwny.cycle_find(pwny.cycle_bytes(5000, width=8)[4000:4008], width=8) == 4000
+
+
+def test_cycle_find_wide_end():
+    assert pwny.cycle_find('ZZZZZZZZ', width=8) == 26 ** 8 - 8
+
+
+def test_cycle_find_wide_not_found():
+    assert pwny.cycle_find('ZZZZZZZA', width=8) == -1
+
+
+def test_cycle_find_unindexed_long_key():
+    with mock.patch('pwnypack.util.CYCLE_INDEX_LIMIT', 0):
+        sequence = pwny.cycle_bytes(26 ** 3, width=3)
+        assert pwny.cycle_find(sequence[500:520], width=3) == 500
+        assert pwny.cycle_find(sequence[500:519] + b'A', width=3) == -1
+        assert all(pwny.cycle_find(sequence[i:i + 3], width=3) == i for i in range(len(sequence) - 2))
+
+
+def test_cycle_find_limit():
+    assert pwny.cycle_find(pwny.cycle_bytes(5000, width=8)[4000:4008], width=8, limit=4007) == -1
+
+
+def test_reghex():
+    assert pwny.reghex('41 ? 43').match(b'ABC').group() == b'ABC'
+
+
+def test_reghex_escape_literal():
+    assert pwny.reghex('2e').match(b'A') is None
+
+
+def test_reghex_wildcard_newline():
+    assert pwny.reghex('41 . 43').match(b'A\nC') is not None
+
+
+@pytest.mark.xfail(raises=SyntaxError)
+def test_reghex_invalid():
+    pwny.reghex('41 zz')
+
+
+def test_reghex_set_scan():
+    matches = list(pwny.reghex_set(['41 42', '42 ?{2} 44', '?41']).scan(b'ABCDA'))
+    assert matches == [
+        ('41 42', 0, b'AB'),
+        ('?41', 0, b'A'),
+        ('42 ?{2} 44', 1, b'BCD'),
+        ('?41', 3, b'DA'),
+        ('?41', 4, b'A'),
+    ]
+
+
+def test_reghex_set_overlapping():
+    matches = list(pwny.reghex_set(['41 41', '41']).scan(b'AAA'))
+    assert [(pattern, offset) for pattern, offset, _ in matches] == [
+        ('41 41', 0), ('41', 0), ('41 41', 1), ('41', 1), ('41', 2),
+    ]
+
+
+def test_reghex_set_cached():
+    assert pwny.reghex_set(['41', '42']) is pwny.reghex_set(['41', '42'])